@@ -1,35 +1,136 @@
+import hashlib
+import json
 import os
 import requests
 from bs4 import BeautifulSoup
 import logging
 from concurrent.futures import ThreadPoolExecutor
+import threading
 import time
+from urllib.parse import urljoin, urlparse
+from requests.adapters import HTTPAdapter
+
+from Indexer.book_store import BOOK_STORAGE, CHUNK_SIZE, COMPRESSED_SUFFIX, publish_book, stored_book_path, \
+    write_book_file
+
+
+BASE_URL = "https://www.gutenberg.org/"
+REPOSITORY_DOCUMENTS = "Datalake/eventstore/Gutenbrg"
+CRAWL_STATE_FILE = "Datalake/crawl_state.json"
+CRAWL_LEDGER_FILE = "Datalake/crawl_ledger.json"
+FIRST_BOOKSHELF = 5
+LAST_BOOKSHELF = 487
+CRAWLER_CONCURRENCY = int(os.environ.get('CRAWLER_CONCURRENCY', 5))
+HOST_DELAY = float(os.environ.get('CRAWLER_HOST_DELAY', 1.0))
+
+
+# The crawl state is saved after every book so a restart resumes where the
+# previous run stopped: the bookshelf being crawled, the book pages of that
+# bookshelf still to visit and the book ids handled successfully. Once the last
+# bookshelf is done the state starts over, so the next run is a new crawl cycle.
+#
+# The crawl ledger outlives crawl cycles. It is keyed by Gutenberg book id and
+# keeps the text URL, the file name, the ETag/Last-Modified validators and the
+# SHA-256 of the content, so re-crawls send conditional requests, leave
+# unchanged files untouched and store identical texts only once: a book whose
+# text is already stored is recorded as a duplicate_of the book owning the file.
+
+def write_json_atomically(data, output_file):
+    temporary_file = f'{output_file}.tmp'
+    with open(temporary_file, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(temporary_file, output_file)
+
+
+def load_crawl_state(state_file, first_bookshelf=FIRST_BOOKSHELF):
+    try:
+        with open(state_file, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except FileNotFoundError:
+        state = {"bookshelf": first_bookshelf, "frontier": None, "visited": []}
+    state["visited"] = set(state["visited"])
+    return state
+
+
+def save_crawl_state(state, state_file):
+    write_json_atomically(dict(state, visited=sorted(state["visited"])), state_file)
+
+
+def load_crawl_ledger(ledger_file):
+    try:
+        with open(ledger_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def content_owners_from_ledger(ledger):
+    return {entry["sha256"]: book_id for book_id, entry in ledger.items() if "duplicate_of" not in entry}
+
+
+def create_session(concurrency=CRAWLER_CONCURRENCY):
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=concurrency, pool_maxsize=concurrency)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def create_throttle(delay=HOST_DELAY):
+    return {"delay": delay, "next_request": {}, "lock": threading.Lock()}
+
+
+def wait_for_host(throttle, url):
+    host = urlparse(url).netloc
+    with throttle["lock"]:
+        now = time.monotonic()
+        request_time = max(now, throttle["next_request"].get(host, now))
+        throttle["next_request"][host] = request_time + throttle["delay"]
+    time.sleep(request_time - now)
+
+
+def fetch(session, throttle, method, url, headers=None, stream=False):
+    wait_for_host(throttle, url)
+    return session.request(method, url, headers=headers, timeout=60, stream=stream)
+
 
+def book_id_from_url(book_page_url):
+    return book_page_url.rstrip('/').split('/')[-1]
 
 
-global_counter = 0
+def book_file_name(title, book_id):
+    formatted_title = title.replace(' ', '_').replace(':', '').replace('/', '_')
+    return f"{formatted_title}_{book_id}.txt"
 
 
-def download_book(url_book, file_name):
+def conditional_headers(ledger_entry):
+    headers = {}
+    if ledger_entry and ledger_entry.get("etag"):
+        headers['If-None-Match'] = ledger_entry["etag"]
+    if ledger_entry and ledger_entry.get("last_modified"):
+        headers['If-Modified-Since'] = ledger_entry["last_modified"]
+    return headers
+
+
+def download_book(session, throttle, url_book, ledger_entry=None):
     try:
-        response = requests.get(url_book)
-        response.raise_for_status()
-        file_path = os.path.join(REPOSITORY_DOCUMENTS, file_name)
-        with open(file_path, 'wb') as file:
-            file.write(response.content)
-        logging.info(f"Book downloaded and saved at: {file_path}")
+        response = fetch(session, throttle, 'GET', url_book, conditional_headers(ledger_entry), stream=True)
+        if response.status_code != 304:
+            response.raise_for_status()
+        return response
     except requests.exceptions.RequestException as e:
         logging.error(f"Error downloading {url_book}: {e}")
+        return None
 
 
-def get_txt_link(book_page_url):
+def get_txt_link(session, throttle, book_page_url, base_url=BASE_URL):
     try:
-        book_id = book_page_url.split('/')[-1]
-        txt_url = f"https://www.gutenberg.org/cache/epub/{book_id}/pg{book_id}.txt"
+        book_id = book_id_from_url(book_page_url)
+        txt_url = urljoin(base_url, f"cache/epub/{book_id}/pg{book_id}.txt")
 
-        response = requests.head(txt_url)
+        response = fetch(session, throttle, 'HEAD', txt_url)
         if response.status_code == 200:
-            book_page_response = requests.get(book_page_url)
+            book_page_response = fetch(session, throttle, 'GET', book_page_url)
             book_page_soup = BeautifulSoup(book_page_response.text, 'html.parser')
             title = book_page_soup.find('h1').text.strip()
             return txt_url, title
@@ -41,13 +142,13 @@ def get_txt_link(book_page_url):
         return None, None
 
 
-def get_book_page_links(category_url):
+def get_book_page_links(session, throttle, category_url, base_url=BASE_URL):
     book_page_links = []
     current_page = category_url
 
     while current_page:
         try:
-            response = requests.get(current_page)
+            response = fetch(session, throttle, 'GET', current_page)
             response.raise_for_status()
             soup = BeautifulSoup(response.text, 'html.parser')
 
@@ -55,12 +156,13 @@ def get_book_page_links(category_url):
                 href = link['href']
 
                 if href.startswith("/ebooks/") and href[8:].isdigit():
-                    full_url = BASE_URL + href
-                    book_page_links.append(full_url)
+                    full_url = urljoin(base_url, href)
+                    if full_url not in book_page_links:
+                        book_page_links.append(full_url)
 
-            next_button = soup.find('a', text='Next')
+            next_button = soup.find('a', string='Next')
             if next_button and 'href' in next_button.attrs:
-                current_page = BASE_URL + next_button['href']
+                current_page = urljoin(base_url, next_button['href'])
             else:
                 current_page = None
 
@@ -72,63 +174,174 @@ def get_book_page_links(category_url):
     return book_page_links
 
 
-def run_crawler(category_url, num_books):
-    global global_counter
-    logging.info("Starting the crawler...")
-
-    book_page_links = get_book_page_links(category_url)
-
-    if book_page_links:
-        logging.info(f"{len(book_page_links)} book pages found.")
-        total_books_downloaded = 0
-        block_number = 1
-
-        while total_books_downloaded < len(book_page_links):
-            logging.info(f"Starting download of block {block_number}.")
-            books_downloaded_in_block = 0
-
-            with ThreadPoolExecutor(max_workers=5) as executor:
-                for i in range(total_books_downloaded, total_books_downloaded + num_books):
-                    if i >= len(book_page_links):
-                        break
-
-                    book_page_url = book_page_links[i]
-                    txt_link, title = get_txt_link(book_page_url)
-                    if txt_link:
-                        global_counter += 1
+def hashed_chunks(chunks, content_hash):
+    for chunk in chunks:
+        content_hash.update(chunk)
+        yield chunk
+
+
+def promote_duplicate(crawler, book_id, content_hash, file_path):
+    # The stored text of book_id is about to change. The first book recorded as
+    # its duplicate takes over the old file and the ownership of its hash.
+    ledger = crawler["ledger"]
+    duplicates = sorted(duplicate_id for duplicate_id, entry in ledger.items()
+                        if entry.get("duplicate_of") == book_id)
+    if not duplicates:
+        return
+
+    stored_path = stored_book_path(file_path)
+    if stored_path is None:
+        # Nothing to hand over: forget the validators so the next crawl downloads them again.
+        for duplicate_id in duplicates:
+            for key in ("duplicate_of", "etag", "last_modified"):
+                ledger[duplicate_id].pop(key, None)
+        return
+
+    new_owner = duplicates[0]
+    publish_book(stored_path, os.path.join(crawler["repository"], ledger[new_owner]["file"]),
+                 stored_path.endswith(COMPRESSED_SUFFIX))
+    del ledger[new_owner]["duplicate_of"]
+    for duplicate_id in duplicates[1:]:
+        ledger[duplicate_id]["duplicate_of"] = new_owner
+    crawler["content_owners"][content_hash] = new_owner
+    logging.info(f"Book {new_owner} now stores the text previously stored for book {book_id}.")
+
+
+def record_book(crawler, book_id, ledger_entry, content_hash, temporary_file):
+    file_path = os.path.join(crawler["repository"], ledger_entry["file"])
+
+    # The ledger and the stored files change together under the lock, so a file
+    # is never handed over or removed while another worker records the same text.
+    with crawler["lock"]:
+        previous_entry = crawler["ledger"].get(book_id)
+        previous_hash = previous_entry["sha256"] if previous_entry else None
+        if previous_hash != content_hash and crawler["content_owners"].get(previous_hash) == book_id:
+            del crawler["content_owners"][previous_hash]
+            promote_duplicate(crawler, book_id, previous_hash, file_path)
+        owner = crawler["content_owners"].setdefault(content_hash, book_id)
+        ledger_entry["sha256"] = content_hash
+        if owner != book_id:
+            ledger_entry["duplicate_of"] = owner
+        crawler["ledger"][book_id] = ledger_entry
+
+        stored_path = stored_book_path(file_path)
+        if owner != book_id:
+            os.remove(temporary_file)
+            if stored_path:
+                os.remove(stored_path)
+            logging.info(f"Book {book_id} has the same text as book {owner}; not storing it again.")
+        elif previous_hash == content_hash and stored_path:
+            os.remove(temporary_file)
+            logging.info(f"Book {book_id} is unchanged: {file_path}")
+        else:
+            stored_path = publish_book(temporary_file, file_path, crawler["compress"])
+            logging.info(f"Book downloaded and saved at: {stored_path}")
 
-                        formatted_title = title.replace(' ', '_').replace(':', '').replace('/', '_')
-                        file_name = f"{formatted_title}_{global_counter}.txt"
-                        executor.submit(download_book, txt_link, file_name)
-                        books_downloaded_in_block += 1
 
-            total_books_downloaded += books_downloaded_in_block
-            logging.info(f"Downloaded {books_downloaded_in_block} books in block {block_number}.")
-            block_number += 1
+def crawl_book(crawler, book_page_url):
+    session, throttle = crawler["session"], crawler["throttle"]
+    book_id = book_id_from_url(book_page_url)
+    ledger_entry = crawler["ledger"].get(book_id)
 
-            if total_books_downloaded < len(book_page_links):
-                logging.info("Waiting 30 minutes before continuing with the next block of books...")
-                time.sleep(1800)
+    if ledger_entry:
+        txt_link, file_name = ledger_entry["txt_url"], ledger_entry["file"]
     else:
-        logging.info("No book pages found to process.")
+        txt_link, title = get_txt_link(session, throttle, book_page_url, crawler["base_url"])
+        if not txt_link:
+            return book_page_url, False
+        file_name = book_file_name(title, book_id)
+
+    response = download_book(session, throttle, txt_link, ledger_entry)
+    if response is None:
+        return book_page_url, False
+
+    with response:
+        if response.status_code == 304:
+            logging.info(f"Book {book_id} not modified since the last crawl.")
+            return book_page_url, True
+
+        # The body is streamed to a temporary file while it is hashed; the ledger
+        # then decides whether it replaces the stored book or is thrown away.
+        temporary_file = os.path.join(crawler["repository"], f"{file_name}.part")
+        content_hash = hashlib.sha256()
+        try:
+            write_book_file(hashed_chunks(response.iter_content(CHUNK_SIZE), content_hash), temporary_file,
+                            crawler["compress"])
+        except requests.exceptions.RequestException as e:
+            os.remove(temporary_file)
+            logging.error(f"Error downloading {txt_link}: {e}")
+            return book_page_url, False
+
+    record_book(crawler, book_id, {
+        "txt_url": txt_link,
+        "file": file_name,
+        "etag": response.headers.get('ETag'),
+        "last_modified": response.headers.get('Last-Modified'),
+    }, content_hash.hexdigest(), temporary_file)
+    return book_page_url, True
+
+
+def run_crawler(crawler, category_url):
+    state = crawler["state"]
+    logging.info(f"Crawling {category_url}...")
+
+    if state["frontier"] is None:
+        book_page_links = get_book_page_links(crawler["session"], crawler["throttle"], category_url,
+                                              crawler["base_url"])
+        state["frontier"] = [url for url in book_page_links if book_id_from_url(url) not in state["visited"]]
+        save_crawl_state(state, crawler["state_file"])
+
+    logging.info(f"{len(state['frontier'])} book pages left to process.")
+
+    with ThreadPoolExecutor(max_workers=crawler["concurrency"]) as executor:
+        futures = [executor.submit(crawl_book, crawler, url) for url in list(state["frontier"])]
+        for future in futures:
+            book_page_url, handled = future.result()
+            with crawler["lock"]:
+                # A book that failed stays unvisited, so a later bookshelf or cycle retries it.
+                state["frontier"].remove(book_page_url)
+                if handled:
+                    state["visited"].add(book_id_from_url(book_page_url))
+                write_json_atomically(crawler["ledger"], crawler["ledger_file"])
+                save_crawl_state(state, crawler["state_file"])
+
+
+def crawl_bookshelves(last_bookshelf=LAST_BOOKSHELF, repository=REPOSITORY_DOCUMENTS, state_file=CRAWL_STATE_FILE,
+                      base_url=BASE_URL, concurrency=CRAWLER_CONCURRENCY, host_delay=HOST_DELAY,
+                      ledger_file=CRAWL_LEDGER_FILE, compress=BOOK_STORAGE == 'compressed',
+                      first_bookshelf=FIRST_BOOKSHELF):
+    if not os.path.exists(repository):
+        os.makedirs(repository)
+
+    ledger = load_crawl_ledger(ledger_file)
+    crawler = {
+        "session": create_session(concurrency),
+        "throttle": create_throttle(host_delay),
+        "state": load_crawl_state(state_file, first_bookshelf),
+        "state_file": state_file,
+        "ledger": ledger,
+        "ledger_file": ledger_file,
+        "content_owners": content_owners_from_ledger(ledger),
+        "lock": threading.Lock(),
+        "repository": repository,
+        "base_url": base_url,
+        "concurrency": concurrency,
+        "compress": compress,
+    }
+    state = crawler["state"]
+
+    while state["bookshelf"] <= last_bookshelf:
+        category_url = urljoin(base_url, f"ebooks/bookshelf/{state['bookshelf']}")
+        run_crawler(crawler, category_url)
+        state["bookshelf"] += 1
+        state["frontier"] = None
+        save_crawl_state(state, state_file)
+
+    save_crawl_state({"bookshelf": first_bookshelf, "frontier": None, "visited": set()}, state_file)
 
 
 if __name__ == "__main__":
     logging.basicConfig(filename='crawler.log', level=logging.INFO,
                         format='%(asctime)s - %(levelname)s - %(message)s')
 
-    BASE_URL = "https://www.gutenberg.org/"
-
-    REPOSITORY_DOCUMENTS = "Datalake/eventstore/Gutenbrg"
-
-    if not os.path.exists(REPOSITORY_DOCUMENTS):
-        os.makedirs(REPOSITORY_DOCUMENTS)
-
-    bookshelf_num = 5
-    max_bookshelf_num = 487
-    while bookshelf_num <= max_bookshelf_num:
-        category_url = f"https://www.gutenberg.org/ebooks/bookshelf/{bookshelf_num}"
-        run_crawler(category_url, num_books=10)
-        bookshelf_num += 1
-
-
+    crawl_bookshelves()
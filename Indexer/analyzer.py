@@ -0,0 +1,28 @@
+import re
+
+from Indexer.stop_words import STOP_WORDS
+
+
+# Shared by the indexers and the query engines so that a query term is looked
+# up exactly as the indexers would have stored it. Positions count every
+# whitespace-separated token, including the ones that analyze to nothing.
+
+NON_WORD_PATTERN = re.compile(r'\W+')
+SHARD_LETTER_PATTERN = re.compile(r'[^a-z0-9áéíóúàèìòùäëïöüâêîôûçñ]')
+
+
+def normalize_token(token):
+    return NON_WORD_PATTERN.sub('', token).lower()
+
+
+def is_indexable(term):
+    return bool(term) and term not in STOP_WORDS
+
+
+def analyze_token(token):
+    term = normalize_token(token)
+    return term if term not in STOP_WORDS else ''
+
+
+def get_first_letter(word):
+    return SHARD_LETTER_PATTERN.sub('', word[0].lower())
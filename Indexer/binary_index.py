@@ -0,0 +1,304 @@
+import mmap
+import shutil
+import struct
+import sys
+import tempfile
+from array import array
+from bisect import bisect_left
+from itertools import accumulate
+
+from Indexer.datamart_versions import atomic_write, remove_other_index_format
+
+
+# File layout (little-endian):
+#   header    magic, version, number of documents, number of terms,
+#             then the start offset of each of the four sections below
+#   term dictionary uint64 offsets (n_terms + 1) + UTF-8 terms sorted bytewise
+#                   (write_inverted_index_binary expects entries in that order)
+#   postings        uint64 offsets (n_terms + 1) + one block per term
+#
+# A postings block stores the number of documents followed by six arrays: doc
+# ids, frequencies, and for each run of POSTINGS_BLOCK_SIZE postings the number
+# of positions stored before it, its largest frequency and its shortest document
+# length, then the per-document position deltas. Each array is prefixed with its
+# typecode so it uses the narrowest integer width that fits.
+# Doc ids are the integer ids of the shared doc table (Indexer/doc_table.py).
+# They are stored whole rather than as deltas, so a query can search the mapped
+# array directly, with the first doc id of every run as its skip pointer. The
+# largest frequency and shortest length of a run bound the BM25 score of every
+# document in it (Query_Engine.ranking); a length of 0 means it was not known.
+
+MAGIC = b'SEBI'
+FORMAT_VERSION = 4
+POSTINGS_BLOCK_SIZE = 64
+HEADER = struct.Struct('<4sIII4Q')
+OFFSET = struct.Struct('<Q')
+COUNT = struct.Struct('<I')
+TYPECODES = ('B', 'H', 'I', 'Q')
+
+
+def pack_array(values):
+    largest = max(values, default=0)
+    for typecode in TYPECODES:
+        data = array(typecode)
+        if largest < 1 << (8 * data.itemsize):
+            break
+    data.extend(values)
+    if sys.byteorder == 'big':
+        data.byteswap()
+    return typecode.encode('ascii') + data.tobytes()
+
+
+def view_array(buffer, offset, length):
+    # Like unpack_array, but without copying: the array is read in place from the
+    # mapping, which is only possible when its byte order matches the file's.
+    if sys.byteorder == 'big':
+        return unpack_array(buffer, offset, length)
+    typecode = chr(buffer[offset])
+    start = offset + 1
+    end = start + length * array(typecode).itemsize
+    return memoryview(buffer)[start:end].cast(typecode), end
+
+
+def unpack_array(buffer, offset, length, skip=0):
+    typecode = chr(buffer[offset])
+    data = array(typecode)
+    start = offset + 1 + skip * data.itemsize
+    end = start + length * data.itemsize
+    data.frombytes(buffer[start:end])
+    if sys.byteorder == 'big':
+        data.byteswap()
+    return data, end
+
+
+def deltas(values):
+    previous = 0
+    result = []
+    for value in values:
+        result.append(value - previous)
+        previous = value
+    return result
+
+
+def block_count(n_postings):
+    return -(-n_postings // POSTINGS_BLOCK_SIZE)
+
+
+def encode_postings(postings, document_lengths=None):
+    postings.sort()
+    doc_ids = [doc_id for doc_id, _ in postings]
+    frequencies = [len(positions) for _, positions in postings]
+    position_starts = []
+    position_deltas = []
+    for number, (_, positions) in enumerate(postings):
+        if number % POSTINGS_BLOCK_SIZE == 0:
+            position_starts.append(len(position_deltas))
+        position_deltas.extend(deltas(positions))
+
+    runs = range(0, len(postings), POSTINGS_BLOCK_SIZE)
+    max_frequencies = [max(frequencies[start:start + POSTINGS_BLOCK_SIZE]) for start in runs]
+    min_lengths = [min(document_lengths.get(doc_id, 0) for doc_id in doc_ids[start:start + POSTINGS_BLOCK_SIZE])
+                   if document_lengths else 0 for start in runs]
+
+    return (COUNT.pack(len(postings)) + pack_array(doc_ids) + pack_array(frequencies)
+            + pack_array(position_starts) + pack_array(max_frequencies) + pack_array(min_lengths)
+            + pack_array(position_deltas))
+
+
+def pack_string_table(strings):
+    offsets = [0]
+    blob = bytearray()
+    for string in strings:
+        blob += string
+        offsets.append(len(blob))
+    return b''.join(OFFSET.pack(offset) for offset in offsets), bytes(blob)
+
+
+def write_inverted_index_binary(entries, output_file, document_lengths=None):
+    # document_lengths (doc id -> length) should hold every document of the index
+    # for the stored run lengths to bound scores tightly.
+    n_docs = 0
+    terms = []
+    postings_offsets = [0]
+
+    with tempfile.TemporaryFile() as postings_file:
+        for word, (doc_ids, positions, _) in entries:
+            block = encode_postings(list(zip(doc_ids, positions)), document_lengths)
+            postings_file.write(block)
+            terms.append(word.encode('utf-8'))
+            postings_offsets.append(postings_offsets[-1] + len(block))
+            n_docs = max(n_docs, max(doc_ids, default=-1) + 1)
+
+        term_offsets, term_blob = pack_string_table(terms)
+        postings_offsets = b''.join(OFFSET.pack(offset) for offset in postings_offsets)
+
+        sections = [term_offsets, term_blob, postings_offsets]
+        section_starts = [HEADER.size]
+        for section in sections:
+            section_starts.append(section_starts[-1] + len(section))
+
+        with atomic_write(output_file, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, FORMAT_VERSION, n_docs, len(terms), *section_starts))
+            for section in sections:
+                f.write(section)
+            postings_file.seek(0)
+            shutil.copyfileobj(postings_file, f)
+    remove_other_index_format(output_file)
+
+
+def export_inverted_index_binary(inverted_index, output_file, document_lengths=None):
+    terms = sorted(inverted_index, key=lambda word: word.encode('utf-8'))
+    write_inverted_index_binary(((word, inverted_index[word]) for word in terms), output_file, document_lengths)
+
+
+def open_binary_index(index_file):
+    with open(index_file, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    if len(buffer) < HEADER.size:
+        raise ValueError(f"{index_file} is not a binary inverted index.")
+    magic, version, n_docs, n_terms, *section_starts = HEADER.unpack_from(buffer, 0)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"{index_file} is not a binary inverted index.")
+
+    term_offsets, term_blob, postings_offsets, postings_blob = section_starts
+    return {
+        "path": index_file,
+        "buffer": buffer,
+        "n_docs": n_docs,
+        "n_terms": n_terms,
+        "term_offsets": term_offsets,
+        "term_blob": term_blob,
+        "postings_offsets": postings_offsets,
+        "postings_blob": postings_blob,
+    }
+
+
+def is_binary_index(index):
+    return isinstance(index.get("buffer"), mmap.mmap)
+
+
+def warm_binary_index(index):
+    # Pull every page of the mapping into the page cache. The pages are shared by
+    # every process that maps the file, so workers serving the same index do not
+    # each pay for their own copy.
+    buffer = index["buffer"]
+    if hasattr(mmap, 'MADV_WILLNEED'):
+        buffer.madvise(mmap.MADV_WILLNEED)
+    for offset in range(0, len(buffer), mmap.PAGESIZE):
+        buffer[offset]
+
+
+def read_table_entry(index, table_offsets, blob_start, number):
+    buffer = index["buffer"]
+    start = OFFSET.unpack_from(buffer, table_offsets + OFFSET.size * number)[0]
+    end = OFFSET.unpack_from(buffer, table_offsets + OFFSET.size * (number + 1))[0]
+    return buffer[blob_start + start:blob_start + end]
+
+
+def term_at(index, number):
+    return read_table_entry(index, index["term_offsets"], index["term_blob"], number)
+
+
+def find_term(index, word):
+    target = word.encode('utf-8')
+    low, high = 0, index["n_terms"]
+    while low < high:
+        middle = (low + high) // 2
+        if term_at(index, middle) < target:
+            low = middle + 1
+        else:
+            high = middle
+    if low < index["n_terms"] and term_at(index, low) == target:
+        return low
+    return -1
+
+
+def postings_block_offset(index, number):
+    buffer = index["buffer"]
+    return index["postings_blob"] + OFFSET.unpack_from(buffer, index["postings_offsets"] + OFFSET.size * number)[0]
+
+
+def read_term_list(index, number):
+    # The doc ids and frequencies of a term as arrays read in place from the
+    # mapping, in the skip list layout Query_Engine.intersection works on.
+    buffer = index["buffer"]
+    offset = postings_block_offset(index, number)
+    n_postings = COUNT.unpack_from(buffer, offset)[0]
+    doc_ids, offset = view_array(buffer, offset + COUNT.size, n_postings)
+    frequencies, offset = view_array(buffer, offset, n_postings)
+    position_starts, offset = view_array(buffer, offset, block_count(n_postings))
+    max_frequencies, offset = view_array(buffer, offset, block_count(n_postings))
+    min_lengths, offset = view_array(buffer, offset, block_count(n_postings))
+    return {"doc_ids": doc_ids, "skips": doc_ids[::POSTINGS_BLOCK_SIZE], "step": POSTINGS_BLOCK_SIZE,
+            "frequencies": frequencies, "max_frequencies": max_frequencies, "min_lengths": min_lengths,
+            "index": index, "position_starts": position_starts, "positions_offset": offset}
+
+
+def decode_positions(index, positions_offset, start, frequency):
+    # `start` is the number of positions stored before this posting in its block.
+    position_deltas, _ = unpack_array(index["buffer"], positions_offset, frequency, start)
+    return list(accumulate(position_deltas))
+
+
+def decode_postings(index, number):
+    term_list = read_term_list(index, number)
+    frequencies = term_list["frequencies"]
+    position_deltas, _ = unpack_array(index["buffer"], term_list["positions_offset"], sum(frequencies))
+
+    postings = []
+    start = 0
+    for doc_id, frequency in zip(term_list["doc_ids"], frequencies):
+        positions = list(accumulate(position_deltas[start:start + frequency]))
+        postings.append((doc_id, positions))
+        start += frequency
+    return postings
+
+
+def load_term_lists(index, words, term_lists):
+    # Returns an empty postings dict for every word of the index, to be filled by
+    # load_entries for the documents a query needs, and keeps the term lists of
+    # those words in term_lists, which callers may share between queries.
+    postings = {}
+    for word in set(words):
+        if word not in term_lists:
+            number = find_term(index, word)
+            if number < 0:
+                continue
+            term_lists[word] = read_term_list(index, number)
+        postings[word] = {}
+    return postings
+
+
+def load_entries(postings, term_list, docs):
+    # Adds the entries of `docs`, which must be in the term list, to postings read
+    # with load_term_lists: their frequency and where their positions are stored,
+    # for load_positions. Entries already in postings (every entry of a JSON
+    # index) are kept as they are.
+    step = term_list["step"]
+    for doc in docs:
+        if doc in postings:
+            continue
+        number = bisect_left(term_list["doc_ids"], doc)
+        block_start = number - number % step
+        start = term_list["position_starts"][number // step] + sum(term_list["frequencies"][block_start:number])
+        postings[doc] = {"frequency": term_list["frequencies"][number],
+                         "positions_at": (term_list["index"], term_list["positions_offset"], start)}
+
+
+def load_positions(postings, docs):
+    # Postings that already hold their positions (JSON indexes) are left as they are.
+    for doc in docs:
+        entry = postings[doc]
+        if "positions" not in entry:
+            entry["positions"] = decode_positions(*entry.pop("positions_at"), entry["frequency"])
+
+
+def iter_inverted_index(index):
+    for number in range(index["n_terms"]):
+        postings = decode_postings(index, number)
+        yield term_at(index, number).decode('utf-8'), [
+            [doc_id for doc_id, _ in postings],
+            [positions for _, positions in postings],
+            [len(positions) for _, positions in postings],
+        ]
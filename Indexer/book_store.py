@@ -0,0 +1,154 @@
+import os
+import re
+import struct
+import sys
+import zlib
+from array import array
+
+
+# Books are referred to everywhere by their .txt name. On disk a book is either
+# that plain UTF-8 file or, when stored compressed, <name>.txt.blk: the text
+# cut into BLOCK_SIZE-byte blocks deflated independently with zlib, then a
+# uint64 array with the file offset of every block plus the end of the last
+# one, then a fixed footer (magic, block size, text size, block count).
+# Blocks inflate one at a time, so a byte range of the text (a snippet) only
+# decompresses the blocks it overlaps, and the file can be written while the
+# download streams in.
+
+# The text of a Gutenberg book starts after its START OF marker line.
+START_OF_BOOK_PATTERN = re.compile(r'\*\*\* START OF .* \*\*\*')
+
+BOOK_STORAGE = os.environ.get('BOOK_STORAGE', 'raw')
+COMPRESSED_SUFFIX = '.blk'
+BLOCK_SIZE = 64 * 1024
+CHUNK_SIZE = 64 * 1024
+COMPRESSION_LEVEL = 6
+MAGIC = b'GBLK'
+FOOTER = struct.Struct('<4sIQQ')
+
+
+def list_book_names(directory):
+    names = set()
+    for filename in os.listdir(directory):
+        if filename.endswith(COMPRESSED_SUFFIX):
+            filename = filename[:-len(COMPRESSED_SUFFIX)]
+        if filename.endswith('.txt'):
+            names.add(filename)
+    return sorted(names)
+
+
+def stored_book_path(file_path):
+    for path in (file_path, file_path + COMPRESSED_SUFFIX):
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def write_book_file(chunks, output_file, compress=BOOK_STORAGE == 'compressed', block_size=BLOCK_SIZE):
+    with open(output_file, 'wb') as f:
+        if not compress:
+            for chunk in chunks:
+                f.write(chunk)
+            return
+
+        block_offsets = array('Q', [0])
+        buffer = bytearray()
+        text_size = 0
+
+        def write_block(block):
+            f.write(zlib.compress(block, COMPRESSION_LEVEL))
+            block_offsets.append(f.tell())
+
+        for chunk in chunks:
+            buffer += chunk
+            text_size += len(chunk)
+            while len(buffer) >= block_size:
+                write_block(bytes(buffer[:block_size]))
+                del buffer[:block_size]
+        if buffer:
+            write_block(bytes(buffer))
+
+        if sys.byteorder == 'big':
+            block_offsets.byteswap()
+        f.write(block_offsets.tobytes())
+        f.write(FOOTER.pack(MAGIC, block_size, text_size, len(block_offsets) - 1))
+
+
+def publish_book(temporary_file, file_path, compress=BOOK_STORAGE == 'compressed'):
+    stored_path, other_path = file_path, file_path + COMPRESSED_SUFFIX
+    if compress:
+        stored_path, other_path = other_path, stored_path
+    os.replace(temporary_file, stored_path)
+    if os.path.exists(other_path):
+        os.remove(other_path)
+    return stored_path
+
+
+def write_book(chunks, file_path, compress=BOOK_STORAGE == 'compressed', block_size=BLOCK_SIZE):
+    temporary_file = f'{file_path}.tmp'
+    write_book_file(chunks, temporary_file, compress, block_size)
+    return publish_book(temporary_file, file_path, compress)
+
+
+def read_block_table(f):
+    f.seek(-FOOTER.size, os.SEEK_END)
+    magic, block_size, text_size, block_count = FOOTER.unpack(f.read(FOOTER.size))
+    if magic != MAGIC:
+        raise ValueError(f"Not a compressed book: {f.name}")
+
+    block_offsets = array('Q')
+    f.seek(-FOOTER.size - block_offsets.itemsize * (block_count + 1), os.SEEK_END)
+    block_offsets.frombytes(f.read(block_offsets.itemsize * (block_count + 1)))
+    if sys.byteorder == 'big':
+        block_offsets.byteswap()
+    return block_size, text_size, block_offsets
+
+
+def open_stored_book(file_path):
+    stored_path = stored_book_path(file_path)
+    if stored_path is None:
+        raise FileNotFoundError(f"Book not found: {file_path}")
+    return open(stored_path, 'rb'), stored_path.endswith(COMPRESSED_SUFFIX)
+
+
+def read_book_bytes(file_path, start=0, end=None):
+    f, compressed = open_stored_book(file_path)
+    with f:
+        if not compressed:
+            f.seek(start)
+            return f.read() if end is None else f.read(max(0, end - start))
+
+        block_size, text_size, block_offsets = read_block_table(f)
+        end = text_size if end is None else min(end, text_size)
+        if start >= end:
+            return b''
+
+        first_block, last_block = start // block_size, (end - 1) // block_size
+        f.seek(block_offsets[first_block])
+        compressed_blocks = f.read(block_offsets[last_block + 1] - block_offsets[first_block])
+
+        text = bytearray()
+        base = block_offsets[first_block]
+        for block in range(first_block, last_block + 1):
+            text += zlib.decompress(compressed_blocks[block_offsets[block] - base:block_offsets[block + 1] - base])
+
+    skipped = start - first_block * block_size
+    return bytes(text[skipped:skipped + end - start])
+
+
+def read_book(file_path):
+    return read_book_bytes(file_path).decode('utf-8')
+
+
+def iter_book_chunks(file_path):
+    f, compressed = open_stored_book(file_path)
+    with f:
+        if not compressed:
+            while chunk := f.read(CHUNK_SIZE):
+                yield chunk
+            return
+
+        _, _, block_offsets = read_block_table(f)
+        for block in range(len(block_offsets) - 1):
+            f.seek(block_offsets[block])
+            yield zlib.decompress(f.read(block_offsets[block + 1] - block_offsets[block]))
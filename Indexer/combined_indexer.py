@@ -0,0 +1,131 @@
+import os
+import tempfile
+
+from Indexer.binary_index import export_inverted_index_binary, write_inverted_index_binary
+from Indexer.datamart_versions import new_datamart_version
+from Indexer.doc_table import assign_doc_id, compute_document_lengths, doc_ids_by_name
+from Indexer.metadata_indexer import load_books_from_directory, export_metadata_rows
+from Indexer.sorted_runs import build_sorted_runs, merge_sorted_runs
+from Indexer.tree_indexer import export_inverted_index_to_binary_by_letter, export_inverted_index_to_json_by_letter, \
+    remove_letter_shard, tee_letter_shards
+from Indexer.unique_json_indexer import build_inverted_index_with_positions, export_document_lengths, \
+    export_inverted_index_json, write_inverted_index_json
+
+
+INDEX_FORMAT = os.environ.get('INDEX_FORMAT', 'binary')
+INDEXER_MEMORY_LIMIT = int(os.environ.get('INDEXER_MEMORY_LIMIT', 0))
+
+
+def split_books_and_metadata(books, metadata_rows, doc_table):
+    doc_ids = doc_ids_by_name(doc_table)
+    for filename, book_content, metadata in books:
+        doc_id = assign_doc_id(doc_table, doc_ids, filename)
+        metadata['doc_id'] = doc_id
+        metadata_rows.append(metadata)
+        if book_content is not None:
+            yield doc_id, book_content
+
+
+def build_combined_index(books_directory, offsets_directory=None):
+    metadata_rows = []
+    doc_table = []
+    books = load_books_from_directory(books_directory, offsets_directory)
+    documents = split_books_and_metadata(books, metadata_rows, doc_table)
+    inverted_index = build_inverted_index_with_positions(documents)
+    return inverted_index, metadata_rows, doc_table
+
+
+def build_combined_runs(books_directory, run_directory, memory_limit, offsets_directory=None,
+                        document_lengths=None):
+    # Like build_combined_index, but spills the index to sorted runs whenever the
+    # books read since the last run reach memory_limit (see Indexer.sorted_runs).
+    metadata_rows = []
+    doc_table = []
+    books = load_books_from_directory(books_directory, offsets_directory)
+    documents = split_books_and_metadata(books, metadata_rows, doc_table)
+    run_files = build_sorted_runs(documents, run_directory, memory_limit, build_inverted_index_with_positions,
+                                  document_lengths)
+    return run_files, metadata_rows, doc_table
+
+
+def export_datamarts(inverted_index, metadata_rows, doc_table, datamarts_directory):
+    tree_directory = os.path.join(datamarts_directory, 'Inverted Index', 'Tree Data Structure')
+    word_level_json = os.path.join(datamarts_directory, 'Inverted Index', 'word_level.json')
+    word_level_binary = os.path.join(datamarts_directory, 'Inverted Index', 'word_level.bin')
+    doc_table_file = os.path.join(datamarts_directory, 'Inverted Index', 'doc_table.json')
+    metadata_file = os.path.join(datamarts_directory, 'Metadata Database', 'book_metadata.csv')
+
+    for directory in (tree_directory, os.path.dirname(metadata_file)):
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+    document_lengths = compute_document_lengths(inverted_index)
+    if INDEX_FORMAT == 'json':
+        export_inverted_index_to_json_by_letter(inverted_index, tree_directory)
+        export_inverted_index_json(inverted_index, word_level_json)
+    else:
+        export_inverted_index_to_binary_by_letter(inverted_index, tree_directory, document_lengths)
+        export_inverted_index_binary(inverted_index, word_level_binary, document_lengths)
+    export_document_lengths(doc_table, document_lengths, doc_table_file)
+    export_metadata_rows(metadata_rows, metadata_file)
+
+
+def export_sorted_datamarts(entries, metadata_rows, doc_table, document_lengths, datamarts_directory,
+                            affected_letters=None):
+    # Streams word-sorted entries into the word-level index and the letter shards.
+    # document_lengths holds the length of every document in the entries.
+    # With affected_letters, only those shards are rewritten, or removed once no
+    # words are left. The set may still grow while the entries are consumed: a
+    # letter is only written after the entries have moved past it.
+    tree_directory = os.path.join(datamarts_directory, 'Inverted Index', 'Tree Data Structure')
+    word_level_json = os.path.join(datamarts_directory, 'Inverted Index', 'word_level.json')
+    word_level_binary = os.path.join(datamarts_directory, 'Inverted Index', 'word_level.bin')
+    doc_table_file = os.path.join(datamarts_directory, 'Inverted Index', 'doc_table.json')
+    metadata_file = os.path.join(datamarts_directory, 'Metadata Database', 'book_metadata.csv')
+
+    for directory in (tree_directory, os.path.dirname(metadata_file)):
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+    indexed_letters = set()
+
+    def write_letter(letter, letter_index):
+        indexed_letters.add(letter)
+        if affected_letters is not None and letter not in affected_letters:
+            return
+        if INDEX_FORMAT == 'json':
+            export_inverted_index_to_json_by_letter(letter_index, tree_directory)
+        else:
+            export_inverted_index_to_binary_by_letter(letter_index, tree_directory, document_lengths)
+
+    entries = tee_letter_shards(entries, write_letter)
+    if INDEX_FORMAT == 'json':
+        write_inverted_index_json(entries, word_level_json)
+    else:
+        write_inverted_index_binary(entries, word_level_binary, document_lengths)
+
+    for letter in (affected_letters or set()) - indexed_letters - {''}:
+        remove_letter_shard(letter, tree_directory)
+
+    export_document_lengths(doc_table, document_lengths, doc_table_file)
+    export_metadata_rows(metadata_rows, metadata_file)
+
+
+if __name__ == "__main__":
+    books_directory = 'Datalake/eventstore/Gutenbrg'
+
+    with new_datamart_version('Datamarts', carry_over=False) as datamart_directory:
+        offsets_directory = os.path.join(datamart_directory, 'Snippet Offsets')
+        os.makedirs(offsets_directory)
+
+        if INDEXER_MEMORY_LIMIT:
+            with tempfile.TemporaryDirectory() as run_directory:
+                document_lengths = {}
+                run_files, metadata_rows, doc_table = build_combined_runs(books_directory, run_directory,
+                                                                          INDEXER_MEMORY_LIMIT, offsets_directory,
+                                                                          document_lengths)
+                export_sorted_datamarts(merge_sorted_runs(run_files), metadata_rows, doc_table, document_lengths,
+                                        datamart_directory)
+        else:
+            inverted_index, metadata_rows, doc_table = build_combined_index(books_directory, offsets_directory)
+            export_datamarts(inverted_index, metadata_rows, doc_table, datamart_directory)
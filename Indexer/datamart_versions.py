@@ -0,0 +1,140 @@
+import os
+import shutil
+import time
+from contextlib import contextmanager
+
+
+# Every build is written to Datamarts/versions/<version> and published by
+# atomically replacing Datamarts/CURRENT, a one-line file naming the version the
+# query engines should read. A new version starts as hard links to the files of
+# the current one, so an incremental build only writes what it changes; every
+# datamart writer goes through atomic_write, which replaces a file instead of
+# writing into it, so the linked files of a published version never change.
+# Without a CURRENT file the datamarts are read from Datamarts/ itself, the
+# layout used before versions existed.
+
+DATAMARTS_DIRECTORY = 'Datamarts'
+VERSIONS_DIRECTORY = 'versions'
+CURRENT_POINTER = 'CURRENT'
+DATAMART_CONTENTS = ['Inverted Index', 'Metadata Database', 'Snippet Offsets', 'manifest.json']
+DATAMART_VERSIONS_KEPT = int(os.environ.get('DATAMART_VERSIONS_KEPT', 3))
+INDEX_FILE_SUFFIXES = ('.bin', '.json')
+
+
+@contextmanager
+def atomic_write(output_file, mode='w', **kwargs):
+    temporary_file = f'{output_file}.tmp'
+    try:
+        with open(temporary_file, mode, **kwargs) as f:
+            yield f
+    except BaseException:
+        if os.path.exists(temporary_file):
+            os.remove(temporary_file)
+        raise
+    os.replace(temporary_file, output_file)
+
+
+def remove_other_index_format(index_file):
+    # The query engines prefer a .bin index over the .json one next to it, so a
+    # writer of one format removes the other; a carried-over file in the format
+    # a datamart used before would otherwise hide the index just written.
+    stem, suffix = os.path.splitext(index_file)
+    for other_suffix in INDEX_FILE_SUFFIXES:
+        if other_suffix != suffix and os.path.exists(stem + other_suffix):
+            os.remove(stem + other_suffix)
+
+
+def current_version(datamarts_directory=DATAMARTS_DIRECTORY):
+    try:
+        with open(os.path.join(datamarts_directory, CURRENT_POINTER), 'r', encoding='utf-8') as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def version_directory(datamarts_directory, version):
+    return os.path.join(datamarts_directory, VERSIONS_DIRECTORY, version)
+
+
+def current_datamart_directory(datamarts_directory=DATAMARTS_DIRECTORY):
+    version = current_version(datamarts_directory)
+    return datamarts_directory if version is None else version_directory(datamarts_directory, version)
+
+
+def link_files(source, destination):
+    if os.path.isfile(source):
+        try:
+            os.link(source, destination)
+        except OSError:
+            shutil.copy2(source, destination)
+        return
+
+    for root, _, filenames in os.walk(source):
+        target_root = os.path.join(destination, os.path.relpath(root, source))
+        os.makedirs(target_root, exist_ok=True)
+        for filename in filenames:
+            if not filename.endswith('.tmp'):
+                link_files(os.path.join(root, filename), os.path.join(target_root, filename))
+
+
+def fsync_directory(directory):
+    if os.name == 'nt':
+        return
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def fsync_tree(directory):
+    for root, _, filenames in os.walk(directory):
+        for filename in filenames:
+            fd = os.open(os.path.join(root, filename), os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        fsync_directory(root)
+
+
+def publish_version(datamarts_directory, version):
+    fsync_tree(version_directory(datamarts_directory, version))
+    fsync_directory(os.path.join(datamarts_directory, VERSIONS_DIRECTORY))
+
+    with atomic_write(os.path.join(datamarts_directory, CURRENT_POINTER), 'w', encoding='utf-8') as f:
+        f.write(version)
+        f.flush()
+        os.fsync(f.fileno())
+    fsync_directory(datamarts_directory)
+
+
+def prune_versions(datamarts_directory, kept=DATAMART_VERSIONS_KEPT):
+    versions_directory = os.path.join(datamarts_directory, VERSIONS_DIRECTORY)
+    current = current_version(datamarts_directory)
+    versions = sorted(version for version in os.listdir(versions_directory) if version != current)
+    for version in versions[:max(0, len(versions) - kept + 1)]:
+        shutil.rmtree(os.path.join(versions_directory, version), ignore_errors=True)
+
+
+@contextmanager
+def new_datamart_version(datamarts_directory=DATAMARTS_DIRECTORY, carry_over=True):
+    # Yields the directory of a new version, seeded with the current files when
+    # carry_over is set; it is published if the block completes and removed if not.
+    previous_directory = current_datamart_directory(datamarts_directory)
+    version = str(time.time_ns())
+    directory = version_directory(datamarts_directory, version)
+    os.makedirs(directory)
+
+    try:
+        if carry_over:
+            for name in DATAMART_CONTENTS:
+                if os.path.exists(os.path.join(previous_directory, name)):
+                    link_files(os.path.join(previous_directory, name), os.path.join(directory, name))
+        yield directory
+    except BaseException:
+        shutil.rmtree(directory, ignore_errors=True)
+        raise
+
+    publish_version(datamarts_directory, version)
+    prune_versions(datamarts_directory)
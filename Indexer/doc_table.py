@@ -0,0 +1,75 @@
+import json
+
+from Indexer.datamart_versions import atomic_write
+
+
+# Every postings list in the datamarts refers to books by an integer doc id.
+# The doc table is a JSON list where entry i describes doc id i: the book
+# filename and its number of indexed tokens. A build into an empty datamart
+# numbers the books in sorted filename order; every other build starts from
+# the doc table of the version it replaces, keeps existing ids, appends new
+# books and leaves deleted ones as null so no other id moves. Datamarts a
+# build does not rewrite are carried over from that version and still use
+# its ids.
+
+
+def new_doc_table(names):
+    return [{"document": name, "length": 0} for name in names]
+
+
+def load_doc_table(doc_table_file):
+    try:
+        with open(doc_table_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+def export_doc_table(doc_table, output_file):
+    with atomic_write(output_file, 'w', encoding='utf-8') as f:
+        json.dump(doc_table, f, ensure_ascii=False)
+
+
+def doc_ids_by_name(doc_table):
+    return {entry["document"]: doc_id for doc_id, entry in enumerate(doc_table) if entry is not None}
+
+
+def assign_doc_id(doc_table, doc_ids, name):
+    doc_id = doc_ids.get(name)
+    if doc_id is None:
+        doc_id = doc_ids[name] = len(doc_table)
+        doc_table.append({"document": name, "length": 0})
+    return doc_id
+
+
+def number_documents(documents, doc_table):
+    doc_ids = doc_ids_by_name(doc_table)
+    for name, text in documents:
+        yield assign_doc_id(doc_table, doc_ids, name), text
+
+
+def remove_from_doc_table(doc_table, names):
+    removed = set()
+    for doc_id, entry in enumerate(doc_table):
+        if entry is not None and entry["document"] in names:
+            doc_table[doc_id] = None
+            removed.add(doc_id)
+    return removed
+
+
+def compute_document_lengths(inverted_index):
+    document_lengths = {}
+    for doc_ids, _, frequencies in inverted_index.values():
+        for doc_id, frequency in zip(doc_ids, frequencies):
+            document_lengths[doc_id] = document_lengths.get(doc_id, 0) + frequency
+    return document_lengths
+
+
+def get_document_lengths(doc_table):
+    return {doc_id: entry["length"] for doc_id, entry in enumerate(doc_table) if entry is not None}
+
+
+def set_document_lengths(doc_table, document_lengths):
+    for doc_id, entry in enumerate(doc_table):
+        if entry is not None:
+            entry["length"] = document_lengths.get(doc_id, 0)
@@ -0,0 +1,42 @@
+import os
+
+import spacy
+
+
+LANGUAGES = ['en', 'es', 'fr', 'it', 'de', 'pt']
+STOP_WORDS_MODULE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'stop_words.py')
+
+
+def collect_stop_words(languages):
+    stop_words = set()
+    for language in languages:
+        stop_words = stop_words.union(spacy.util.get_lang_class(language).Defaults.stop_words)
+    return stop_words
+
+
+def wrap_literals(literals, width=116):
+    lines, line = [], ''
+    for literal in literals:
+        if line and len(line) + len(literal) + 1 > width:
+            lines.append(line)
+            line = ''
+        line = f'{line} {literal}' if line else literal
+    if line:
+        lines.append(line)
+    return lines
+
+
+def write_stop_words_module(stop_words, output_file):
+    lines = wrap_literals(repr(word) + ',' for word in sorted(stop_words))
+    body = '\n'.join('    ' + line for line in lines)
+
+    with open(output_file, 'w', encoding='utf-8') as f:
+        f.write(f"# Generated by Indexer/generate_stop_words.py from the spaCy stop word lists for "
+                f"{', '.join(LANGUAGES)}.\n# Do not edit by hand; rerun the generator instead.\n\n")
+        f.write("STOP_WORDS = frozenset({\n")
+        f.write(body)
+        f.write("\n})\n")
+
+
+if __name__ == "__main__":
+    write_stop_words_module(collect_stop_words(LANGUAGES), STOP_WORDS_MODULE)
@@ -0,0 +1,270 @@
+import csv
+import json
+import os
+import tempfile
+
+from Indexer.binary_index import open_binary_index, iter_inverted_index, export_inverted_index_binary
+from Indexer.book_store import list_book_names, stored_book_path
+from Indexer.combined_indexer import build_combined_index, build_combined_runs, export_datamarts, \
+    export_sorted_datamarts, split_books_and_metadata
+from Indexer.datamart_versions import current_datamart_directory, new_datamart_version
+from Indexer.doc_table import compute_document_lengths, get_document_lengths, load_doc_table, doc_ids_by_name, \
+    remove_from_doc_table
+from Indexer.metadata_indexer import read_books_with_metadata, export_metadata_rows
+from Indexer.sorted_runs import build_sorted_runs, merge_sorted_entries, merge_sorted_runs
+from Indexer.tree_indexer import (export_inverted_index_to_binary_by_letter, export_inverted_index_to_json_by_letter,
+                                  get_first_letter, remove_letter_shard, split_inverted_index_by_letter)
+from Indexer.unique_json_indexer import build_inverted_index_with_positions, export_document_lengths, \
+    export_inverted_index_json, read_inverted_index_json
+
+
+INDEX_FORMAT = os.environ.get('INDEX_FORMAT', 'binary')
+INDEXER_MEMORY_LIMIT = int(os.environ.get('INDEXER_MEMORY_LIMIT', 0))
+
+
+def scan_books(directory):
+    books = {}
+    for filename in list_book_names(directory):
+        stat = os.stat(stored_book_path(os.path.join(directory, filename)))
+        books[filename] = {"size": stat.st_size, "mtime": stat.st_mtime_ns}
+    return books
+
+
+def load_manifest(manifest_file):
+    try:
+        with open(manifest_file, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+
+def save_manifest(manifest, manifest_file):
+    temporary_file = f'{manifest_file}.tmp'
+    with open(temporary_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False)
+    os.replace(temporary_file, manifest_file)
+
+
+def diff_manifest(previous, current):
+    changed = sorted(filename for filename, entry in current.items() if previous.get(filename) != entry)
+    deleted = sorted(filename for filename in previous if filename not in current)
+    return changed, deleted
+
+
+def is_readable_word_level_index(binary_file):
+    # An index written in an older binary format is rebuilt from the books.
+    try:
+        open_binary_index(binary_file)
+    except FileNotFoundError:
+        return True
+    except ValueError:
+        return False
+    return True
+
+
+def load_word_level_index(binary_file, json_file):
+    if os.path.exists(binary_file):
+        return dict(iter_inverted_index(open_binary_index(binary_file)))
+
+    if not os.path.exists(json_file):
+        return {}
+
+    formatted_inverted_index = read_inverted_index_json(json_file)
+
+    inverted_index = {}
+    for word, documents in formatted_inverted_index.items():
+        inverted_index[word] = [
+            list(documents),
+            [entry["positions"] for entry in documents.values()],
+            [entry["frequency"] for entry in documents.values()],
+        ]
+    return inverted_index
+
+
+def iter_word_level_index(binary_file, json_file):
+    # Entries sorted by word, as merge_sorted_entries expects. A binary index is
+    # decoded one term at a time; a JSON index has to be read whole.
+    if os.path.exists(binary_file):
+        return iter_inverted_index(open_binary_index(binary_file))
+
+    inverted_index = load_word_level_index(binary_file, json_file)
+    return ((word, inverted_index[word]) for word in sorted(inverted_index))
+
+
+def remove_documents(inverted_index, removed_doc_ids):
+    affected_words = set()
+
+    for word in list(inverted_index):
+        doc_ids, positions, frequencies = inverted_index[word]
+        kept = [i for i, doc_id in enumerate(doc_ids) if doc_id not in removed_doc_ids]
+        if len(kept) == len(doc_ids):
+            continue
+
+        affected_words.add(word)
+        if kept:
+            inverted_index[word] = [[doc_ids[i] for i in kept], [positions[i] for i in kept],
+                                    [frequencies[i] for i in kept]]
+        else:
+            del inverted_index[word]
+
+    return affected_words
+
+
+def remove_documents_from_entries(entries, removed_doc_ids, affected_letters):
+    for word, (doc_ids, positions, frequencies) in entries:
+        kept = [i for i, doc_id in enumerate(doc_ids) if doc_id not in removed_doc_ids]
+        if len(kept) < len(doc_ids):
+            affected_letters.add(get_first_letter(word))
+            if not kept:
+                continue
+            doc_ids, positions, frequencies = [doc_ids[i] for i in kept], [positions[i] for i in kept], \
+                [frequencies[i] for i in kept]
+        yield word, [doc_ids, positions, frequencies]
+
+
+def mark_affected_letters(entries, affected_letters):
+    for word, postings in entries:
+        affected_letters.add(get_first_letter(word))
+        yield word, postings
+
+
+def merge_inverted_index(inverted_index, partial_index):
+    for word, postings in partial_index.items():
+        if word not in inverted_index:
+            inverted_index[word] = [[], [], []]
+        for merged, partial in zip(inverted_index[word], postings):
+            merged.extend(partial)
+    return set(partial_index)
+
+
+def load_metadata_rows(metadata_file):
+    try:
+        with open(metadata_file, 'r', encoding='utf-8') as f:
+            return list(csv.DictReader(f))
+    except FileNotFoundError:
+        return []
+
+
+def export_tree_letters(inverted_index, letters, base_directory, document_lengths=None):
+    letter_indexes = split_inverted_index_by_letter(inverted_index)
+
+    for letter in letters:
+        letter_index = letter_indexes.get(letter, {})
+        if not letter_index:
+            remove_letter_shard(letter, base_directory)
+        elif INDEX_FORMAT == 'json':
+            export_inverted_index_to_json_by_letter(letter_index, base_directory)
+        else:
+            export_inverted_index_to_binary_by_letter(letter_index, base_directory, document_lengths)
+
+
+def rebuild_datamarts(books_directory, datamart_directory):
+    offsets_directory = os.path.join(datamart_directory, 'Snippet Offsets')
+    if not os.path.exists(offsets_directory):
+        os.makedirs(offsets_directory)
+
+    if INDEXER_MEMORY_LIMIT:
+        with tempfile.TemporaryDirectory() as run_directory:
+            document_lengths = {}
+            run_files, metadata_rows, doc_table = build_combined_runs(books_directory, run_directory,
+                                                                      INDEXER_MEMORY_LIMIT, offsets_directory,
+                                                                      document_lengths)
+            export_sorted_datamarts(merge_sorted_runs(run_files), metadata_rows, doc_table, document_lengths,
+                                    datamart_directory)
+        return
+
+    inverted_index, metadata_rows, doc_table = build_combined_index(books_directory, offsets_directory)
+    export_datamarts(inverted_index, metadata_rows, doc_table, datamart_directory)
+
+
+def update_datamarts(books_directory, datamart_directory, changed, deleted):
+    tree_directory = os.path.join(datamart_directory, 'Inverted Index', 'Tree Data Structure')
+    word_level_json = os.path.join(datamart_directory, 'Inverted Index', 'word_level.json')
+    word_level_binary = os.path.join(datamart_directory, 'Inverted Index', 'word_level.bin')
+    doc_table_file = os.path.join(datamart_directory, 'Inverted Index', 'doc_table.json')
+    metadata_file = os.path.join(datamart_directory, 'Metadata Database', 'book_metadata.csv')
+    offsets_directory = os.path.join(datamart_directory, 'Snippet Offsets')
+
+    for directory in (tree_directory, os.path.dirname(metadata_file), offsets_directory):
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+    doc_table = load_doc_table(doc_table_file)
+    metadata_rows = load_metadata_rows(metadata_file)
+
+    stale_documents = set(changed) | set(deleted)
+    doc_ids = doc_ids_by_name(doc_table)
+    removed_doc_ids = {doc_ids[name] for name in stale_documents if name in doc_ids}
+    remove_from_doc_table(doc_table, set(deleted))
+    metadata_rows = [row for row in metadata_rows if row.get('document') not in stale_documents]
+
+    for filename in stale_documents:
+        offsets_file = os.path.join(offsets_directory, f'{filename}.off')
+        if os.path.exists(offsets_file):
+            os.remove(offsets_file)
+
+    books = read_books_with_metadata(books_directory, changed, offsets_directory)
+    documents = split_books_and_metadata(books, metadata_rows, doc_table)
+
+    if INDEXER_MEMORY_LIMIT:
+        # The current index is streamed term by term and merged with sorted runs
+        # of the changed books instead of being loaded into memory.
+        with tempfile.TemporaryDirectory() as run_directory:
+            document_lengths = {doc_id: length for doc_id, length in get_document_lengths(doc_table).items()
+                                if doc_id not in removed_doc_ids}
+            run_files = build_sorted_runs(documents, run_directory, INDEXER_MEMORY_LIMIT,
+                                          build_inverted_index_with_positions, document_lengths)
+            affected_letters = set()
+            previous_entries = remove_documents_from_entries(iter_word_level_index(word_level_binary, word_level_json),
+                                                             removed_doc_ids, affected_letters)
+            new_entries = mark_affected_letters(merge_sorted_runs(run_files), affected_letters)
+            export_sorted_datamarts(merge_sorted_entries([previous_entries, new_entries]), metadata_rows, doc_table,
+                                    document_lengths, datamart_directory, affected_letters)
+        return
+
+    inverted_index = load_word_level_index(word_level_binary, word_level_json)
+    affected_words = remove_documents(inverted_index, removed_doc_ids)
+    affected_words |= merge_inverted_index(inverted_index, build_inverted_index_with_positions(documents))
+
+    affected_letters = {get_first_letter(word) for word in affected_words} - {''}
+    document_lengths = compute_document_lengths(inverted_index)
+    export_tree_letters(inverted_index, affected_letters, tree_directory, document_lengths)
+    if INDEX_FORMAT == 'json':
+        export_inverted_index_json(inverted_index, word_level_json)
+    else:
+        export_inverted_index_binary(inverted_index, word_level_binary, document_lengths)
+    export_document_lengths(doc_table, document_lengths, doc_table_file)
+    export_metadata_rows(metadata_rows, metadata_file)
+
+
+def run_incremental_index(books_directory, datamarts_directory):
+    # Each run that finds changes builds a new datamart version from links to the
+    # current one and publishes it only once every file has been written.
+    previous_directory = current_datamart_directory(datamarts_directory)
+    previous_manifest = load_manifest(os.path.join(previous_directory, 'manifest.json'))
+    current_manifest = scan_books(books_directory)
+    changed, deleted = diff_manifest(previous_manifest, current_manifest)
+
+    readable = is_readable_word_level_index(os.path.join(previous_directory, 'Inverted Index', 'word_level.bin'))
+
+    if not changed and not deleted and readable:
+        return changed, deleted
+
+    full_rebuild = not readable or not previous_manifest or \
+        not load_doc_table(os.path.join(previous_directory, 'Inverted Index', 'doc_table.json'))
+
+    with new_datamart_version(datamarts_directory, carry_over=not full_rebuild) as datamart_directory:
+        if full_rebuild:
+            rebuild_datamarts(books_directory, datamart_directory)
+        else:
+            update_datamarts(books_directory, datamart_directory, changed, deleted)
+        save_manifest(current_manifest, os.path.join(datamart_directory, 'manifest.json'))
+
+    return changed, deleted
+
+
+if __name__ == "__main__":
+    books_directory = 'Datalake/eventstore/Gutenbrg'
+
+    changed, deleted = run_incremental_index(books_directory, 'Datamarts')
+    print(f"Indexed {len(changed)} new or changed books, removed {len(deleted)} deleted books.")
@@ -2,6 +2,14 @@ import os
 import re
 import csv
 
+from Indexer.book_store import START_OF_BOOK_PATTERN, list_book_names, read_book
+from Indexer.datamart_versions import atomic_write, new_datamart_version
+from Indexer.doc_table import assign_doc_id, doc_ids_by_name, export_doc_table, load_doc_table
+from Indexer.snippet_offsets import write_token_offsets
+
+
+METADATA_FIELDS = ['title', 'author', 'release_date', 'language', 'document', 'doc_id']
+
 
 def extract_metadata(text):
     text = re.sub(r'\[.*?]', '', text)
@@ -22,47 +30,68 @@ def extract_metadata(text):
     return metadata
 
 
-def load_books_from_directory(directory):
-    documents = []
-    book_metadata = []
+def read_books_with_metadata(directory, filenames, offsets_directory=None):
+    for filename in filenames:
+        file_path = os.path.join(directory, filename)
+        content = read_book(file_path)
 
-    for filename in os.listdir(directory):
-        if filename.endswith('.txt'):
-            file_path = os.path.join(directory, filename)
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+        metadata = extract_metadata(content)
+        metadata['document'] = filename
 
-                metadata = extract_metadata(content)
+        start_content = START_OF_BOOK_PATTERN.search(content)
+        book_content = content[start_content.end():].strip() if start_content else None
 
-                start_content = re.search(r'\*\*\* START OF .* \*\*\*', content)
-                if start_content:
-                    book_content = content[start_content.end():].strip()
-                    documents.append((filename, book_content))
+        if start_content and offsets_directory:
+            write_token_offsets(content, start_content.end(), os.path.join(offsets_directory, f'{filename}.off'))
 
-                metadata['document'] = filename
-                book_metadata.append(metadata)
+        yield filename, book_content, metadata
 
-    return documents, book_metadata
+
+def load_books_from_directory(directory, offsets_directory=None):
+    return read_books_with_metadata(directory, list_book_names(directory), offsets_directory)
 
 
 def export_metadata_to_csv(metadata, output_file):
-    keys = metadata[0].keys()
-    with open(output_file, 'w', newline='', encoding='utf-8') as output_csv:
+    rows = iter(metadata)
+    first_row = next(rows)
+    keys = first_row.keys()
+    with atomic_write(output_file, 'w', newline='', encoding='utf-8') as output_csv:
         dict_writer = csv.DictWriter(output_csv, fieldnames=keys)
         dict_writer.writeheader()
-        dict_writer.writerows(metadata)
+        dict_writer.writerow(first_row)
+        dict_writer.writerows(rows)
+
 
+def export_metadata_rows(rows, output_file):
+    with atomic_write(output_file, 'w', newline='', encoding='utf-8') as output_csv:
+        dict_writer = csv.DictWriter(output_csv, fieldnames=METADATA_FIELDS, restval='', extrasaction='ignore')
+        dict_writer.writeheader()
+        dict_writer.writerows(rows)
 
-def process_metadata(books_directory, metadata_output_file):
-    documents, metadata = load_books_from_directory(books_directory)
+
+def number_metadata(books, doc_table):
+    doc_ids = doc_ids_by_name(doc_table)
+    for filename, _, metadata in books:
+        metadata['doc_id'] = assign_doc_id(doc_table, doc_ids, filename)
+        yield metadata
+
+
+def process_metadata(books_directory, metadata_output_file, doc_table=None):
+    doc_table = [] if doc_table is None else doc_table
+    metadata = number_metadata(load_books_from_directory(books_directory), doc_table)
     export_metadata_to_csv(metadata, metadata_output_file)
+    return doc_table
 
 
 if __name__ == "__main__":
-
-    if not os.path.exists('Datamarts/Metadata Database'):
-        os.makedirs('Datamarts/Metadata Database')
     books_directory = 'Datalake/eventstore/Gutenbrg'
-    metadata_output_file = 'Datamarts/Metadata Database/book_metadata.csv'
 
-    process_metadata(books_directory, metadata_output_file)
+    with new_datamart_version('Datamarts') as datamart_directory:
+        os.makedirs(os.path.join(datamart_directory, 'Metadata Database'), exist_ok=True)
+        os.makedirs(os.path.join(datamart_directory, 'Inverted Index'), exist_ok=True)
+        metadata_output_file = os.path.join(datamart_directory, 'Metadata Database', 'book_metadata.csv')
+        doc_table_file = os.path.join(datamart_directory, 'Inverted Index', 'doc_table.json')
+
+        # Books new to the doc table get ids here, so the table is published too.
+        doc_table = process_metadata(books_directory, metadata_output_file, load_doc_table(doc_table_file))
+        export_doc_table(doc_table, doc_table_file)
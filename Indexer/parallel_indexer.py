@@ -0,0 +1,86 @@
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+
+from Indexer.binary_index import write_inverted_index_binary
+from Indexer.book_store import list_book_names
+from Indexer.datamart_versions import new_datamart_version
+from Indexer.doc_table import assign_doc_id, compute_document_lengths, doc_ids_by_name, load_doc_table
+from Indexer.tree_indexer import export_inverted_index_to_binary_by_letter, export_inverted_index_to_json_by_letter, \
+    group_sorted_entries_by_letter
+from Indexer.sorted_runs import write_sorted_run, merge_sorted_runs
+from Indexer.unique_json_indexer import build_inverted_index_with_positions, write_inverted_index_json, read_books, \
+    strip_gutenberg_header, export_document_lengths
+
+
+INDEXER_WORKERS = int(os.environ.get('INDEXER_WORKERS', os.cpu_count() or 1))
+BOOKS_PER_RUN = int(os.environ.get('BOOKS_PER_RUN', 250))
+INDEX_FORMAT = os.environ.get('INDEX_FORMAT', 'binary')
+
+
+def list_book_files(directory):
+    return [os.path.join(directory, filename) for filename in list_book_names(directory)]
+
+
+def index_shard(file_paths, doc_ids, run_file):
+    books = ((doc_id, text) for doc_id, (_, text) in zip(doc_ids, read_books(file_paths)))
+    inverted_index = build_inverted_index_with_positions(strip_gutenberg_header(books))
+    write_sorted_run(inverted_index, run_file)
+    return run_file, compute_document_lengths(inverted_index)
+
+
+def build_sorted_runs_parallel(file_paths, run_directory, doc_ids=None, workers=INDEXER_WORKERS,
+                               books_per_run=BOOKS_PER_RUN, document_lengths=None):
+    doc_ids = list(range(len(file_paths))) if doc_ids is None else doc_ids
+    starts = range(0, len(file_paths), books_per_run)
+    shards = [file_paths[i:i + books_per_run] for i in starts]
+    shard_doc_ids = [doc_ids[i:i + books_per_run] for i in starts]
+    run_files = [os.path.join(run_directory, f'run_{number:05d}.jsonl') for number in range(len(shards))]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for _, shard_lengths in executor.map(index_shard, shards, shard_doc_ids, run_files):
+            if document_lengths is not None:
+                document_lengths.update(shard_lengths)
+    return run_files
+
+
+def build_inverted_index_parallel(books_directory, workers=INDEXER_WORKERS, books_per_run=BOOKS_PER_RUN):
+    with tempfile.TemporaryDirectory() as run_directory:
+        run_files = build_sorted_runs_parallel(list_book_files(books_directory), run_directory, None, workers,
+                                               books_per_run)
+        return dict(merge_sorted_runs(run_files))
+
+
+if __name__ == "__main__":
+    books_directory = 'Datalake/eventstore/Gutenbrg'
+
+    file_paths = list_book_files(books_directory)
+
+    with new_datamart_version('Datamarts') as datamart_directory, tempfile.TemporaryDirectory() as run_directory:
+        INVERTED_INDEX_TREE_STRUCTURE_REPOSITORY = os.path.join(datamart_directory, 'Inverted Index', 'Tree Data Structure')
+        INVERTED_INDEX_WORD_LEVEL_REPOSITORY = os.path.join(datamart_directory, 'Inverted Index', 'word_level.json')
+        INVERTED_INDEX_WORD_LEVEL_BINARY = os.path.join(datamart_directory, 'Inverted Index', 'word_level.bin')
+        DOC_TABLE_REPOSITORY = os.path.join(datamart_directory, 'Inverted Index', 'doc_table.json')
+
+        os.makedirs(INVERTED_INDEX_TREE_STRUCTURE_REPOSITORY, exist_ok=True)
+
+        doc_table = load_doc_table(DOC_TABLE_REPOSITORY)
+        known_doc_ids = doc_ids_by_name(doc_table)
+        doc_ids = [assign_doc_id(doc_table, known_doc_ids, os.path.basename(file_path)) for file_path in file_paths]
+
+        document_lengths = {}
+        run_files = build_sorted_runs_parallel(file_paths, run_directory, doc_ids, document_lengths=document_lengths)
+
+        for letter, letter_index in group_sorted_entries_by_letter(merge_sorted_runs(run_files)):
+            if INDEX_FORMAT == 'json':
+                export_inverted_index_to_json_by_letter(letter_index, INVERTED_INDEX_TREE_STRUCTURE_REPOSITORY)
+            else:
+                export_inverted_index_to_binary_by_letter(letter_index, INVERTED_INDEX_TREE_STRUCTURE_REPOSITORY,
+                                                          document_lengths)
+
+        entries = merge_sorted_runs(run_files)
+        if INDEX_FORMAT == 'json':
+            write_inverted_index_json(entries, INVERTED_INDEX_WORD_LEVEL_REPOSITORY)
+        else:
+            write_inverted_index_binary(entries, INVERTED_INDEX_WORD_LEVEL_BINARY, document_lengths)
+        export_document_lengths(doc_table, document_lengths, DOC_TABLE_REPOSITORY)
@@ -0,0 +1,82 @@
+import mmap
+import re
+import struct
+import sys
+from array import array
+
+from Indexer.book_store import read_book_bytes
+from Indexer.datamart_versions import atomic_write
+
+
+# An offsets file starts with the sampling stride and the number of tokens in the
+# book, followed by a uint32 array holding the byte offset of every STRIDE-th token
+# (tokens as produced by str.split() on the text after the START OF marker).
+
+TOKEN_OFFSET_STRIDE = 16
+HEADER = struct.Struct('<II')
+OFFSET = struct.Struct('<I')
+
+TOKEN_PATTERN = re.compile(r'\S+')
+
+
+def compute_token_offsets(content, start, stride=TOKEN_OFFSET_STRIDE):
+    offsets = array('I')
+    token_count = 0
+    byte_position = 0
+    char_position = 0
+    is_ascii = content.isascii()
+
+    for token in TOKEN_PATTERN.finditer(content, start):
+        if token_count % stride == 0:
+            if is_ascii:
+                byte_position = token.start()
+            else:
+                byte_position += len(content[char_position:token.start()].encode('utf-8'))
+                char_position = token.start()
+            offsets.append(byte_position)
+        token_count += 1
+
+    return token_count, offsets
+
+
+def write_token_offsets(content, start, offsets_file, stride=TOKEN_OFFSET_STRIDE):
+    token_count, offsets = compute_token_offsets(content, start, stride)
+    if sys.byteorder == 'big':
+        offsets.byteswap()
+
+    with atomic_write(offsets_file, 'wb') as f:
+        f.write(HEADER.pack(stride, token_count))
+        f.write(offsets.tobytes())
+
+
+def snippet_window(pos, token_count):
+    if pos < 10:
+        return 0, min(token_count, pos + 10)
+    return max(0, pos - 10), min(token_count, pos + 20 + 1)
+
+
+def read_snippet(book_file, offsets_file, pos):
+    try:
+        with open(offsets_file, 'rb') as f:
+            offsets = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (FileNotFoundError, ValueError):
+        return None
+
+    with offsets:
+        stride, token_count = HEADER.unpack_from(offsets, 0)
+        if not 0 <= pos < token_count:
+            return ""
+
+        start, end = snippet_window(pos, token_count)
+        first_sample = start // stride
+        last_sample = (end - 1) // stride + 1
+        start_byte = OFFSET.unpack_from(offsets, HEADER.size + OFFSET.size * first_sample)[0]
+        if last_sample * stride < token_count:
+            end_byte = OFFSET.unpack_from(offsets, HEADER.size + OFFSET.size * last_sample)[0]
+        else:
+            end_byte = None
+
+    window = read_book_bytes(book_file, start_byte, end_byte).decode('utf-8', errors='replace').split()
+
+    skipped = start - first_sample * stride
+    return " ".join(window[skipped:skipped + end - start])
@@ -0,0 +1,73 @@
+import heapq
+import json
+import os
+
+from Indexer.doc_table import compute_document_lengths
+
+
+INDEX_BYTES_PER_TEXT_BYTE = 6
+
+
+def write_sorted_run(inverted_index, run_file):
+    with open(run_file, 'w', encoding='utf-8') as f:
+        for word in sorted(inverted_index):
+            f.write(json.dumps([word, *inverted_index[word]], ensure_ascii=False))
+            f.write('\n')
+
+
+def read_sorted_run(run_file):
+    with open(run_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            word, doc_ids, positions, frequencies = json.loads(line)
+            yield word, [doc_ids, positions, frequencies]
+
+
+def merge_sorted_entries(streams):
+    # Postings of a word found in several streams are joined in stream order.
+    current_word, current_postings = None, None
+
+    for word, postings in heapq.merge(*streams, key=lambda entry: entry[0]):
+        if word == current_word:
+            for merged, partial in zip(current_postings, postings):
+                merged.extend(partial)
+            continue
+
+        if current_word is not None:
+            yield current_word, current_postings
+        current_word, current_postings = word, postings
+
+    if current_word is not None:
+        yield current_word, current_postings
+
+
+def merge_sorted_runs(run_files):
+    return merge_sorted_entries([read_sorted_run(run_file) for run_file in run_files])
+
+
+def build_sorted_runs(documents, run_directory, memory_limit, build_inverted_index, document_lengths=None):
+    # Every document is indexed in a single run, so its length (added to
+    # document_lengths, if given) is known before the runs are merged.
+    documents = iter(documents)
+    run_files = []
+    exhausted = False
+
+    def next_batch():
+        nonlocal exhausted
+        estimated_bytes = 0
+        for doc_id, text in documents:
+            yield doc_id, text
+            estimated_bytes += len(text) * INDEX_BYTES_PER_TEXT_BYTE
+            if estimated_bytes >= memory_limit:
+                return
+        exhausted = True
+
+    while not exhausted:
+        inverted_index = build_inverted_index(next_batch())
+        if document_lengths is not None:
+            document_lengths.update(compute_document_lengths(inverted_index))
+        if inverted_index:
+            run_file = os.path.join(run_directory, f'run_{len(run_files):05d}.jsonl')
+            write_sorted_run(inverted_index, run_file)
+            run_files.append(run_file)
+
+    return run_files
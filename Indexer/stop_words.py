@@ -0,0 +1,233 @@
+# Generated by Indexer/generate_stop_words.py from the spaCy stop word lists for en, es, fr, it, de, pt.
+# Do not edit by hand; rerun the generator instead.
+
+STOP_WORDS = frozenset({
+    "'d", "'ll", "'m", "'re", "'s", "'ve", 'a', 'ab', 'abbastanza', 'abbia', 'abbiamo', 'abbiano', 'abbiate', 'aber',
+    'abord', 'about', 'above', 'accidenti', 'acerca', 'ach', 'acht', 'achte', 'achten', 'achter', 'achtes', 'across',
+    'acuerdo', 'ad', 'adelante', 'ademais', 'ademas', 'además', 'adesso', 'adeus', 'affinche', 'afin', 'afirmó',
+    'after', 'afterwards', 'ag', 'again', 'against', 'agl', 'agli', 'agora', 'agregó', 'ah', 'ahi', 'ahime', 'ahimè',
+    'ahora', 'ahí', 'ai', 'aie', 'ainda', 'ainsi', 'ait', 'al', 'alcuna', 'alcuni', 'alcuno', 'algo', 'algumas',
+    'alguna', 'algunas', 'alguno', 'algunos', 'alguns', 'algún', 'ali', 'all', 'alla', 'allaient', 'alle', 'allein',
+    'allem', 'allen', 'aller', 'allerdings', 'alles', 'allgemeinen', 'alli', 'allo', 'allons', 'allora', 'allí',
+    'almost', 'alone', 'along', 'alors', 'already', 'alrededor', 'als', 'also', 'although', 'altri', 'altrimenti',
+    'altro', 'altrove', 'altrui', 'always', 'além', 'am', 'ambas', 'ambos', 'among', 'amongst', 'amount', 'an', 'anche',
+    'ancora', 'and', 'andere', 'anderem', 'anderen', 'andern', 'anders', 'anni', 'anno', 'another', 'ansa', 'ante',
+    'anterieur', 'anterieure', 'anterieures', 'anterior', 'antes', 'anticipo', 'antérieur', 'antérieure', 'antérieures',
+    'any', 'anyhow', 'anyone', 'anything', 'anyway', 'anywhere', 'ao', 'aos', 'apenas', 'apoia', 'apoio', 'apontar',
+    'apres', 'aproximadamente', 'après', 'após', 'aquel', 'aquela', 'aquelas', 'aquele', 'aqueles', 'aquella',
+    'aquellas', 'aquello', 'aquellos', 'aqui', 'aquilo', 'aquél', 'aquélla', 'aquéllas', 'aquéllos', 'aquí', 'are',
+    'around', 'arriba', 'as', 'aseguró', 'asi', 'assai', 'assez', 'assim', 'así', 'at', 'atras', 'através', 'atrás',
+    'attendu', 'attesa', 'attraverso', 'até', 'au', 'auch', 'auf', 'aun', 'aunque', 'aupres', 'auquel', 'aura',
+    'auraient', 'aurait', 'auront', 'aus', 'ausser', 'ausserdem', 'aussi', 'autre', 'autrement', 'autres', 'autrui',
+    'aux', 'auxquelles', 'auxquels', 'außer', 'außerdem', 'avaient', 'avais', 'avait', 'avant', 'avanti', 'avec',
+    'avemmo', 'avendo', 'avente', 'aver', 'avere', 'averlo', 'avesse', 'avessero', 'avessi', 'avessimo', 'aveste',
+    'avesti', 'avete', 'aveva', 'avevamo', 'avevano', 'avevate', 'avevi', 'avevo', 'avoir', 'avons', 'avrai', 'avranno',
+    'avrebbe', 'avrebbero', 'avrei', 'avremmo', 'avremo', 'avreste', 'avresti', 'avrete', 'avrà', 'avrò', 'avuta',
+    'avute', 'avuti', 'avuto', 'ayant', 'aí', 'añadió', 'aún', 'back', 'baixo', 'bajo', 'bald', 'bas', 'basee', 'basta',
+    'bastante', 'bat', 'be', 'became', 'because', 'become', 'becomes', 'becoming', 'been', 'before', 'beforehand',
+    'behind', 'bei', 'beide', 'beiden', 'beim', 'being', 'beispiel', 'bekannt', 'below', 'bem', 'bene', 'benissimo',
+    'bereits', 'beside', 'besides', 'besonders', 'besser', 'besten', 'between', 'beyond', 'bien', 'bin', 'bis',
+    'bisher', 'bist', 'boa', 'bom', 'both', 'bottom', 'brava', 'bravo', 'breve', 'buen', 'buena', 'buenas', 'bueno',
+    'buenos', 'but', 'by', "c'", 'ca', 'cada', 'call', 'caminho', 'can', 'cannot', 'car', 'casa', 'casi', 'caso',
+    'catorze', 'ce', 'ceci', 'cedo', 'cela', 'celle', 'celle-ci', 'celle-la', 'celle-là', 'celles', 'celles-ci',
+    'celles-la', 'celles-là', 'celui', 'celui-ci', 'celui-la', 'celui-là', 'cent', 'cento', 'cependant', 'certa',
+    'certain', 'certaine', 'certaines', 'certains', 'certamente', 'certe', 'certes', 'certeza', 'certi', 'certo', 'ces',
+    'cet', 'cette', 'ceux', 'ceux-ci', 'ceux-là', 'chacun', 'chacune', 'chaque', 'che', 'chez', 'chi', 'chicchessia',
+    'chiunque', 'ci', 'ciascuna', 'ciascuno', 'cierta', 'ciertas', 'cierto', 'ciertos', 'cima', 'cinco', 'cinq',
+    'cinquantaine', 'cinquante', 'cinquantième', 'cinquième', 'cio', 'cioe', 'circa', 'citta', 'città', 'claro', 'co',
+    'codesta', 'codesti', 'codesto', 'cogli', 'coi', 'coisa', 'col', 'colei', 'coll', 'coloro', 'colui', 'com',
+    'combien', 'come', 'comentó', 'cominci', 'comme', 'comment', 'como', 'comprida', 'comprido', 'compris', 'comunque',
+    'con', 'concernant', 'concernente', 'conciliarsi', 'conclusione', 'conhecida', 'conhecido', 'conmigo', 'conocer',
+    'conseguimos', 'conseguir', 'conselho', 'considera', 'consideró', 'consiglio', 'consigo', 'consigue', 'consiguen',
+    'consigues', 'contigo', 'contra', 'contro', 'contudo', 'corrente', 'cortesia', 'cos', 'cosa', 'cosi', 'così',
+    'could', 'creo', 'cual', 'cuales', 'cualquier', 'cuando', 'cuanta', 'cuantas', 'cuanto', 'cuantos', 'cuatro',
+    'cuenta', 'cui', 'cuja', 'cujo', 'custa', 'cuál', 'cuáles', 'cuándo', 'cuánta', 'cuántas', 'cuánto', 'cuántos',
+    'cá', 'cómo', 'c’', "d'", 'da', 'dabei', 'dado', 'dadurch', 'dafür', 'dagegen', 'dagl', 'dagli', 'daher', 'dahin',
+    'dahinter', 'dai', 'dal', 'dall', "dall'", 'dalla', 'dalle', 'dallo', 'damals', 'damit', 'dan', 'danach', 'daneben',
+    'dank', 'dann', 'dans', 'dappertutto', 'daquela', 'daquele', 'dar', 'daran', 'darauf', 'daraus', 'darf', 'darfst',
+    'darin', 'darum', 'darunter', 'darüber', 'das', 'dasein', 'daselbst', 'dass', 'dasselbe', 'davanti', 'davon',
+    'davor', 'dazu', 'dazwischen', 'daß', 'de', 'debaixo', 'debajo', 'debe', 'deben', 'debido', 'debout', 'decir',
+    'dedans', 'degl', 'degli', 'dehors', 'dei', 'dein', 'deine', 'deinem', 'deiner', 'deja', 'dejà', 'dejó', 'del',
+    'delante', 'dell', "dell'", 'della', 'delle', 'dello', 'delà', 'dem', 'demais', 'demasiado', 'dementsprechend',
+    'demgegenüber', 'demgemäss', 'demgemäß', 'demselben', 'demzufolge', 'demás', 'den', 'denen', 'denn', 'denselben',
+    'dentro', 'depois', 'deprisa', 'depuis', 'der', 'deren', 'derjenige', 'derjenigen', 'dermassen', 'dermaßen',
+    'derriere', 'derrière', 'derselbe', 'derselben', 'des', 'desde', 'deshalb', 'desormais', 'despacio', 'despues',
+    'después', 'desquelles', 'desquels', 'dessa', 'desse', 'desselben', 'dessen', 'dessous', 'dessus', 'desta', 'deste',
+    'deswegen', 'detras', 'detrás', 'detto', 'deux', 'deuxième', 'deuxièmement', 'devant', 'deve', 'devem', 'devers',
+    'deverá', 'devra', 'dez', 'dezanove', 'dezasseis', 'dezassete', 'dezoito', 'di', 'dia', 'diante', 'dias', 'dice',
+    'dicen', 'dich', 'dicho', 'did', 'die', 'diejenige', 'diejenigen', 'dieron', 'dies', 'diese', 'dieselbe',
+    'dieselben', 'diesem', 'diesen', 'dieser', 'dieses', 'dietro', 'diez', 'diferente', 'diferentes', 'different',
+    'differente', 'differentes', 'differents', 'différent', 'différente', 'différentes', 'différents', 'dijeron',
+    'dijo', 'dio', 'dir', 'dire', 'directe', 'directement', 'direita', 'dirimpetto', 'disso', 'dit', 'dite', 'dits',
+    'diventa', 'diventare', 'diventato', 'divers', 'diverse', 'diverses', 'dix', 'dix-huit', 'dix-neuf', 'dix-sept',
+    'dixième', 'diz', 'dizem', 'dizer', 'do', 'doce', 'doch', 'does', 'doing', 'dois', 'doit', 'doivent', 'donc',
+    'donde', 'done', 'dont', 'dopo', 'dort', 'dos', 'douze', 'douzième', 'dov', 'dove', 'dovra', 'dovrà', 'dovunque',
+    'down', 'doze', 'drei', 'drin', 'dritte', 'dritten', 'dritter', 'drittes', 'du', 'duas', 'due', 'dunque', 'duquel',
+    'durant', 'durante', 'durch', 'durchaus', 'durfte', 'durften', 'during', 'dá', 'dão', 'dès', 'déja', 'déjà',
+    'désormais', 'día', 'días', 'dónde', 'dürfen', 'dürft', 'd’', 'e', 'each', 'ebbe', 'ebbero', 'ebbi', 'eben',
+    'ebenso', 'ecc', 'ecco', 'ed', 'effet', 'effettivamente', 'egalement', 'egli', 'eh', 'ehrlich', 'eigen', 'eigene',
+    'eigenen', 'eigener', 'eigenes', 'eight', 'ein', 'einander', 'eine', 'einem', 'einen', 'einer', 'eines', 'einige',
+    'einigen', 'einiger', 'einiges', 'einmal', 'einmaleins', 'either', 'el', 'ela', 'elas', 'ele', 'eles', 'eleven',
+    'elf', 'ella', 'ellas', 'elle', 'elle-meme', 'elle-même', 'elles', 'elles-memes', 'elles-mêmes', 'ello', 'ellos',
+    'else', 'elsewhere', 'em', 'embargo', 'embora', 'empty', 'en', 'encima', 'encore', 'encuentra', 'ende', 'endlich',
+    'enfin', 'enfrente', 'enough', 'enquanto', 'enseguida', 'entonces', 'entrambi', 'entre', 'entweder', 'então',
+    'envers', 'environ', 'eppure', 'er', 'era', 'eramos', 'eran', 'erano', 'eras', 'eravamo', 'eravate', 'eres', 'eri',
+    'ero', 'erst', 'erste', 'ersten', 'erster', 'erstes', 'es', 'esa', 'esas', 'ese', 'esempio', 'eso', 'esos', 'essa',
+    'essas', 'esse', 'essendo', 'esser', 'essere', 'esses', 'essi', 'est', 'esta', 'estaba', 'estaban', 'estado',
+    'estados', 'estais', 'estamos', 'estan', 'estar', 'estará', 'estas', 'estava', 'este', 'estes', 'esteve', 'estive',
+    'estivemos', 'estiveram', 'estiveste', 'estivestes', 'esto', 'estos', 'estou', 'estoy', 'estuvo', 'está', 'están',
+    'estás', 'estão', 'et', 'etaient', 'etais', 'etait', 'etant', 'etc', 'etre', 'etwa', 'etwas', 'eu', 'euch', 'eux',
+    'eux-mêmes', 'even', 'eventual', 'ever', 'every', 'everyone', 'everything', 'everywhere', 'ex', 'exactement',
+    'except', 'excepto', 'excepté', 'exemplo', 'existe', 'existen', 'explicó', 'expresó', 'fa', 'faccia', 'facciamo',
+    'facciano', 'facciate', 'faccio', 'facemmo', 'facendo', 'facesse', 'facessero', 'facessi', 'facessimo', 'faceste',
+    'facesti', 'faceva', 'facevamo', 'facevano', 'facevate', 'facevi', 'facevo', 'facon', 'fai', 'fais', 'faisaient',
+    'faisant', 'fait', 'falta', 'fanno', 'farai', 'faranno', 'fare', 'farebbe', 'farebbero', 'farei', 'faremmo',
+    'faremo', 'fareste', 'faresti', 'farete', 'farà', 'fará', 'farò', 'fatto', 'favor', 'favore', 'faz', 'fazeis',
+    'fazem', 'fazemos', 'fazer', 'fazes', 'fazia', 'faço', 'façon', 'fece', 'fecero', 'feci', 'feront', 'few', 'fez',
+    'fifteen', 'fifty', 'fim', 'fin', 'final', 'finalmente', 'finche', 'fine', 'fino', 'first', 'five', 'foi', 'fomos',
+    'font', 'for', 'fora', 'foram', 'forma', 'former', 'formerly', 'forse', 'forty', 'forza', 'fosse', 'fossero',
+    'fossi', 'fossimo', 'foste', 'fostes', 'fosti', 'four', 'fra', 'frattempo', 'from', 'front', 'früher', 'fu', 'fue',
+    'fuera', 'fueron', 'fui', 'fuimos', 'full', 'fummo', 'fuori', 'furono', 'further', 'futuro', 'fünf', 'fünfte',
+    'fünften', 'fünfter', 'fünftes', 'für', 'gab', 'ganz', 'ganze', 'ganzen', 'ganzer', 'ganzes', 'gar', 'gedurft',
+    'gegen', 'gegenüber', 'gehabt', 'gehen', 'geht', 'gekannt', 'gekonnt', 'gemacht', 'gemocht', 'gemusst', 'generale',
+    'gens', 'genug', 'gerade', 'geral', 'gern', 'gesagt', 'geschweige', 'get', 'gewesen', 'gewollt', 'geworden', 'gia',
+    'giacche', 'gibt', 'ging', 'giorni', 'giorno', 'give', 'già', "gl'", 'gleich', 'gli', 'gliela', 'gliele', 'glieli',
+    'glielo', 'gliene', 'go', 'governo', 'gran', 'grande', 'grandes', 'grazie', 'gross', 'grosse', 'grossen', 'grosser',
+    'grosses', 'groß', 'große', 'großen', 'großer', 'großes', 'grupo', 'gruppo', 'gut', 'gute', 'guter', 'gutes', 'ha',
+    'habe', 'haben', 'haber', 'habia', 'habla', 'hablan', 'habrá', 'habt', 'había', 'habían', 'hace', 'haceis',
+    'hacemos', 'hacen', 'hacer', 'hacerlo', 'haces', 'hacia', 'haciendo', 'had', 'hago', 'haha', 'hai', 'han', 'hanno',
+    'has', 'hast', 'hasta', 'hat', 'hatte', 'hatten', 'have', 'hay', 'haya', 'he', 'hecho', 'heisst', 'heißt', 'hem',
+    'hemos', 'hence', 'hep', 'her', 'here', 'hereafter', 'hereby', 'herein', 'hereupon', 'hers', 'herself', 'heute',
+    'hi', 'hicieron', 'hier', 'him', 'himself', 'hin', 'hinter', 'his', 'hizo', 'ho', 'hoch', 'hormis', 'hors', 'hou',
+    'houp', 'how', 'however', 'hoy', 'hubo', 'hue', 'hui', 'huit', 'huitième', 'hundred', 'hätte', 'hätten', 'hé', 'i',
+    'ich', 'ieri', 'if', 'igual', 'ihm', 'ihn', 'ihnen', 'ihr', 'ihre', 'ihrem', 'ihren', 'ihrer', 'ihres', 'il', 'ils',
+    'im', 'immer', 'importe', 'improvviso', 'in', 'inc', 'inclusive', 'incluso', 'indeed', 'indem', 'indicó', 'infatti',
+    'infolgedessen', 'informo', 'informó', 'iniciar', 'inicio', 'inoltre', 'ins', 'insieme', 'intanto', 'into',
+    'intorno', 'invece', 'io', 'ir', 'irgend', 'irá', 'is', 'isso', 'ist', 'isto', 'it', 'its', 'itself', "j'", 'ja',
+    'jahr', 'jahre', 'jahren', 'je', 'jede', 'jedem', 'jeden', 'jeder', 'jedermann', 'jedermanns', 'jedoch', 'jemand',
+    'jemandem', 'jemanden', 'jene', 'jenem', 'jenen', 'jener', 'jenes', 'jetzt', 'junto', 'jusqu', 'jusque', 'just',
+    'juste', 'já', 'j’', 'kam', 'kann', 'kannst', 'kaum', 'keep', 'kein', 'keine', 'keinem', 'keinen', 'keiner',
+    'kleine', 'kleinen', 'kleiner', 'kleines', 'kommen', 'kommt', 'konnte', 'konnten', 'kurz', 'können', 'könnt',
+    'könnte', "l'", 'la', 'lado', 'laisser', 'lang', 'lange', 'laquelle', 'largo', 'las', 'lasciato', 'last', 'lato',
+    'latter', 'latterly', 'lavoro', 'le', 'least', 'lei', 'leicht', 'leider', 'lequel', 'les', 'lesquelles', 'lesquels',
+    'less', 'leur', 'leurs', 'lhe', 'li', 'lieber', 'ligado', 'llegó', 'lleva', 'llevar', 'lo', 'local', 'logo',
+    'longe', 'longtemps', 'lontano', 'loro', 'lors', 'lorsque', 'los', 'luego', 'lugar', 'lui', 'lui-meme', 'lui-même',
+    'lungo', 'luogo', 'là', 'lá', 'lès', 'l’', "m'", 'ma', 'macche', 'machen', 'macht', 'machte', 'made', 'mag',
+    'magari', 'maggior', 'magst', 'mai', 'maint', 'maintenant', 'maior', 'maioria', 'maiorias', 'mais', 'make', 'mal',
+    'male', 'malgrado', 'malgre', 'malgré', 'malissimo', 'man', 'mancanza', 'manche', 'manchem', 'manchen', 'mancher',
+    'manches', 'manera', 'manifestó', 'many', 'marche', 'mas', 'may', 'mayor', 'me', 'meanwhile', 'medesimo',
+    'mediante', 'medio', 'meglio', 'mehr', 'mein', 'meine', 'meinem', 'meinen', 'meiner', 'meines', 'meio', 'mejor',
+    'meme', 'memes', 'mencionó', 'meno', 'menor', 'menos', 'mentre', 'menudo', 'merci', 'mes', 'meses', 'mesi', 'mesmo',
+    'meu', 'meus', 'mezzo', 'mi', 'mia', 'mias', 'mich', 'mie', 'miei', 'mien', 'mienne', 'miennes', 'miens',
+    'mientras', 'might', 'mil', 'mila', 'miliardi', 'milioni', 'mille', 'mine', 'minha', 'minhas', 'minimi', 'ministro',
+    'mio', 'mios', 'mir', 'mis', 'misma', 'mismas', 'mismo', 'mismos', 'mit', 'mittel', 'mochte', 'mochten', 'modo',
+    'moi', 'moi-meme', 'moi-même', 'moindres', 'moins', 'molti', 'moltissimo', 'molto', 'momento', 'mon', 'mondo',
+    'more', 'moreover', 'morgen', 'most', 'mostly', 'mosto', 'move', 'much', 'mucha', 'muchas', 'mucho', 'muchos',
+    'muito', 'muitos', 'muss', 'musst', 'musste', 'mussten', 'must', 'muy', 'muß', 'my', 'myself', 'más', 'máximo',
+    'même', 'mêmes', 'mês', 'mí', 'mía', 'mías', 'mío', 'míos', 'möchte', 'mögen', 'möglich', 'mögt', 'müssen', 'müsst',
+    'm’', "n'", "n't", 'na', 'nach', 'nachdem', 'nada', 'nadie', 'nahm', 'name', 'namely', 'naquela', 'naquele', 'nas',
+    'natürlich', 'nazionale', 'ne', 'neanmoins', 'neben', 'negl', 'negli', 'nei', 'nein', 'neither', 'nel', 'nell',
+    'nella', 'nelle', 'nello', 'nem', 'nemmeno', 'nenhuma', 'neppure', 'nessa', 'nesse', 'nessun', "nessun'", 'nessuna',
+    'nessuno', 'nesta', 'neste', 'neue', 'neuen', 'neun', 'neunte', 'neunten', 'neunter', 'neuntes', 'neuvième',
+    'never', 'nevertheless', 'next', 'ni', 'nicht', 'nichts', 'nie', 'niemand', 'niemandem', 'niemanden', "nient'",
+    'niente', 'nine', 'ninguna', 'ningunas', 'ninguno', 'ningunos', 'ningún', 'no', 'nobody', 'noch', 'noi',
+    'nombreuses', 'nombreux', 'non', 'nondimeno', 'none', 'nonostante', 'nonsia', 'noone', 'nor', 'nos', 'nosotras',
+    'nosotros', 'nossa', 'nossas', 'nosso', 'nossos', 'nostra', 'nostre', 'nostri', 'nostro', 'not', 'notamment',
+    'nothing', 'notre', 'nous', 'nous-mêmes', 'nouveau', 'nova', 'novanta', 'novas', 'nove', 'novo', 'novos', 'now',
+    'nowhere', 'nuestra', 'nuestras', 'nuestro', 'nuestros', 'nueva', 'nuevas', 'nueve', 'nuevo', 'nuevos', 'nul',
+    'nulla', 'num', 'numa', 'nun', 'nunca', 'nuns', 'nuovo', 'nur', 'não', 'néanmoins', 'nível', 'nós', 'nôtre',
+    'nôtres', 'número', 'números', 'n‘t', 'n’', 'n’t', 'o', 'ob', 'oben', 'obrigada', 'obrigado', 'ocho', 'od', 'oder',
+    'of', 'off', 'offen', 'oft', 'often', 'oggi', 'ogni', 'ognuna', 'ognuno', 'ohne', 'oitava', 'oitavo', 'oito',
+    'oltre', 'on', 'once', 'onde', 'one', 'only', 'ont', 'ontem', 'onto', 'onze', 'onzième', 'oppure', 'or', 'ora',
+    'ore', 'os', 'osi', 'ossia', 'other', 'others', 'otherwise', 'otra', 'otras', 'otro', 'otros', 'ottanta', 'otto',
+    'ou', 'ouias', 'our', 'ours', 'ourselves', 'ouste', 'out', 'outra', 'outras', 'outre', 'outros', 'ouvert',
+    'ouverte', 'ouverts', 'over', 'own', 'où', 'paese', 'par', 'para', 'parce', 'parecchi', 'parecchie', 'parecchio',
+    'parece', 'parfois', 'parle', 'parlent', 'parler', 'parmi', 'part', 'partant', 'parte', 'partendo', 'partir', 'pas',
+    'pasada', 'pasado', 'paìs', 'peccato', 'pegar', 'peggio', 'pela', 'pelas', 'pelo', 'pelos', 'pendant', 'pense',
+    'peor', 'per', 'perche', 'perché', 'percio', 'perciò', 'perfino', 'perhaps', 'permet', 'pero', 'persino', 'persone',
+    'personne', 'perto', 'però', 'pesar', 'peu', 'peut', 'peuvent', 'peux', 'piedi', 'pieno', 'piglia', 'piu',
+    'piuttosto', 'più', 'please', 'plus', 'plusieurs', 'plutot', 'plutôt', 'po', 'poca', 'pocas', 'pochissimo', 'poco',
+    'pocos', 'pode', 'podeis', 'podem', 'podemos', 'poder', 'poderá', 'podia', 'podria', 'podriais', 'podriamos',
+    'podrian', 'podrias', 'podrá', 'podrán', 'podría', 'podrían', 'poi', 'poiche', 'pois', 'poner', 'ponto', 'pontos',
+    'por', 'porquanto', 'porque', 'porquê', 'portanto', 'porém', 'posible', 'posição', 'possa', 'possedere', 'possible',
+    'possibles', 'possivelmente', 'posso', 'possível', 'posteriore', 'posto', 'potrebbe', 'pouca', 'pouco', 'pour',
+    'pourquoi', 'pourrais', 'pourrait', 'pouvait', 'povo', 'prealable', 'precisement', 'preferibilmente', 'premier',
+    'première', 'premièrement', 'pres', 'presa', 'press', 'prima', 'primeira', 'primeiro', 'primer', 'primera',
+    'primero', 'primeros', 'primo', 'principalmente', 'probabilmente', 'procedant', 'proche', 'pronto', 'propia',
+    'propias', 'propio', 'propios', 'proprio', 'proximo', 'près', 'préalable', 'précisement', 'próprio', 'próxima',
+    'próximo', 'próximos', 'pu', 'puderam', 'pudo', 'pueda', 'puede', 'pueden', 'puedo', 'pues', 'puis', 'puisque',
+    'puo', 'pure', 'purtroppo', 'put', 'può', 'pôde', 'põe', 'põem', 'qeu', "qu'", 'quais', 'qual', 'qualche',
+    'qualcosa', 'qualcuna', 'qualcuno', 'quale', 'quali', 'qualquer', 'qualunque', 'quand', 'quando', 'quant',
+    'quant-à-soi', 'quanta', 'quante', 'quanti', 'quanto', 'quantunque', 'quarante', 'quarta', 'quarto', 'quasi',
+    'quatorze', 'quatre', 'quatre-vingt', 'quatrième', 'quatrièmement', 'quatro', 'quattro', 'que', 'quedó', 'quel',
+    "quel'", 'quelconque', 'quella', 'quelle', 'quelles', 'quelli', 'quello', "quelqu'un", 'quelque', 'quelques',
+    'quels', 'quem', 'quer', 'querem', 'queremos', 'quero', 'quest', "quest'", 'questa', 'queste', 'questi', 'questo',
+    'questão', 'qui', 'quiconque', 'quien', 'quienes', 'quiere', 'quieta', 'quieto', 'quindi', 'quinta', 'quinto',
+    'quinze', 'quite', 'quiza', 'quizas', 'quizá', 'quizás', 'quién', 'quiénes', 'quoi', 'quoique', 'qué', 'quê', 'qu’',
+    'rather', 're', 'realizado', 'realizar', 'realizó', 'really', 'realmente', 'recente', 'recentemente', 'recht',
+    'rechte', 'rechten', 'rechter', 'rechtes', 'regarding', 'registrazione', 'relative', 'relativement', 'relativo',
+    'relação', 'rend', 'rendre', 'repente', 'respecto', 'restant', 'reste', 'restent', 'retour', 'revoici', 'revoila',
+    'revoilà', 'richtig', 'riecco', 'rund', "s'", 'sa', 'sabe', 'sabeis', 'sabemos', 'saben', 'saber', 'sabes', 'sagt',
+    'sagte', 'sah', 'sait', 'salvo', 'same', 'sans', 'sara', 'sarai', 'saranno', 'sarebbe', 'sarebbero', 'sarei',
+    'saremmo', 'saremo', 'sareste', 'saresti', 'sarete', 'saro', 'sarà', 'sarò', 'satt', 'sauf', 'say', 'schlecht',
+    'schon', 'scola', 'scopo', 'scorso', 'se', 'sea', 'sean', 'sechs', 'sechste', 'sechsten', 'sechster', 'sechstes',
+    'secondo', 'see', 'seem', 'seemed', 'seeming', 'seems', 'seguente', 'seguito', 'segun', 'segunda', 'segundo',
+    'según', 'sehr', 'sei', 'seid', 'seien', 'sein', 'seine', 'seinem', 'seinen', 'seiner', 'seines', 'seis', 'seit',
+    'seitdem', 'seize', 'selbst', 'selon', 'sem', 'semblable', 'semblaient', 'semble', 'semblent', 'sembra', 'sembrare',
+    'sembrato', 'sembri', 'sempre', 'sent', 'senza', 'sept', 'septième', 'ser', 'sera', 'seraient', 'serait', 'seria',
+    'serious', 'seront', 'será', 'serán', 'sería', 'ses', 'sete', 'sette', 'seu', 'seul', 'seule', 'seulement',
+    'seules', 'seuls', 'seus', 'several', 'sexta', 'sexto', 'señaló', 'she', 'should', 'show', 'si', 'sia', 'siamo',
+    'siano', 'siate', 'sich', 'side', 'sido', 'sie', 'sieben', 'siebente', 'siebenten', 'siebenter', 'siebentes',
+    'siebte', 'siebten', 'siebter', 'siebtes', 'siempre', 'sien', 'siendo', 'sienne', 'siennes', 'siens', 'siete',
+    'sig', 'sigue', 'siguiente', 'sim', 'sin', 'since', 'sind', 'sino', 'sinon', 'sistema', 'six', 'sixième', 'sixty',
+    'so', 'sob', 'sobre', 'soi', 'soi-meme', 'soi-même', 'sois', 'soit', 'soixante', 'sola', 'solamente', 'solang',
+    'solas', 'solche', 'solchem', 'solchen', 'solcher', 'solches', 'solito', 'soll', 'sollen', 'sollte', 'sollten',
+    'solo', 'solos', 'soltanto', 'some', 'somehow', 'somente', 'someone', 'something', 'sometime', 'sometimes',
+    'somewhere', 'somos', 'son', 'sondern', 'sono', 'sonst', 'sont', 'sopra', 'sotto', 'sou', 'sous', 'souvent',
+    'sowie', 'soy', 'specifique', 'specifiques', 'spesso', 'später', 'spécifique', 'spécifiques', 'srl', 'sta', 'stai',
+    'stando', 'stanno', 'starai', 'staranno', 'starebbe', 'starebbero', 'starei', 'staremmo', 'staremo', 'stareste',
+    'staresti', 'starete', 'starà', 'starò', 'stata', 'state', 'stati', 'stato', 'statt', 'stava', 'stavamo', 'stavano',
+    'stavate', 'stavi', 'stavo', 'stemmo', 'stessa', 'stesse', 'stessero', 'stessi', 'stessimo', 'stesso', 'steste',
+    'stesti', 'stette', 'stettero', 'stetti', 'stia', 'stiamo', 'stiano', 'stiate', 'still', 'sto', 'stop', 'su', 'sua',
+    'suas', 'subito', 'successivamente', 'successivo', 'such', 'sue', 'suffisant', 'suffisante', 'suffit', 'sugl',
+    'sugli', 'sui', 'suis', 'suit', 'suivant', 'suivante', 'suivantes', 'suivants', 'suivre', 'sul', 'sull', 'sulla',
+    'sulle', 'sullo', 'suo', 'suoi', 'supuesto', 'sur', 'surtout', 'sus', 'suya', 'suyas', 'suyo', 'suyos', 'são', 'sé',
+    'sétima', 'sétimo', 'sí', 'só', 'sólo', 's’', "t'", 'ta', 'tag', 'tage', 'tagen', 'tais', 'take', 'tal', 'tale',
+    'tali', 'talvez', 'talvolta', 'tambien', 'también', 'também', 'tampoco', 'tan', 'tant', 'tanta', 'tanto', 'tarde',
+    'tat', 'te', 'teil', 'tel', 'telle', 'tellement', 'telles', 'tels', 'tem', 'temos', 'tempo', 'temprano', 'ten',
+    'tenant', 'tend', 'tendes', 'tendrá', 'tendrán', 'teneis', 'tenemos', 'tener', 'tenga', 'tengo', 'tenho', 'tenido',
+    'tenir', 'tens', 'tentar', 'tentaram', 'tente', 'tentei', 'tenía', 'ter', 'terceira', 'terceiro', 'tercera',
+    'tercero', 'tes', 'teu', 'teus', 'teve', 'than', 'that', 'the', 'their', 'them', 'themselves', 'then', 'thence',
+    'there', 'thereafter', 'thereby', 'therefore', 'therein', 'thereupon', 'these', 'they', 'third', 'this', 'those',
+    'though', 'three', 'through', 'throughout', 'thru', 'thus', 'ti', 'tien', 'tiene', 'tienen', 'tienne', 'tiennes',
+    'tiens', 'tipo', 'titolo', 'tive', 'tivemos', 'tiveram', 'tiveste', 'tivestes', 'to', 'toda', 'todas', 'todavia',
+    'todavía', 'todo', 'todos', 'together', 'toi', 'toi-meme', 'toi-même', 'ton', 'too', 'top', 'total', 'touchant',
+    'toujours', 'tous', 'tout', 'toute', 'toutes', 'toward', 'towards', 'tra', 'tranne', 'tras', 'trata', 'través',
+    'tre', 'treize', 'trenta', 'trente', 'tres', 'treze', 'trois', 'troisième', 'troisièmement', 'troppo', 'trotzdem',
+    'trovato', 'très', 'três', 'tu', 'tua', 'tuas', 'tudo', 'tue', 'tun', 'tuo', 'tuoi', 'tus', 'tutta', 'tuttavia',
+    'tutte', 'tutti', 'tutto', 'tuvo', 'tuya', 'tuyas', 'tuyo', 'tuyos', 'twelve', 'twenty', 'two', 'tão', 'té', 'têm',
+    'tú', 't’', 'u', 'uguali', 'uhr', 'ulteriore', 'ultimo', 'um', 'uma', 'umas', 'un', "un'", 'una', 'unas', 'und',
+    'under', 'une', 'unes', 'unless', 'uno', 'unos', 'uns', 'unser', 'unsere', 'unserer', 'unter', 'until', 'uomo',
+    'up', 'upon', 'us', 'usa', 'usais', 'usamos', 'usan', 'usar', 'usas', 'used', 'using', 'uso', 'usted', 'ustedes',
+    "v'", 'va', 'vai', 'vais', 'vale', 'valor', 'vamos', 'van', 'vari', 'varia', 'varias', 'varie', 'vario', 'varios',
+    'various', 'vas', 'vaya', 'veces', 'veja', 'vem', 'vens', 'ver', 'verdad', 'verdadera', 'verdadero', 'vergangene',
+    'vergangenen', 'vers', 'verso', 'very', 'vez', 'vezes', 'vi', 'via', 'vicino', 'viel', 'viele', 'vielem', 'vielen',
+    'vielleicht', 'vier', 'vierte', 'vierten', 'vierter', 'viertes', 'vinda', 'vindo', 'vingt', 'vinte', 'visto',
+    'vita', 'você', 'vocês', 'voi', 'voici', 'voila', 'voilà', 'volta', 'volte', 'vom', 'von', 'vont', 'vor', 'vos',
+    'vosotras', 'vosotros', 'vossa', 'vossas', 'vosso', 'vossos', 'vostra', 'vostre', 'vostri', 'vostro', 'votre',
+    'votres', 'vous', 'vous-mêmes', 'voy', 'vu', 'vuestra', 'vuestras', 'vuestro', 'vuestros', 'vários', 'vão', 'vé',
+    'vêm', 'vós', 'vôtre', 'vôtres', 'wahr', 'wann', 'war', 'waren', 'wart', 'warum', 'was', 'we', 'wegen', 'weil',
+    'weit', 'weiter', 'weitere', 'weiteren', 'weiteres', 'welche', 'welchem', 'welchen', 'welcher', 'welches', 'well',
+    'wem', 'wen', 'wenig', 'wenige', 'weniger', 'weniges', 'wenigstens', 'wenn', 'wer', 'werde', 'werden', 'werdet',
+    'were', 'wessen', 'what', 'whatever', 'when', 'whence', 'whenever', 'where', 'whereafter', 'whereas', 'whereby',
+    'wherein', 'whereupon', 'wherever', 'whether', 'which', 'while', 'whither', 'who', 'whoever', 'whole', 'whom',
+    'whose', 'why', 'wie', 'wieder', 'will', 'willst', 'wir', 'wird', 'wirklich', 'wirst', 'with', 'within', 'without',
+    'wo', 'wohl', 'wollen', 'wollt', 'wollte', 'wollten', 'worden', 'would', 'wurde', 'wurden', 'während', 'währenddem',
+    'währenddessen', 'wäre', 'würde', 'würden', 'y', 'ya', 'yet', 'yo', 'you', 'your', 'yours', 'yourself',
+    'yourselves', 'zehn', 'zehnte', 'zehnten', 'zehnter', 'zehntes', 'zeit', 'zero', 'zu', 'zuerst', 'zugleich', 'zum',
+    'zunächst', 'zur', 'zurück', 'zusammen', 'zwanzig', 'zwar', 'zwei', 'zweite', 'zweiten', 'zweiter', 'zweites',
+    'zwischen', 'à', 'às', 'á', 'área', 'â', 'ça', 'è', 'ès', 'é', 'également', 'él', 'és', 'ésa', 'ésas', 'ése',
+    'ésos', 'ésta', 'éstas', 'éste', 'éstos', 'étaient', 'étais', 'était', 'étant', 'être', 'ô', 'última', 'últimas',
+    'último', 'últimos', 'über', 'überhaupt', 'übrigens', '‘d', '‘ll', '‘m', '‘re', '‘s', '‘ve', '’d', '’ll', '’m',
+    '’re', '’s', '’ve',
+})
@@ -1,122 +1,156 @@
 import json
-import re
 import os
-import spacy
+import tempfile
+from Indexer.binary_index import export_inverted_index_binary
+from Indexer.datamart_versions import atomic_write, new_datamart_version, remove_other_index_format
+from Indexer.doc_table import compute_document_lengths, load_doc_table
+from Indexer.sorted_runs import build_sorted_runs, merge_sorted_runs
+from Indexer.analyzer import get_first_letter
+from Indexer.unique_json_indexer import build_inverted_index_with_positions, export_document_lengths, \
+    load_books_from_directory
 
 
-nlp_en = spacy.load('en_core_web_sm')
-nlp_es = spacy.load('es_core_news_sm')
-nlp_fr = spacy.load('fr_core_news_sm')
-nlp_it = spacy.load('it_core_news_sm')
-nlp_de = spacy.load('de_core_news_sm')
-nlp_pt = spacy.load('pt_core_news_sm')
+def export_inverted_index_to_json_by_letter(inverted_index, base_directory):
+    letter_data = {}
 
-stop_words = set()
-stop_words = stop_words.union(nlp_en.Defaults.stop_words)
-stop_words = stop_words.union(nlp_es.Defaults.stop_words)
-stop_words = stop_words.union(nlp_fr.Defaults.stop_words)
-stop_words = stop_words.union(nlp_it.Defaults.stop_words)
-stop_words = stop_words.union(nlp_de.Defaults.stop_words)
-stop_words = stop_words.union(nlp_pt.Defaults.stop_words)
+    for word, (doc_ids, positions, frequencies) in inverted_index.items():
+        first_letter = get_first_letter(word)
 
+        if not first_letter:
+            continue
 
-def build_inverted_index_with_positions(documents):
-    inverted_index = {}
+        if first_letter not in letter_data:
+            letter_data[first_letter] = {}
 
-    for doc_id, text in documents:
-        original_words = text.split()
-        pos = 0
+        if word not in letter_data[first_letter]:
+            letter_data[first_letter][word] = {}
 
-        for word in original_words:
-            clean_word = re.sub(r'\W+', '', word).lower()
-            is_stop_word = clean_word in stop_words
+        for i, doc_id in enumerate(doc_ids):
+            book_name = doc_id
 
-            if not is_stop_word and clean_word:
-                if clean_word not in inverted_index:
-                    inverted_index[clean_word] = [[], [], []]
+            letter_data[first_letter][word][book_name] = {
+                "positions": positions[i],
+                "frequency": frequencies[i]
+            }
 
-                if doc_id not in inverted_index[clean_word][0]:
-                    inverted_index[clean_word][0].append(doc_id)
-                    inverted_index[clean_word][1].append([])
-                    inverted_index[clean_word][2].append(0)
+    for first_letter, words in letter_data.items():
+        letter_directory = os.path.join(base_directory, first_letter)
+        if not os.path.exists(letter_directory):
+            os.makedirs(letter_directory)
 
-                doc_index = inverted_index[clean_word][0].index(doc_id)
-                inverted_index[clean_word][1][doc_index].append(pos)
-                inverted_index[clean_word][2][doc_index] += 1
+        output_file = os.path.join(letter_directory, f'{first_letter}_words.json')
 
-            pos += 1
+        with atomic_write(output_file, 'w', encoding='utf-8') as f:
+            json.dump(words, f, ensure_ascii=False, indent=4)
+        remove_other_index_format(output_file)
 
-    formatted_inverted_index = {}
-    for word, (doc_ids, positions, frequencies) in inverted_index.items():
-        formatted_inverted_index[word] = [doc_ids, positions, frequencies]
 
-    return formatted_inverted_index
+def split_inverted_index_by_letter(inverted_index):
+    letter_indexes = {}
 
+    for word, postings in inverted_index.items():
+        first_letter = get_first_letter(word)
 
+        if not first_letter:
+            continue
 
+        letter_indexes.setdefault(first_letter, {})[word] = postings
 
-def load_books_from_directory(directory):
-    documents = []
+    return letter_indexes
 
-    for filename in os.listdir(directory):
-        if filename.endswith('.txt'):
-            file_path = os.path.join(directory, filename)
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
 
-                start_content = re.search(r'\*\*\* START OF .* \*\*\*', content)
-                if start_content:
-                    book_content = content[start_content.end():].strip()
-                    documents.append((filename, book_content))
+def export_inverted_index_to_binary_by_letter(inverted_index, base_directory, document_lengths=None):
+    for first_letter, letter_index in split_inverted_index_by_letter(inverted_index).items():
+        letter_directory = os.path.join(base_directory, first_letter)
+        if not os.path.exists(letter_directory):
+            os.makedirs(letter_directory)
 
-    return documents
+        output_file = os.path.join(letter_directory, f'{first_letter}_words.bin')
+        export_inverted_index_binary(letter_index, output_file, document_lengths)
 
 
-def export_inverted_index_to_json_by_letter(inverted_index, base_directory):
-    letter_data = {}
+def group_sorted_entries_by_letter(entries):
+    current_letter, letter_index = None, {}
 
-    for word, (doc_ids, positions, frequencies) in inverted_index.items():
-        first_letter = re.sub(r'[^a-z0-9áéíóúàèìòùäëïöüâêîôûçñ]', '', word[0].lower())
+    for word, postings in entries:
+        first_letter = get_first_letter(word)
 
         if not first_letter:
             continue
 
-        if first_letter not in letter_data:
-            letter_data[first_letter] = {}
+        if first_letter != current_letter and letter_index:
+            yield current_letter, letter_index
+            letter_index = {}
 
-        if word not in letter_data[first_letter]:
-            letter_data[first_letter][word] = {}
+        current_letter = first_letter
+        letter_index[word] = postings
 
-        for i, doc_id in enumerate(doc_ids):
-            book_name = doc_id
+    if letter_index:
+        yield current_letter, letter_index
 
-            letter_data[first_letter][word][book_name] = {
-                "positions": positions[i],
-                "frequency": frequencies[i]
-            }
 
-    for first_letter, words in letter_data.items():
-        letter_directory = os.path.join(base_directory, first_letter)
-        if not os.path.exists(letter_directory):
-            os.makedirs(letter_directory)
+def tee_letter_shards(entries, write_letter):
+    # Passes word-sorted entries through and calls write_letter(letter, letter_index)
+    # once the entries move past a letter, so one letter shard is held at a time.
+    current_letter, letter_index = None, {}
 
-        output_file = os.path.join(letter_directory, f'{first_letter}_words.json')
+    for word, postings in entries:
+        first_letter = get_first_letter(word)
 
-        with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(words, f, ensure_ascii=False, indent=4)
+        if first_letter and first_letter != current_letter:
+            if letter_index:
+                write_letter(current_letter, letter_index)
+            current_letter, letter_index = first_letter, {}
 
+        if first_letter:
+            letter_index[word] = postings
+        yield word, postings
 
-if __name__ == "__main__":
+    if letter_index:
+        write_letter(current_letter, letter_index)
 
-    books_directory = 'Datalake/eventstore/Gutenbrg'
 
-    documents = load_books_from_directory(books_directory)
+def remove_letter_shard(letter, base_directory):
+    for extension in ('json', 'bin'):
+        shard_file = os.path.join(base_directory, letter, f'{letter}_words.{extension}')
+        if os.path.exists(shard_file):
+            os.remove(shard_file)
+
 
-    inverted_index = build_inverted_index_with_positions(documents)
+INDEX_FORMAT = os.environ.get('INDEX_FORMAT', 'binary')
+INDEXER_MEMORY_LIMIT = int(os.environ.get('INDEXER_MEMORY_LIMIT', 0))
 
-    INVERTED_INDEX_TREE_STRUCTURE_REPOSITORY = 'Datamarts/Inverted Index/Tree Data Structure'
 
-    if not os.path.exists(INVERTED_INDEX_TREE_STRUCTURE_REPOSITORY):
-        os.makedirs(INVERTED_INDEX_TREE_STRUCTURE_REPOSITORY)
+if __name__ == "__main__":
+
+    books_directory = 'Datalake/eventstore/Gutenbrg'
 
-    export_inverted_index_to_json_by_letter(inverted_index, INVERTED_INDEX_TREE_STRUCTURE_REPOSITORY)
+    with new_datamart_version('Datamarts') as datamart_directory:
+        INVERTED_INDEX_TREE_STRUCTURE_REPOSITORY = os.path.join(datamart_directory, 'Inverted Index', 'Tree Data Structure')
+        DOC_TABLE_REPOSITORY = os.path.join(datamart_directory, 'Inverted Index', 'doc_table.json')
+
+        os.makedirs(INVERTED_INDEX_TREE_STRUCTURE_REPOSITORY, exist_ok=True)
+
+        doc_table = load_doc_table(DOC_TABLE_REPOSITORY)
+        documents = load_books_from_directory(books_directory, doc_table)
+
+        def export_letter(inverted_index, document_lengths):
+            if INDEX_FORMAT == 'json':
+                export_inverted_index_to_json_by_letter(inverted_index, INVERTED_INDEX_TREE_STRUCTURE_REPOSITORY)
+            else:
+                export_inverted_index_to_binary_by_letter(inverted_index, INVERTED_INDEX_TREE_STRUCTURE_REPOSITORY,
+                                                          document_lengths)
+
+        if INDEXER_MEMORY_LIMIT:
+            with tempfile.TemporaryDirectory() as run_directory:
+                document_lengths = {}
+                run_files = build_sorted_runs(documents, run_directory, INDEXER_MEMORY_LIMIT,
+                                              build_inverted_index_with_positions, document_lengths)
+                for letter, letter_index in group_sorted_entries_by_letter(merge_sorted_runs(run_files)):
+                    export_letter(letter_index, document_lengths)
+        else:
+            inverted_index = build_inverted_index_with_positions(documents)
+            document_lengths = compute_document_lengths(inverted_index)
+            export_letter(inverted_index, document_lengths)
+
+        export_document_lengths(doc_table, document_lengths, DOC_TABLE_REPOSITORY)
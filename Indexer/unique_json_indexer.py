@@ -1,22 +1,17 @@
 import json
 import re
 import os
-import spacy
+import tempfile
+from Indexer.binary_index import export_inverted_index_binary, write_inverted_index_binary
+from Indexer.book_store import START_OF_BOOK_PATTERN, list_book_names, read_book
+from Indexer.datamart_versions import atomic_write, new_datamart_version, remove_other_index_format
+from Indexer.doc_table import compute_document_lengths, export_doc_table, load_doc_table, number_documents, \
+    set_document_lengths
+from Indexer.sorted_runs import build_sorted_runs, merge_sorted_runs
+from Indexer.analyzer import analyze_token
+from Indexer.stop_words import STOP_WORDS
 
-nlp_en = spacy.load('en_core_web_sm')
-nlp_es = spacy.load('es_core_news_sm')
-nlp_fr = spacy.load('fr_core_news_sm')
-nlp_it = spacy.load('it_core_news_sm')
-nlp_de = spacy.load('de_core_news_sm')
-nlp_pt = spacy.load('pt_core_news_sm')
-
-stop_words = set()
-stop_words = stop_words.union(nlp_en.Defaults.stop_words)
-stop_words = stop_words.union(nlp_es.Defaults.stop_words)
-stop_words = stop_words.union(nlp_fr.Defaults.stop_words)
-stop_words = stop_words.union(nlp_it.Defaults.stop_words)
-stop_words = stop_words.union(nlp_de.Defaults.stop_words)
-stop_words = stop_words.union(nlp_pt.Defaults.stop_words)
+stop_words = STOP_WORDS
 
 
 def clean_text(text):
@@ -27,48 +22,57 @@ def clean_text(text):
 
 def build_inverted_index_with_positions(documents):
     inverted_index = {}
+    clean_words = {}
 
     for doc_id, text in documents:
-        original_words = text.split()
-        pos = 0
-
-        for word in original_words:
-            clean_word = re.sub(r'\W+', '', word).lower()
-            is_stop_word = clean_word in stop_words
+        document_positions = {}
 
-            if not is_stop_word and clean_word:
-                if clean_word not in inverted_index:
-                    inverted_index[clean_word] = [[], [], []]
+        for pos, word in enumerate(text.split()):
+            clean_word = clean_words.get(word)
+            if clean_word is None:
+                clean_word = clean_words[word] = analyze_token(word)
 
-                if doc_id not in inverted_index[clean_word][0]:
-                    inverted_index[clean_word][0].append(doc_id)
-                    inverted_index[clean_word][1].append([])
-                    inverted_index[clean_word][2].append(0)
+            if clean_word:
+                positions = document_positions.get(clean_word)
+                if positions is None:
+                    document_positions[clean_word] = [pos]
+                else:
+                    positions.append(pos)
 
-                doc_index = inverted_index[clean_word][0].index(doc_id)
-                inverted_index[clean_word][1][doc_index].append(pos)
-                inverted_index[clean_word][2][doc_index] += 1
+        for clean_word, positions in document_positions.items():
+            postings = inverted_index.get(clean_word)
+            if postings is None:
+                postings = inverted_index[clean_word] = [[], [], []]
 
-            pos += 1
+            postings[0].append(doc_id)
+            postings[1].append(positions)
+            postings[2].append(len(positions))
 
     return inverted_index
 
 
-def load_books_from_directory(directory):
-    documents = []
+def list_book_files(directory):
+    for filename in list_book_names(directory):
+        yield os.path.join(directory, filename)
+
+
+def read_books(file_paths):
+    for file_path in file_paths:
+        yield os.path.basename(file_path), read_book(file_path)
 
-    for filename in os.listdir(directory):
-        if filename.endswith('.txt'):
-            file_path = os.path.join(directory, filename)
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
 
-                start_content = re.search(r'\*\*\* START OF .* \*\*\*', content)
-                if start_content:
-                    book_content = content[start_content.end():].strip()
-                    documents.append((filename, book_content))
+def strip_gutenberg_header(books):
+    for filename, content in books:
+        start_content = START_OF_BOOK_PATTERN.search(content)
+        if start_content:
+            yield filename, content[start_content.end():].strip()
 
-    return documents
+
+def load_books_from_directory(directory, doc_table=None):
+    books = read_books(list_book_files(directory))
+    if doc_table is not None:
+        books = number_documents(books, doc_table)
+    return strip_gutenberg_header(books)
 
 
 def export_inverted_index_json(inverted_index, directory):
@@ -83,21 +87,72 @@ def export_inverted_index_json(inverted_index, directory):
                 "frequency": frequencies[i]
             }
 
-    with open(directory, 'w', encoding='utf-8') as f:
+    with atomic_write(directory, 'w', encoding='utf-8') as f:
         json.dump(formatted_inverted_index, f, ensure_ascii=False, indent=4)
+    remove_other_index_format(directory)
 
 
-if __name__ == "__main__":
-    books_directory = 'Datalake/eventstore/Gutenbrg'
+def read_inverted_index_json(json_file):
+    with open(json_file, 'r', encoding='utf-8') as f:
+        formatted_inverted_index = json.load(f)
+    return {word: {int(doc_id): entry for doc_id, entry in documents.items()}
+            for word, documents in formatted_inverted_index.items()}
 
-    documents = load_books_from_directory(books_directory)
 
-    inverted_index = build_inverted_index_with_positions(documents)
+def write_inverted_index_json(entries, directory):
+    with atomic_write(directory, 'w', encoding='utf-8') as f:
+        separator = '{\n'
+        for word, (doc_ids, positions, frequencies) in entries:
+            formatted_word = {
+                doc_id: {"positions": positions[i], "frequency": frequencies[i]}
+                for i, doc_id in enumerate(doc_ids)
+            }
+            f.write(separator)
+            f.write(json.dumps({word: formatted_word}, ensure_ascii=False, indent=4)[2:-2])
+            separator = ',\n'
+        f.write('{}' if separator == '{\n' else '\n}')
+    remove_other_index_format(directory)
+
+
+def export_document_lengths(doc_table, document_lengths, output_file):
+    set_document_lengths(doc_table, document_lengths)
+    export_doc_table(doc_table, output_file)
 
-    INVERTED_INDEX_WORD_LEVEL_REPOSITORY = 'Datamarts/Inverted Index/word_level.json'
 
-    if not os.path.exists('Datamarts/Inverted Index'):
-        os.makedirs('Datamarts/Inverted Index')
+INDEX_FORMAT = os.environ.get('INDEX_FORMAT', 'binary')
+INDEXER_MEMORY_LIMIT = int(os.environ.get('INDEXER_MEMORY_LIMIT', 0))
 
-    export_inverted_index_json(inverted_index, INVERTED_INDEX_WORD_LEVEL_REPOSITORY)
 
+if __name__ == "__main__":
+    books_directory = 'Datalake/eventstore/Gutenbrg'
+
+    with new_datamart_version('Datamarts') as datamart_directory:
+        INVERTED_INDEX_WORD_LEVEL_REPOSITORY = os.path.join(datamart_directory, 'Inverted Index', 'word_level.json')
+        INVERTED_INDEX_WORD_LEVEL_BINARY = os.path.join(datamart_directory, 'Inverted Index', 'word_level.bin')
+        DOC_TABLE_REPOSITORY = os.path.join(datamart_directory, 'Inverted Index', 'doc_table.json')
+
+        os.makedirs(os.path.join(datamart_directory, 'Inverted Index'), exist_ok=True)
+
+        doc_table = load_doc_table(DOC_TABLE_REPOSITORY)
+        documents = load_books_from_directory(books_directory, doc_table)
+
+        if INDEXER_MEMORY_LIMIT:
+            with tempfile.TemporaryDirectory() as run_directory:
+                document_lengths = {}
+                run_files = build_sorted_runs(documents, run_directory, INDEXER_MEMORY_LIMIT,
+                                              build_inverted_index_with_positions, document_lengths)
+                entries = merge_sorted_runs(run_files)
+                if INDEX_FORMAT == 'json':
+                    write_inverted_index_json(entries, INVERTED_INDEX_WORD_LEVEL_REPOSITORY)
+                else:
+                    write_inverted_index_binary(entries, INVERTED_INDEX_WORD_LEVEL_BINARY, document_lengths)
+        else:
+            inverted_index = build_inverted_index_with_positions(documents)
+            document_lengths = compute_document_lengths(inverted_index)
+
+            if INDEX_FORMAT == 'json':
+                export_inverted_index_json(inverted_index, INVERTED_INDEX_WORD_LEVEL_REPOSITORY)
+            else:
+                export_inverted_index_binary(inverted_index, INVERTED_INDEX_WORD_LEVEL_BINARY, document_lengths)
+
+        export_document_lengths(doc_table, document_lengths, DOC_TABLE_REPOSITORY)
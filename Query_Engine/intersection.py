@@ -0,0 +1,98 @@
+from bisect import bisect_left
+
+from Indexer.binary_index import POSTINGS_BLOCK_SIZE
+from Query_Engine.positional import gallop
+
+
+# A skip list here is a postings list sorted by document id plus a sparse
+# copy of every step-th id. Probes gallop over the sparse copy to find the
+# block holding the target and only binary-search inside that block.
+# Skip lists of postings dicts also keep the frequencies and, per block, the
+# largest frequency, like the term lists of a binary index, for ranking.
+
+def build_skip_list(postings):
+    doc_ids = sorted(postings)
+    step = POSTINGS_BLOCK_SIZE
+    skip_list = {"doc_ids": doc_ids, "skips": doc_ids[::step], "step": step}
+    if isinstance(postings, dict):
+        frequencies = skip_list["frequencies"] = [postings[doc]["frequency"] for doc in doc_ids]
+        skip_list["max_frequencies"] = [max(frequencies[start:start + step])
+                                        for start in range(0, len(frequencies), step)]
+    return skip_list
+
+
+def get_skip_list(word, inverted_index, skip_lists=None):
+    if skip_lists is None:
+        return build_skip_list(inverted_index[word])
+
+    skip_list = skip_lists.get(word)
+    if skip_list is None:
+        skip_list = skip_lists[word] = build_skip_list(inverted_index[word])
+    return skip_list
+
+
+def skip_to(skip_list, target, cursor):
+    doc_ids = skip_list["doc_ids"]
+    step = skip_list["step"]
+    block = gallop(skip_list["skips"], target, cursor // step) - 1
+    if block < 0:
+        return cursor
+    low = max(cursor, block * step)
+    high = max(low, min(len(doc_ids), (block + 1) * step))
+    return bisect_left(doc_ids, target, low, high)
+
+
+def intersect_skip_lists(skip_lists):
+    skip_lists = sorted(skip_lists, key=lambda skip_list: len(skip_list["doc_ids"]))
+    common_docs = skip_lists[0]["doc_ids"]
+
+    for skip_list in skip_lists[1:]:
+        doc_ids = skip_list["doc_ids"]
+        matches = []
+        cursor = 0
+        for doc in common_docs:
+            cursor = skip_to(skip_list, doc, cursor)
+            if cursor == len(doc_ids):
+                break
+            if doc_ids[cursor] == doc:
+                matches.append(doc)
+        common_docs = matches
+        if not common_docs:
+            break
+
+    return common_docs
+
+
+def intersect_postings(words, inverted_index, skip_lists=None, allowed_docs=None):
+    word_skip_lists = [get_skip_list(word, inverted_index, skip_lists) for word in set(words)]
+    if allowed_docs is not None:
+        word_skip_lists.append(build_skip_list(allowed_docs))
+    return intersect_skip_lists(word_skip_lists)
+
+
+def iter_common_documents(skip_lists, lead, skip_run, runs=None):
+    # Walks skip_lists[lead] run by run (step documents at a time) and yields each
+    # document found in every skip list with its position (cursor) in each one.
+    # skip_run(run) is asked before every run, so a caller can leave runs out.
+    # A lead walked on its own may also visit its runs in any order, `runs`.
+    lead_list = skip_lists[lead]
+    lead_ids, step = lead_list["doc_ids"], lead_list["step"]
+    cursors = [0] * len(skip_lists)
+
+    for run in range(-(-len(lead_ids) // step)) if runs is None else runs:
+        if skip_run(run):
+            continue
+        start = run * step
+        for number in range(start, min(start + step, len(lead_ids))):
+            doc = lead_ids[number]
+            cursors[lead] = number
+            for i, skip_list in enumerate(skip_lists):
+                if i == lead:
+                    continue
+                cursors[i] = skip_to(skip_list, doc, cursors[i])
+                if cursors[i] == len(skip_list["doc_ids"]):
+                    return
+                if skip_list["doc_ids"][cursors[i]] != doc:
+                    break
+            else:
+                yield doc, cursors
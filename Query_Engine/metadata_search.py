@@ -0,0 +1,174 @@
+import csv
+import os
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+
+# Metadata is held column-wise: one list per field, indexed by row number.
+# Dates are parsed once into integer year/month/day, text fields are
+# lowercased once, language and the date parts have hash indexes and title/author
+# substring filters are narrowed with a trigram index before being verified.
+# Release date ranges are answered by bisecting the rows sorted by date.
+
+NGRAM_SIZE = 3
+METADATA_FILTERS = ['title', 'author', 'year', 'month', 'day', 'language', 'date_from', 'date_to']
+
+
+def convert_date(date_str):
+    """ Convierte una fecha en formato 'Mes Día, Año' a 'YYYY-MM-DD' """
+    try:
+        date_obj = datetime.strptime(date_str, "%B %d, %Y")
+        return date_obj.strftime("%Y-%m-%d")
+    except (TypeError, ValueError):
+        return ''
+
+
+def ngrams(text, size=NGRAM_SIZE):
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+def build_ngram_index(values):
+    ngram_index = {}
+    for row, value in enumerate(values):
+        for ngram in ngrams(value):
+            ngram_index.setdefault(ngram, []).append(row)
+    return ngram_index
+
+
+def build_value_index(values, rows):
+    value_index = {}
+    for row in rows:
+        value_index.setdefault(values[row], []).append(row)
+    return value_index
+
+
+def read_metadata_rows(file_path):
+    # A datamart without a metadata file (or no datamart yet) reads as empty.
+    if file_path is None or not os.path.exists(file_path):
+        return
+    with open(file_path, 'r', encoding='utf-8') as f:
+        yield from csv.DictReader(f)
+
+
+def load_metadata(file_path):
+    metadata = {"rows": [], "doc_ids": [], "titles": [], "authors": [], "languages": [], "years": [], "months": [],
+                "days": []}
+
+    for row in read_metadata_rows(file_path):
+        row['release_date'] = convert_date(row.get('release_date'))
+        metadata["rows"].append(row)
+        metadata["doc_ids"].append(int(row['doc_id']) if row.get('doc_id') else -1)
+        metadata["titles"].append((row.get('title') or '').lower())
+        metadata["authors"].append((row.get('author') or '').lower())
+        metadata["languages"].append((row.get('language') or '').lower())
+
+        year, month, day = map(int, row['release_date'].split('-')) if row['release_date'] else (0, 0, 0)
+        metadata["years"].append(year)
+        metadata["months"].append(month)
+        metadata["days"].append(day)
+
+    dated_rows = [row for row, year in enumerate(metadata["years"]) if year]
+    metadata["dated_rows"] = dated_rows
+    metadata["language_index"] = build_value_index(metadata["languages"], dated_rows)
+    metadata["year_index"] = build_value_index(metadata["years"], dated_rows)
+    metadata["month_index"] = build_value_index(metadata["months"], dated_rows)
+    metadata["day_index"] = build_value_index(metadata["days"], dated_rows)
+    metadata["rows_by_date"] = sorted(dated_rows, key=lambda row: date_key(metadata, row))
+    metadata["sorted_dates"] = [date_key(metadata, row) for row in metadata["rows_by_date"]]
+    metadata["title_ngrams"] = build_ngram_index(metadata["titles"])
+    metadata["author_ngrams"] = build_ngram_index(metadata["authors"])
+    return metadata
+
+
+def date_key(metadata, row):
+    return metadata["years"][row] * 10000 + metadata["months"][row] * 100 + metadata["days"][row]
+
+
+def parse_date_range_bound(value):
+    try:
+        date_obj = datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        return None
+    return date_obj.year * 10000 + date_obj.month * 100 + date_obj.day
+
+
+def rows_in_date_range(metadata, date_from, date_to):
+    low = parse_date_range_bound(date_from) if date_from else 0
+    high = parse_date_range_bound(date_to) if date_to else 99999999
+    if low is None or high is None:
+        return []
+    sorted_dates = metadata["sorted_dates"]
+    return metadata["rows_by_date"][bisect_left(sorted_dates, low):bisect_right(sorted_dates, high)]
+
+
+def parse_date_filter(value, width):
+    if not value.isdigit() or value != str(int(value)).zfill(width):
+        return -1
+    return int(value)
+
+
+def ngram_candidates(ngram_index, text):
+    postings = [ngram_index.get(ngram, []) for ngram in ngrams(text)]
+    postings.sort(key=len)
+    candidates = set(postings[0])
+    for rows in postings[1:]:
+        candidates.intersection_update(rows)
+    return candidates
+
+
+def search_metadata_rows(filters, metadata):
+    title_filter = filters.get('title', '').lower()
+    author_filter = filters.get('author', '').lower()
+    year_filter = filters.get('year', '').strip()
+    month_filter = filters.get('month', '').strip()
+    day_filter = filters.get('day', '').strip()
+    language_filter = filters.get('language', '').lower()
+    date_from = filters.get('date_from', '').strip()
+    date_to = filters.get('date_to', '').strip()
+
+    candidate_sets = []
+
+    if language_filter:
+        candidate_sets.append([row for language, rows in metadata["language_index"].items()
+                               if language_filter in language for row in rows])
+    date_filters = [(year_filter, 0, metadata["year_index"]), (month_filter, 2, metadata["month_index"]),
+                    (day_filter, 2, metadata["day_index"])]
+    for value, width, value_index in date_filters:
+        if value:
+            candidate_sets.append(value_index.get(parse_date_filter(value, width), []))
+    if date_from or date_to:
+        candidate_sets.append(rows_in_date_range(metadata, date_from, date_to))
+
+    substring_filters = [(title_filter, metadata["titles"], metadata["title_ngrams"]),
+                         (author_filter, metadata["authors"], metadata["author_ngrams"])]
+    for text, values, ngram_index in substring_filters:
+        if len(text) >= NGRAM_SIZE:
+            candidate_sets.append(ngram_candidates(ngram_index, text))
+
+    if candidate_sets:
+        candidate_sets.sort(key=len)
+        candidates = set(candidate_sets[0])
+        for rows in candidate_sets[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(rows)
+        candidates = sorted(candidates)
+    else:
+        candidates = metadata["dated_rows"]
+
+    years = metadata["years"]
+    substring_filters = [(text, values) for text, values, _ in substring_filters if text]
+    return [row for row in candidates
+            if years[row] and all(text in values[row] for text, values in substring_filters)]
+
+
+def search_metadata(filters, metadata):
+    rows = metadata["rows"]
+    return [rows[row] for row in search_metadata_rows(filters, metadata)]
+
+
+def filter_documents(filters, metadata):
+    if not any(filters.values()):
+        return None
+    doc_ids = metadata["doc_ids"]
+    return {doc_ids[row] for row in search_metadata_rows(filters, metadata)}
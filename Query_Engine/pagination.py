@@ -0,0 +1,38 @@
+import base64
+import json
+
+
+# A cursor is the (score, doc id) of the last document of a page, so the next
+# page is ranked from that point instead of recomputing and skipping `offset`
+# documents. It is opaque to clients: base64 of a small JSON array.
+
+
+def encode_cursor(score, doc):
+    return base64.urlsafe_b64encode(json.dumps([score, doc]).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor):
+    try:
+        score, doc = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        return float(score), int(doc)
+    except (ValueError, TypeError, UnicodeError):
+        return None
+
+
+def limit_positions(doc_results, max_positions):
+    if max_positions is None:
+        return doc_results
+    for hits in doc_results.values():
+        if max_positions == 0:
+            del hits["positions"]
+        else:
+            hits["positions"] = hits["positions"][:max_positions]
+    return doc_results
+
+
+def iter_ndjson(documents, next_cursor=None):
+    # One line per document as soon as its snippets are ready, then a trailer
+    # line with the cursor of the next page (null on the last page).
+    for document, doc_results in documents:
+        yield json.dumps({"document": document, "words": doc_results}, ensure_ascii=False) + "\n"
+    yield json.dumps({"next_cursor": next_cursor}) + "\n"
@@ -0,0 +1,121 @@
+import re
+from bisect import bisect_left
+
+from Indexer.analyzer import is_indexable, normalize_token
+
+
+QUERY_TOKEN_PATTERN = re.compile(r'"[^"]*"|\S+')
+NEAR_PATTERN = re.compile(r'NEAR/(\d+)$')
+
+
+def parse_query(query):
+    parsed = {"terms": [], "phrases": [], "near": []}
+    previous_word = None
+    pending_distance = None
+
+    for token in QUERY_TOKEN_PATTERN.findall(query):
+        near = NEAR_PATTERN.match(token)
+        if near:
+            pending_distance = int(near.group(1))
+            continue
+
+        words = [normalize_token(word) for word in token.strip('"').split()]
+        if not words:
+            continue
+
+        if token.startswith('"') and len(words) > 1:
+            parsed["phrases"].append(words)
+        parsed["terms"].extend(word for word in words if is_indexable(word))
+
+        if pending_distance is not None and previous_word is not None:
+            parsed["near"].append((previous_word, words[0], pending_distance))
+        pending_distance = None
+        previous_word = words[-1]
+
+    return parsed
+
+
+def query_terms(query):
+    return parse_query(query)["terms"]
+
+
+def gallop(positions, target, low=0):
+    step = 1
+    high = low
+    while high < len(positions) and positions[high] < target:
+        low = high + 1
+        high += step
+        step *= 2
+    return bisect_left(positions, target, low, min(high, len(positions)))
+
+
+def phrase_start_positions(position_lists, offsets):
+    anchor = min(range(len(position_lists)), key=lambda i: len(position_lists[i]))
+    cursors = [0] * len(position_lists)
+    starts = []
+
+    for anchor_position in position_lists[anchor]:
+        start = anchor_position - offsets[anchor]
+        for i, positions in enumerate(position_lists):
+            if i == anchor:
+                continue
+            cursors[i] = gallop(positions, start + offsets[i], cursors[i])
+            if cursors[i] == len(positions):
+                return starts
+            if positions[cursors[i]] != start + offsets[i]:
+                break
+        else:
+            starts.append(start)
+
+    return starts
+
+
+def within_distance(positions_a, positions_b, distance):
+    if len(positions_a) > len(positions_b):
+        positions_a, positions_b = positions_b, positions_a
+
+    cursor = 0
+    for position in positions_a:
+        cursor = gallop(positions_b, position - distance, cursor)
+        if cursor == len(positions_b):
+            return False
+        if positions_b[cursor] <= position + distance:
+            return True
+    return False
+
+
+def matches_phrase(doc, phrase, inverted_index):
+    position_lists = []
+    offsets = []
+    for offset, word in enumerate(phrase):
+        if not is_indexable(word):
+            continue
+        if word not in inverted_index or doc not in inverted_index[word]:
+            return False
+        position_lists.append(inverted_index[word][doc]["positions"])
+        offsets.append(offset)
+
+    if not position_lists:
+        return True
+    return bool(phrase_start_positions(position_lists, offsets))
+
+
+def matches_near(doc, word_a, word_b, distance, inverted_index):
+    if not is_indexable(word_a) or not is_indexable(word_b):
+        return True
+    if word_a not in inverted_index or word_b not in inverted_index:
+        return False
+    if doc not in inverted_index[word_a] or doc not in inverted_index[word_b]:
+        return False
+    return within_distance(inverted_index[word_a][doc]["positions"], inverted_index[word_b][doc]["positions"],
+                           distance)
+
+
+def matches_positional_constraints(doc, parsed_query, inverted_index):
+    for phrase in parsed_query["phrases"]:
+        if not matches_phrase(doc, phrase, inverted_index):
+            return False
+    for word_a, word_b, distance in parsed_query["near"]:
+        if not matches_near(doc, word_a, word_b, distance, inverted_index):
+            return False
+    return True
@@ -1,204 +1,216 @@
 import json
-import re
-from datetime import datetime
-from flask import Flask, request, jsonify, send_from_directory
-import csv
+from flask import Flask, jsonify
 from flask_cors import CORS
 import os
+import threading
+from collections import OrderedDict
+from Indexer.analyzer import get_first_letter
+from Indexer.binary_index import open_binary_index, is_binary_index, load_term_lists, warm_binary_index
+from Indexer.datamart_versions import current_datamart_directory
+from Indexer.unique_json_indexer import read_inverted_index_json
+from Query_Engine.metadata_search import load_metadata
+from Query_Engine.result_cache import create_result_cache
+from Query_Engine.intersection import get_skip_list
+from Query_Engine.positional import query_terms
+from Query_Engine.ranking import load_document_stats
+from Query_Engine.search_api import io_executor, register_search_routes
 
 
 
 app = Flask(__name__)
-CORS(app)
-
-
-def find_context_in_datalake(query_result):
-    for text in query_result:
-        text_id = text
-        for word in query_result[text]:
-            pos = query_result[text][word]["positions"][0]
-            paragraph = ""
-            with open(f"Datalake/eventstore/Gutenbrg/{text_id}", "r") as file:
-                document = file.read()
-            start_content = re.search(r'\*\*\* START OF .* \*\*\*', document)
-            if start_content:
-                start_text = start_content.end()
-                content_later = document[start_text:].strip()
-
-                words = content_later.split()
-                if 0 <= pos < len(words):
-                    if pos < 10:
-                        start = 0
-                        end = min(len(words), pos + 10)
-                    else:
-                        start = max(0, pos - 10)
-                        end = min(len(words), pos + 20 + 1)
-
-                    paragraph = words[start:end]
-                    paragraph = " ".join(paragraph)
-
-            query_result[text][word]["paragraph"] = paragraph
-    return query_result
-
-
-def load_inverted_index_from_json(query, base_directory):
-    words = query.lower().split()
-    if not words:
-        return {"error": "Please provide at least one word in the query."}
-
-    first_letters = {word[0] for word in words}
-
-    inverted_index = {}
-
-    for letter in first_letters:
-        json_file_path = os.path.join(base_directory, letter, f"{letter}_words.json")
-
+app.json.sort_keys = False
+CORS(app, expose_headers=['X-Next-Cursor'])
+
+# Datamart paths are relative to the published datamart version (see
+# Indexer.datamart_versions), which is looked up again on every request.
+DATAMARTS_REPOSITORY = 'Datamarts'
+INVERTED_INDEX_TREE_STRUCTURE_REPOSITORY = 'Inverted Index/Tree Data Structure'
+DOC_TABLE_REPOSITORY = 'Inverted Index/doc_table.json'
+METADATA_REPOSITORY = 'Metadata Database/book_metadata.csv'
+SHARD_CACHE_MAX_BYTES = int(os.environ.get('SHARD_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+
+shard_cache = OrderedDict()
+shard_cache_stats = {"hits": 0, "misses": 0, "evictions": 0, "bytes": 0}
+shard_cache_lock = threading.Lock()
+
+datamart_snapshot = {"version": None, "directory": DATAMARTS_REPOSITORY, "document_stats": None, "metadata": None}
+readiness = {"ready": False, "shards": 0}
+result_cache = create_result_cache()
+
+
+def evict_letter_shards(max_bytes):
+    while shard_cache and shard_cache_stats["bytes"] > max_bytes:
+        _, evicted = shard_cache.popitem(last=False)
+        shard_cache_stats["bytes"] -= evicted["size"]
+        shard_cache_stats["evictions"] += 1
+
+
+def find_letter_shard(letter, base_directory):
+    binary_file_path = os.path.join(base_directory, letter, f"{letter}_words.bin")
+    if os.path.exists(binary_file_path):
+        return binary_file_path
+    return os.path.join(base_directory, letter, f"{letter}_words.json")
+
+
+def load_letter_shard(letter, base_directory, max_bytes=SHARD_CACHE_MAX_BYTES):
+    # Shards are cached by their path inside the datamart and checked by inode and
+    # mtime, so a shard a new datamart version links unchanged stays cached.
+    shard_file_path = find_letter_shard(letter, base_directory)
+    shard_key = os.path.relpath(shard_file_path, base_directory)
+    stat = os.stat(shard_file_path)
+    file_version = stat.st_ino, stat.st_mtime_ns
+
+    with shard_cache_lock:
+        cached = shard_cache.get(shard_key)
+        if cached and cached["version"] == file_version:
+            shard_cache.move_to_end(shard_key)
+            shard_cache_stats["hits"] += 1
+            return cached["shard"], cached["skip_lists"]
+        shard_cache_stats["misses"] += 1
+
+    if shard_file_path.endswith('.bin'):
+        letter_index = open_binary_index(shard_file_path)
+    else:
+        letter_index = read_inverted_index_json(shard_file_path)
+
+    with shard_cache_lock:
+        previous = shard_cache.pop(shard_key, None)
+        if previous:
+            shard_cache_stats["bytes"] -= previous["size"]
+        skip_lists = {}
+        shard_cache[shard_key] = {"version": file_version, "size": stat.st_size, "shard": letter_index,
+                                  "skip_lists": skip_lists}
+        shard_cache_stats["bytes"] += stat.st_size
+        evict_letter_shards(max_bytes)
+
+    return letter_index, skip_lists
+
+
+def get_datamart_version(datamarts_directory):
+    # A published version has its own directory; the indexers also rewrite the doc
+    # table on every build, after the shards, for datamarts written in place.
+    datamart_directory = current_datamart_directory(datamarts_directory)
+    try:
+        stat = os.stat(os.path.join(datamart_directory, DOC_TABLE_REPOSITORY))
+    except FileNotFoundError:
+        return datamart_directory, None
+    return datamart_directory, stat.st_mtime_ns, stat.st_size
+
+
+def get_datamart():
+    global datamart_snapshot
+    version = get_datamart_version(DATAMARTS_REPOSITORY)
+
+    snapshot = datamart_snapshot
+    if snapshot["version"] != version:
+        datamart_directory = version[0]
+        snapshot = {"version": version, "directory": datamart_directory,
+                    "document_stats": load_document_stats(os.path.join(datamart_directory, DOC_TABLE_REPOSITORY)),
+                    "metadata": load_metadata(os.path.join(datamart_directory, METADATA_REPOSITORY))}
+        datamart_snapshot = snapshot
+    return snapshot
+
+
+def warm_letter_shards(base_directory):
+    # Loads letter shards into the cache until it is full; binary shards are also
+    # paged in so later requests (and forked workers) find them in the page cache.
+    # Returns how many shards were loaded.
+    loaded = 0
+    if not os.path.isdir(base_directory):
+        return loaded
+    for letter in sorted(os.listdir(base_directory)):
+        if shard_cache_stats["bytes"] >= SHARD_CACHE_MAX_BYTES:
+            break
         try:
-            with open(json_file_path, 'r', encoding='utf-8') as f:
-                letter_index = json.load(f)
-                inverted_index.update(letter_index)
-        except FileNotFoundError:
-            return {"error": f"JSON file not found for letter '{letter}'."}
-        except json.JSONDecodeError:
-            return {"error": "Error decoding JSON file."}
-
-    return inverted_index
-
+            letter_index, _ = load_letter_shard(letter, base_directory)
+        except (FileNotFoundError, json.JSONDecodeError, ValueError):
+            continue
+        loaded += 1
+        if is_binary_index(letter_index):
+            warm_binary_index(letter_index)
+    return loaded
 
-def load_metadata(file_path):
-    metadata = []
-    with open(file_path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            row['release_date'] = convert_date(row['release_date'])
-            metadata.append(row)
-    return metadata
 
+def warm_up():
+    datamart = get_datamart()
+    readiness["shards"] = warm_letter_shards(os.path.join(datamart["directory"],
+                                                          INVERTED_INDEX_TREE_STRUCTURE_REPOSITORY))
+    readiness["ready"] = True
 
-def convert_date(date_str):
-    try:
-        date_obj = datetime.strptime(date_str, "%B %d, %Y")
-        return date_obj.strftime("%Y-%m-%d")
-    except ValueError:
-        return ''
 
+def load_letter_postings(letter, words, base_directory):
+    # Only the postings of the query words are handed on, never the whole shard.
+    letter_index, shard_skip_lists = load_letter_shard(letter, base_directory)
+    if is_binary_index(letter_index):
+        postings = load_term_lists(letter_index, words, shard_skip_lists)
+    else:
+        postings = {word: letter_index[word] for word in words if word in letter_index}
+    return postings, {word: get_skip_list(word, postings, shard_skip_lists) for word in words if word in postings}
 
-def search_inverted_index(query, inverted_index):
-    words = query.lower().split()
 
-    if len(words) == 0:
+def load_inverted_index_from_json(query, base_directory, skip_lists=None):
+    if not query.split():
         return {"error": "Please provide at least one word in the query."}
 
-    words = [word for word in words if word in inverted_index]
-
-    if len(words) == 0:
-        return {"message": "No words from the query are present in the inverted index."}
-
-    first_word = words[0]
-    common_docs = set(inverted_index[first_word].keys())
-
-    for word in words[1:]:
-        current_docs = set(inverted_index[word].keys())
-        common_docs = common_docs.intersection(current_docs)
-
-        if not common_docs:
-            return {"message": f"No documents contain all the words: {', '.join(words)}"}
+    words = query_terms(query)
+    first_letters = {get_first_letter(word) for word in words} - {''}
 
+    # Every letter shard is loaded on the I/O pool at the same time, so a query
+    # touching several letters waits for the slowest shard instead of all of them.
+    futures = [io_executor.submit(load_letter_postings, letter,
+                                  [word for word in words if get_first_letter(word) == letter], base_directory)
+               for letter in first_letters]
 
-    results = {}
-    for doc in common_docs:
-        results[doc] = {}
-        for word in words:
-            results[doc][word] = {
-                "frequency": inverted_index[word][doc]["frequency"],
-                "positions": inverted_index[word][doc]["positions"]
-            }
-
-    return results
-
-
-def search_metadata(filters, metadata):
-    results = []
-
-    title_filter = filters.get('title', '').lower()
-    author_filter = filters.get('author', '').lower()
-    year_filter = filters.get('year', '').strip()
-    month_filter = filters.get('month', '').strip()
-    day_filter = filters.get('day', '').strip()
-    language_filter = filters.get('language', '').lower()
-
-    for entry in metadata:
-        title_matches = title_filter in entry.get('title', '').lower() if title_filter else True
-
-        author_matches = author_filter in entry.get('author', '').lower() if author_filter else True
-
-        language_matches = language_filter in entry.get('language', '').lower() if language_filter else True
+    inverted_index = {}
 
-        entry_date = entry.get('release_date', '').strip()
+    for future in futures:
         try:
-            entry_date_obj = datetime.strptime(entry_date, "%Y-%m-%d")
-            entry_year = str(entry_date_obj.year)
-            entry_month = str(entry_date_obj.month).zfill(2)
-            entry_day = str(entry_date_obj.day).zfill(2)
-        except ValueError:
+            letter_index, letter_skip_lists = future.result()
+        except FileNotFoundError:
             continue
+        except (json.JSONDecodeError, ValueError):
+            return {"error": "Error decoding JSON file."}
 
-        year_matches = (year_filter == entry_year) if year_filter else True
-        month_matches = (month_filter == entry_month) if month_filter else True
-        day_matches = (day_filter == entry_day) if day_filter else True
-
-        date_matches = year_matches and month_matches and day_matches
-
-        if title_matches and author_matches and date_matches and language_matches:
-            results.append(entry)
-
-    return results
-
-
-metadata = load_metadata('Datamarts/Metadata Database/book_metadata.csv')
+        inverted_index.update(letter_index)
+        if skip_lists is not None:
+            skip_lists.update(letter_skip_lists)
 
+    return inverted_index
 
-@app.route('/search/word_level', methods=['GET'])
-def search_tree_inverted():
-    query = request.args.get('query', '').strip()
-    inverted_index = load_inverted_index_from_json(query, 'Datamarts/Inverted Index/Tree Data Structure')
-    if not query:
-        return jsonify({"error": "No search query provided"}), 400
-    results = search_inverted_index(query, inverted_index)
-    results = find_context_in_datalake(results)
-    return jsonify(results)
+def load_query_index(datamart, query):
+    skip_lists = {}
+    tree_directory = os.path.join(datamart["directory"], INVERTED_INDEX_TREE_STRUCTURE_REPOSITORY)
+    return load_inverted_index_from_json(query, tree_directory, skip_lists), skip_lists
 
 
-@app.route('/search/metadata', methods=['GET'])
-def search_meta():
-    title = request.args.get('title', '').strip()
-    author = request.args.get('author', '').strip()
-    year = request.args.get('year', '').strip()
-    month = request.args.get('month', '').strip()
-    day = request.args.get('day', '').strip()
-    language = request.args.get('language', '').strip()
+get_datamart()
 
-    filters = {
-        'title': title,
-        'author': author,
-        'year': year,
-        'month': month,
-        'day': day,
-        'language': language
-    }
+register_search_routes(app, get_datamart, load_query_index, lambda: result_cache)
 
-    results = search_metadata(filters, metadata)
-    return jsonify(results)
 
+@app.route('/stats/shard_cache', methods=['GET'])
+def shard_cache_report():
+    with shard_cache_lock:
+        report = dict(shard_cache_stats)
+        report["letters"] = [os.path.basename(os.path.dirname(path)) for path in shard_cache]
+    report["max_bytes"] = SHARD_CACHE_MAX_BYTES
+    return jsonify(report)
 
-@app.route('/libros/<path:filename>')
-def serve_book(filename):
-    datalake_directory = os.path.join(os.getcwd(), 'Datalake', 'eventstore', 'Gutenbrg')
-    try:
-        return send_from_directory(datalake_directory, filename)
-    except FileNotFoundError:
-        return jsonify({"error": "File not found"}), 404
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    # Not ready until a datamart with a doc table is published and one of its
+    # shards loads; an engine started before the first build warms up again.
+    if not readiness["ready"] or get_datamart()["version"][1] is None:
+        return jsonify({"status": "warming"}), 503
+    if not readiness["shards"]:
+        warm_up()
+        if not readiness["shards"]:
+            return jsonify({"status": "warming"}), 503
+    with shard_cache_lock:
+        letters = len(shard_cache)
+    return jsonify({"status": "ready", "cached_letters": letters})
 
 
 if __name__ == "__main__":
-    app.run(debug=True, host='0.0.0.0', port=5001)
\ No newline at end of file
+    threading.Thread(target=warm_up, daemon=True).start()
+    app.run(debug=True, host='0.0.0.0', port=5001)
@@ -1,185 +1,137 @@
 import json
-import re
-from datetime import datetime
-from flask import Flask, request, jsonify, send_from_directory
-import csv
+from flask import Flask, jsonify
 from flask_cors import CORS
 import os
+import threading
+import time
+from Indexer.binary_index import open_binary_index, load_term_lists, warm_binary_index
+from Indexer.datamart_versions import current_datamart_directory
+from Indexer.unique_json_indexer import read_inverted_index_json
+from Query_Engine.metadata_search import load_metadata
+from Query_Engine.result_cache import create_result_cache
+from Query_Engine.positional import query_terms
+from Query_Engine.ranking import load_document_stats
+from Query_Engine.search_api import register_search_routes
 
 app = Flask(__name__)
-CORS(app)
-
-
-def find_context_in_datalake(query_result):
-    for text in query_result:
-        text_id = text
-        for word in query_result[text]:
-            pos = query_result[text][word]["positions"][0]
-            paragraph = ""
-            with open(f"Datalake/eventstore/Gutenbrg/{text_id}", "r") as file:
-                document = file.read()
-            start_content = re.search(r'\*\*\* START OF .* \*\*\*', document)
-            if start_content:
-                start_text = start_content.end()
-                content_later = document[start_text:].strip()
-
-                words = content_later.split()
-                if 0 <= pos < len(words):
-                    if pos < 10:
-                        start = 0
-                        end = min(len(words), pos + 10)
-                    else:
-                        start = max(0, pos - 10)
-                        end = min(len(words), pos + 20 + 1)
-
-                    paragraph = words[start:end]
-                    paragraph = " ".join(paragraph)
-
-            query_result[text][word]["paragraph"] = paragraph
-    return query_result
-
-def load_inverted_index_from_json(json_file):
-    with open(json_file, 'r', encoding='utf-8') as f:
-        inverted_index = json.load(f)
-    return inverted_index
-
-
-def load_metadata(file_path):
-    metadata = []
-    with open(file_path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            row['release_date'] = convert_date(row['release_date'])
-            metadata.append(row)
-    return metadata
-
-def convert_date(date_str):
-    """ Convierte una fecha en formato 'Mes Día, Año' a 'YYYY-MM-DD' """
-    try:
-        date_obj = datetime.strptime(date_str, "%B %d, %Y")
-        return date_obj.strftime("%Y-%m-%d")
-    except ValueError:
-        return ''
-
-
-def search_inverted_index(query, inverted_index):
-    words = query.lower().split()
-
-    if len(words) == 0:
-        return {"error": "Please provide at least one word in the query."}
-
-    words = [word for word in words if word in inverted_index]
-
-    if len(words) == 0:
-        return {"message": "No words from the query are present in the inverted index."}
-
-    first_word = words[0]
-    common_docs = set(inverted_index[first_word].keys())
-
-    for word in words[1:]:
-        current_docs = set(inverted_index[word].keys())
-        common_docs = common_docs.intersection(current_docs)
-
-        if not common_docs:
-            return {"message": f"No documents contain all the words: {', '.join(words)}"}
+app.json.sort_keys = False
+CORS(app, expose_headers=['X-Next-Cursor'])
+
+# Datamart paths are relative to the published datamart version (see
+# Indexer.datamart_versions), which is looked up again on every reload.
+DATAMARTS_REPOSITORY = 'Datamarts'
+INVERTED_INDEX_WORD_LEVEL_REPOSITORY = 'Inverted Index/word_level.json'
+INVERTED_INDEX_WORD_LEVEL_BINARY = 'Inverted Index/word_level.bin'
+INDEX_RELOAD_INTERVAL = 10
+DOC_TABLE_REPOSITORY = 'Inverted Index/doc_table.json'
+METADATA_REPOSITORY = 'Metadata Database/book_metadata.csv'
+INDEX_FILES = [INVERTED_INDEX_WORD_LEVEL_BINARY, INVERTED_INDEX_WORD_LEVEL_REPOSITORY]
+
+index_snapshot = {"version": None, "directory": DATAMARTS_REPOSITORY, "format": "json", "inverted_index": {},
+                  "document_stats": None, "skip_lists": None, "metadata": load_metadata(None)}
+index_reload_lock = threading.Lock()
+readiness = {"ready": False}
+result_cache = create_result_cache()
 
 
-    results = {}
-    for doc in common_docs:
-        results[doc] = {}
-        for word in words:
-            results[doc][word] = {
-                "frequency": inverted_index[word][doc]["frequency"],
-                "positions": inverted_index[word][doc]["positions"]
-            }
-
-    return results
-
-
-def search_metadata(filters, metadata):
-    results = []
-
-    title_filter = filters.get('title', '').lower()
-    author_filter = filters.get('author', '').lower()
-    year_filter = filters.get('year', '').strip()
-    month_filter = filters.get('month', '').strip()
-    day_filter = filters.get('day', '').strip()
-    language_filter = filters.get('language', '').lower()
-
-    for entry in metadata:
-        title_matches = title_filter in entry.get('title', '').lower() if title_filter else True
+def load_inverted_index_from_json(json_file):
+    return read_inverted_index_json(json_file)
 
-        author_matches = author_filter in entry.get('author', '').lower() if author_filter else True
 
-        language_matches = language_filter in entry.get('language', '').lower() if language_filter else True
+def get_index_version(datamart_directory, index_file):
+    stat = os.stat(os.path.join(datamart_directory, index_file))
+    try:
+        doc_table_stat = os.stat(os.path.join(datamart_directory, DOC_TABLE_REPOSITORY))
+        doc_table_version = doc_table_stat.st_mtime_ns, doc_table_stat.st_size
+    except FileNotFoundError:
+        doc_table_version = None
+    return datamart_directory, index_file, stat.st_mtime_ns, stat.st_size, doc_table_version
+
+
+def refresh_index_snapshot(index_files):
+    global index_snapshot
+    with index_reload_lock:
+        datamart_directory = current_datamart_directory(DATAMARTS_REPOSITORY)
+        for index_file in index_files:
+            try:
+                version = get_index_version(datamart_directory, index_file)
+                break
+            except FileNotFoundError:
+                continue
+        else:
+            return False
+
+        if version == index_snapshot["version"]:
+            return False
 
-        entry_date = entry.get('release_date', '').strip()
         try:
-            entry_date_obj = datetime.strptime(entry_date, "%Y-%m-%d")
-            entry_year = str(entry_date_obj.year)
-            entry_month = str(entry_date_obj.month).zfill(2)
-            entry_day = str(entry_date_obj.day).zfill(2)
-        except ValueError:
-            continue
+            index_path = os.path.join(datamart_directory, index_file)
+            if index_file.endswith('.bin'):
+                index_format, inverted_index = "binary", open_binary_index(index_path)
+                warm_binary_index(inverted_index)
+            else:
+                index_format, inverted_index = "json", load_inverted_index_from_json(index_path)
+            document_stats = load_document_stats(os.path.join(datamart_directory, DOC_TABLE_REPOSITORY))
+            metadata = load_metadata(os.path.join(datamart_directory, METADATA_REPOSITORY))
+        except (json.JSONDecodeError, ValueError, OSError):
+            return False
 
-        year_matches = (year_filter == entry_year) if year_filter else True
-        month_matches = (month_filter == entry_month) if month_filter else True
-        day_matches = (day_filter == entry_day) if day_filter else True
+        index_snapshot = {"version": version, "directory": datamart_directory, "format": index_format,
+                          "inverted_index": inverted_index, "document_stats": document_stats,
+                          "skip_lists": {}, "metadata": metadata}
+        return True
 
-        date_matches = year_matches and month_matches and day_matches
 
-        if title_matches and author_matches and date_matches and language_matches:
-            results.append(entry)
+def watch_inverted_index(index_files, interval):
+    while True:
+        time.sleep(interval)
+        refresh_index_snapshot(index_files)
 
-    return results
 
+def start_index_watcher(index_files, interval=INDEX_RELOAD_INTERVAL):
+    refresh_index_snapshot(index_files)
+    watcher = threading.Thread(target=watch_inverted_index, args=(index_files, interval), daemon=True)
+    watcher.start()
+    return watcher
 
 
-metadata = load_metadata('Datamarts/Metadata Database/book_metadata.csv')
+def restart_index_watcher_after_fork():
+    # Threads do not survive fork(): a worker forked from a preloaded parent gets
+    # its own watcher and a fresh lock, and keeps the parent's snapshot.
+    global index_reload_lock
+    index_reload_lock = threading.Lock()
+    threading.Thread(target=watch_inverted_index, args=(INDEX_FILES, INDEX_RELOAD_INTERVAL), daemon=True).start()
 
 
-@app.route('/search/word_level', methods=['GET'])
-def search_unique_json_inverted():
-    inverted_index = load_inverted_index_from_json('Datamarts/Inverted Index/word_level.json')
-    query = request.args.get('query', '').strip()
-    if not query:
-        return jsonify({"error": "No search query provided"}), 400
+def warm_up():
+    refresh_index_snapshot(INDEX_FILES)
+    readiness["ready"] = True
 
-    results = search_inverted_index(query, inverted_index)
-    results = find_context_in_datalake(results)
-    return jsonify(results)
 
+def load_query_index(snapshot, query):
+    # Skip lists (term lists for a binary index) are kept with the snapshot, so
+    # each is built once per index version rather than on every query.
+    if snapshot["format"] == "binary":
+        return load_term_lists(snapshot["inverted_index"], query_terms(query), snapshot["skip_lists"]), \
+            snapshot["skip_lists"]
+    return snapshot["inverted_index"], snapshot["skip_lists"]
 
-@app.route('/search/metadata', methods=['GET'])
-def search_meta():
-    title = request.args.get('title', '').strip()
-    author = request.args.get('author', '').strip()
-    year = request.args.get('year', '').strip()
-    month = request.args.get('month', '').strip()
-    day = request.args.get('day', '').strip()
-    language = request.args.get('language', '').strip()
 
-    filters = {
-        'title': title,
-        'author': author,
-        'year': year,
-        'month': month,
-        'day': day,
-        'language': language
-    }
+start_index_watcher(INDEX_FILES)
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=restart_index_watcher_after_fork)
 
-    results = search_metadata(filters, metadata)
-    return jsonify(results)
+register_search_routes(app, lambda: index_snapshot, load_query_index, lambda: result_cache)
 
 
-@app.route('/libros/<path:filename>')
-def serve_book(filename):
-    datalake_directory = os.path.join(os.getcwd(), 'Datalake', 'eventstore', 'Gutenbrg')
-    try:
-        return send_from_directory(datalake_directory, filename)
-    except FileNotFoundError:
-        return jsonify({"error": "File not found"}), 404
+@app.route('/healthz', methods=['GET'])
+def healthz():
+    snapshot = index_snapshot
+    if not readiness["ready"] or snapshot["version"] is None:
+        return jsonify({"status": "warming"}), 503
+    return jsonify({"status": "ready", "format": snapshot["format"]})
 
 
 if __name__ == "__main__":
-    app.run(debug=True, host='0.0.0.0', port=5002)
\ No newline at end of file
+    threading.Thread(target=warm_up, daemon=True).start()
+    app.run(debug=True, host='0.0.0.0', port=5002)
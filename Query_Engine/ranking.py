@@ -0,0 +1,136 @@
+import heapq
+import math
+
+from Indexer.doc_table import load_doc_table
+from Query_Engine.intersection import iter_common_documents
+
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def load_document_stats(file_path):
+    doc_table = load_doc_table(file_path)
+    document_lengths = {doc_id: entry["length"] for doc_id, entry in enumerate(doc_table) if entry is not None}
+    document_names = {doc_id: entry["document"] for doc_id, entry in enumerate(doc_table) if entry is not None}
+
+    total_length = sum(document_lengths.values())
+    return {
+        "lengths": document_lengths,
+        "names": document_names,
+        "count": len(document_lengths),
+        "average_length": total_length / len(document_lengths) if document_lengths else 0,
+        "min_length": min(document_lengths.values(), default=0),
+    }
+
+
+def inverse_document_frequency(document_frequency, document_count):
+    return math.log(1 + (document_count - document_frequency + 0.5) / (document_frequency + 0.5))
+
+
+def bm25_term_score(idf, frequency, length, average_length):
+    length_ratio = length / average_length if average_length else 1
+    normalization = BM25_K1 * (1 - BM25_B + BM25_B * length_ratio)
+    return idf * frequency * (BM25_K1 + 1) / (frequency + normalization)
+
+
+def run_bounds(idf, term_list, document_stats):
+    # The highest score a document of each run of the term list can get: the run's
+    # largest frequency in its shortest document. Binary indexes store the
+    # shortest lengths; they are worked out (once per term list) for JSON ones.
+    # Lengths that are not known fall back to the shortest document of all. The
+    # bounds are kept with the term list for as long as the statistics hold.
+    min_length = document_stats["min_length"]
+    average_length = document_stats["average_length"]
+    cached = term_list.get("bounds")
+    if cached and cached[0] == (idf, min_length, average_length):
+        return cached[1]
+
+    lengths = document_stats["lengths"]
+    min_lengths = term_list.get("min_lengths")
+    if min_lengths is None:
+        doc_ids, step = term_list["doc_ids"], term_list["step"]
+        min_lengths = term_list["min_lengths"] = [min(lengths.get(doc, 0) for doc in doc_ids[start:start + step])
+                                                  for start in range(0, len(doc_ids), step)]
+
+    # Scores are summed in another order than bounds, so bounds get some slack.
+    bounds = [bm25_term_score(idf, frequency, max(length, min_length), average_length) * (1 + 1e-9)
+              for frequency, length in zip(term_list["max_frequencies"], min_lengths)]
+    term_list["bounds"] = (idf, min_length, average_length), bounds
+    return bounds
+
+
+def top_k_bm25(words, term_lists, document_stats, k=None, after=None, filters=(), accept=None, found=None):
+    # Ranks the documents found in the term list of every word and in every skip
+    # list of `filters` by (-score, doc) and returns the first k (all of them for
+    # k=None) as (score, doc) pairs. `after` is the (score, doc) of the last
+    # document of a previous page: only documents ranked after it compete.
+    # accept(doc) may still turn a document down (phrase and proximity queries).
+    #
+    # The lists are walked along the shortest one. A run of it, and then a single
+    # document, is skipped without being scored as soon as the bound of its score
+    # (see run_bounds) is below the k-th best score found so far. `found` records
+    # whether any document was in every list and whether any was accepted.
+    found = {} if found is None else found
+    found.update(matched=False, accepted=False)
+
+    lengths = document_stats["lengths"]
+    average_length = document_stats["average_length"]
+    words = sorted(set(words))
+    document_count = max([document_stats["count"]] + [len(term_lists[word]["doc_ids"]) for word in words])
+
+    skip_lists, idfs, bounds = [], [], []
+    for word in words:
+        term_list = term_lists[word]
+        idf = inverse_document_frequency(len(term_list["doc_ids"]), document_count)
+        skip_lists.append(term_list)
+        idfs.append(idf)
+        bounds.append(run_bounds(idf, term_list, document_stats))
+    scored = range(len(skip_lists))
+    skip_lists += filters
+
+    lead = min(range(len(skip_lists)), key=lambda i: len(skip_lists[i]["doc_ids"]))
+    lead_bounds = bounds[lead] if lead in scored else None
+    other_bounds = sum(max(bounds[i], default=0) for i in scored if i != lead)
+
+    after_key = None if after is None else (after[0], -after[1])
+    top_k = []
+    threshold = -math.inf
+
+    def skip_run(run):
+        return (lead_bounds[run] if lead_bounds else 0) + other_bounds < threshold
+
+    runs = None
+    if len(skip_lists) == 1:
+        # A single term list is walked best run first: the k-th best score then
+        # rises as fast as it can, and every run after a skipped one is skipped.
+        runs = sorted(range(len(lead_bounds)), key=lead_bounds.__getitem__, reverse=True)
+
+    for doc, cursors in iter_common_documents(skip_lists, lead, skip_run, runs):
+        found["matched"] = True
+        if sum(bounds[i][cursors[i] // skip_lists[i]["step"]] for i in scored) < threshold:
+            continue
+
+        length = lengths.get(doc, average_length)
+        score = sum(bm25_term_score(idfs[i], skip_lists[i]["frequencies"][cursors[i]], length, average_length)
+                    for i in scored)
+        key = (score, -doc)
+        if after_key is not None and key >= after_key:
+            if not found["accepted"] and (accept is None or accept(doc)):
+                found["accepted"] = True
+            continue
+        if top_k and len(top_k) == k and key <= top_k[0]:
+            continue
+        if accept is not None and not accept(doc):
+            continue
+
+        found["accepted"] = True
+        if k is None or len(top_k) < k:
+            heapq.heappush(top_k, key)
+        elif top_k:
+            heapq.heapreplace(top_k, key)
+        if k is not None and len(top_k) == k:
+            # With k=0 nothing is kept: once a document is accepted, all is known.
+            threshold = top_k[0][0] if top_k else math.inf
+
+    return sorted(((score, -doc) for score, doc in top_k), key=lambda entry: (-entry[0], entry[1]))
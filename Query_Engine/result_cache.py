@@ -0,0 +1,135 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+
+# Finished search responses keyed by the index version they were computed
+# against and the normalized request (parsed query, paging, filters). Entries
+# expire after RESULT_CACHE_TTL seconds and the least recently used are evicted
+# past RESULT_CACHE_SIZE. A new index version makes every older entry
+# unreachable; the in-memory backend also drops them at once. When
+# RESULT_CACHE_DIRECTORY is set, entries are JSON files in that directory,
+# shared by every worker process on the host.
+
+RESULT_CACHE_SIZE = int(os.environ.get('RESULT_CACHE_SIZE', 1024))
+RESULT_CACHE_TTL = float(os.environ.get('RESULT_CACHE_TTL', 300))
+RESULT_CACHE_DIRECTORY = os.environ.get('RESULT_CACHE_DIRECTORY', '')
+DISK_PRUNE_INTERVAL = 64
+
+
+def create_result_cache(max_entries=RESULT_CACHE_SIZE, ttl=RESULT_CACHE_TTL, directory=RESULT_CACHE_DIRECTORY):
+    if directory and not os.path.exists(directory):
+        os.makedirs(directory, exist_ok=True)
+    return {"entries": OrderedDict(), "version": None, "max_entries": max_entries, "ttl": ttl,
+            "directory": directory, "lock": threading.Lock(), "puts": 0,
+            "stats": {"hits": 0, "misses": 0, "evictions": 0}}
+
+
+def result_cache_key(version, params):
+    encoded = json.dumps([version, params], sort_keys=True, ensure_ascii=False, default=list)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def get_cached_result(cache, version, params):
+    if cache["max_entries"] <= 0:
+        return None
+    key = result_cache_key(version, params)
+
+    if cache["directory"]:
+        entry = read_disk_entry(os.path.join(cache["directory"], f"{key}.json"))
+    else:
+        with cache["lock"]:
+            if cache["version"] != version:
+                cache["entries"].clear()
+                cache["version"] = version
+            entry = cache["entries"].get(key)
+            if entry is not None:
+                cache["entries"].move_to_end(key)
+
+    with cache["lock"]:
+        if entry is None or entry["expires"] < time.time():
+            cache["stats"]["misses"] += 1
+            return None
+        cache["stats"]["hits"] += 1
+    return entry["value"]
+
+
+def put_cached_result(cache, version, params, value):
+    if cache["max_entries"] <= 0:
+        return
+    key = result_cache_key(version, params)
+    entry = {"expires": time.time() + cache["ttl"], "value": value}
+
+    if cache["directory"]:
+        write_disk_entry(os.path.join(cache["directory"], f"{key}.json"), entry)
+        with cache["lock"]:
+            cache["puts"] += 1
+            prune = cache["puts"] % DISK_PRUNE_INTERVAL == 0
+        if prune:
+            prune_disk_entries(cache)
+        return
+
+    with cache["lock"]:
+        if cache["version"] != version:
+            cache["entries"].clear()
+            cache["version"] = version
+        cache["entries"][key] = entry
+        cache["entries"].move_to_end(key)
+        while len(cache["entries"]) > cache["max_entries"]:
+            cache["entries"].popitem(last=False)
+            cache["stats"]["evictions"] += 1
+
+
+def cache_documents(cache, version, params, documents, next_cursor):
+    # Passes streamed documents through and caches the page once it is complete.
+    results = {}
+    for document, doc_results in documents:
+        results[document] = doc_results
+        yield document, doc_results
+    put_cached_result(cache, version, params, {"results": results, "next_cursor": next_cursor})
+
+
+def read_disk_entry(entry_file):
+    try:
+        with open(entry_file, 'r', encoding='utf-8') as f:
+            entry = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+    try:
+        os.utime(entry_file)
+    except OSError:
+        # Another worker pruned the entry after it was read; it is still valid.
+        pass
+    return entry
+
+
+def write_disk_entry(entry_file, entry):
+    temporary_file = f"{entry_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporary_file, 'w', encoding='utf-8') as f:
+        json.dump(entry, f, ensure_ascii=False)
+    os.replace(temporary_file, entry_file)
+
+
+def prune_disk_entries(cache):
+    # Files are touched on every hit, so modification time orders them by use.
+    entries = []
+    for filename in os.listdir(cache["directory"]):
+        if filename.endswith('.json'):
+            try:
+                entries.append((os.stat(os.path.join(cache["directory"], filename)).st_mtime, filename))
+            except FileNotFoundError:
+                continue
+    entries.sort(reverse=True)
+
+    oldest_kept = time.time() - cache["ttl"]
+    for rank, (mtime, filename) in enumerate(entries):
+        if rank >= cache["max_entries"] or mtime < oldest_kept:
+            try:
+                os.remove(os.path.join(cache["directory"], filename))
+            except FileNotFoundError:
+                continue
+            with cache["lock"]:
+                cache["stats"]["evictions"] += 1
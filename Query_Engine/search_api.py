@@ -0,0 +1,266 @@
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from flask import Response, request, jsonify, send_from_directory
+from werkzeug.security import safe_join
+
+from Indexer.binary_index import load_entries, load_positions
+from Indexer.book_store import START_OF_BOOK_PATTERN, iter_book_chunks, read_book, stored_book_path
+from Indexer.snippet_offsets import read_snippet, snippet_window
+from Query_Engine.intersection import build_skip_list, get_skip_list, intersect_postings
+from Query_Engine.metadata_search import METADATA_FILTERS, search_metadata, filter_documents
+from Query_Engine.pagination import decode_cursor, encode_cursor, iter_ndjson, limit_positions
+from Query_Engine.positional import parse_query, matches_positional_constraints
+from Query_Engine.ranking import top_k_bm25
+from Query_Engine.result_cache import cache_documents, get_cached_result, put_cached_result
+
+
+# The HTTP API both query engines serve. An engine only provides its index:
+# get_datamart() returns the datamart a request is answered from (a dict with
+# its "version", "directory", "document_stats" and "metadata") and
+# load_query_index(datamart, query) returns the postings of the query terms and
+# their skip lists (see register_search_routes). Binary indexes return empty
+# postings dicts and their term lists (Indexer.binary_index.load_term_lists).
+
+DATALAKE_REPOSITORY = 'Datalake/eventstore/Gutenbrg'
+SNIPPET_OFFSETS_REPOSITORY = 'Snippet Offsets'
+DEFAULT_TOP_K = 10
+QUERY_IO_CONCURRENCY = int(os.environ.get('QUERY_IO_CONCURRENCY', 8))
+
+io_executor = ThreadPoolExecutor(max_workers=QUERY_IO_CONCURRENCY)
+
+
+def find_paragraph_in_book(text_id, pos):
+    paragraph = ""
+    document = read_book(os.path.join(DATALAKE_REPOSITORY, text_id))
+    start_content = START_OF_BOOK_PATTERN.search(document)
+    if start_content:
+        start_text = start_content.end()
+        content_later = document[start_text:].strip()
+
+        words = content_later.split()
+        if 0 <= pos < len(words):
+            start, end = snippet_window(pos, len(words))
+            paragraph = " ".join(words[start:end])
+
+    return paragraph
+
+
+def read_paragraph(text_id, pos, datamart_directory):
+    book_file = os.path.join(DATALAKE_REPOSITORY, text_id)
+    offsets_file = os.path.join(datamart_directory, SNIPPET_OFFSETS_REPOSITORY, f"{text_id}.off")
+
+    paragraph = read_snippet(book_file, offsets_file, pos)
+    if paragraph is None:
+        paragraph = find_paragraph_in_book(text_id, pos)
+    return paragraph
+
+
+def iter_context_in_datalake(query_result, datamart_directory, window=QUERY_IO_CONCURRENCY):
+    # Snippets are read on the I/O pool with at most `window` documents in flight;
+    # documents are yielded in rank order as soon as their snippets are ready.
+    pending = deque()
+
+    def complete(text_id, doc_results, paragraphs):
+        for hits, paragraph in paragraphs:
+            hits["paragraph"] = paragraph.result()
+        return text_id, doc_results
+
+    for text_id, doc_results in query_result.items():
+        paragraphs = [(hits, io_executor.submit(read_paragraph, text_id, hits["positions"][0], datamart_directory))
+                      for hits in doc_results.values()]
+        pending.append((text_id, doc_results, paragraphs))
+        if len(pending) > window:
+            yield complete(*pending.popleft())
+
+    while pending:
+        yield complete(*pending.popleft())
+
+
+def is_ranked_result(query_result):
+    return all(isinstance(doc_results, dict) for doc_results in query_result.values())
+
+
+def find_context_in_datalake(query_result, datamart_directory):
+    if not is_ranked_result(query_result):
+        return query_result
+    return dict(iter_context_in_datalake(query_result, datamart_directory))
+
+
+def load_documents(words, inverted_index, term_lists, docs):
+    # Binary postings start out empty: only the entries and positions of the
+    # documents a query gets to are read from the index.
+    for word in words:
+        load_entries(inverted_index[word], term_lists[word], docs)
+        load_positions(inverted_index[word], docs)
+
+
+def search_inverted_index(query, inverted_index, document_stats=None, k=None, offset=0, skip_lists=None,
+                          allowed_docs=None, after=None, page=None):
+    if not query.split():
+        return {"error": "Please provide at least one word in the query."}
+
+    parsed_query = parse_query(query)
+    words = parsed_query["terms"]
+
+    words = [word for word in words if word in inverted_index]
+
+    if len(words) == 0:
+        return {"message": "No words from the query are present in the inverted index."}
+
+    term_lists = {word: get_skip_list(word, inverted_index, skip_lists) for word in set(words)}
+    positional = parsed_query["phrases"] or parsed_query["near"]
+
+    if document_stats is None:
+        ranked_docs = intersect_postings(words, inverted_index, term_lists, allowed_docs)
+        if not ranked_docs:
+            return {"message": f"No documents contain all the words: {', '.join(words)}"}
+        if positional:
+            load_documents(words, inverted_index, term_lists, ranked_docs)
+            ranked_docs = [doc for doc in ranked_docs
+                           if matches_positional_constraints(doc, parsed_query, inverted_index)]
+            if not ranked_docs:
+                return {"message": f"No documents match the phrase or proximity query: {query}"}
+    else:
+        # Ranking walks the term lists itself and only checks the positions of
+        # documents that could still make it into the page.
+        def accept(doc):
+            load_documents(words, inverted_index, term_lists, [doc])
+            return matches_positional_constraints(doc, parsed_query, inverted_index)
+
+        found = {}
+        filters = [build_skip_list(allowed_docs)] if allowed_docs is not None else []
+        ranked = top_k_bm25(words, term_lists, document_stats, None if k is None else k + offset, after, filters,
+                            accept if positional else None, found)[offset:]
+        if not found["matched"]:
+            return {"message": f"No documents contain all the words: {', '.join(words)}"}
+        if not found["accepted"]:
+            return {"message": f"No documents match the phrase or proximity query: {query}"}
+        ranked_docs = [doc for _, doc in ranked]
+        if page is not None and k is not None and ranked and len(ranked) == k:
+            page["last"] = ranked[-1]
+
+    document_names = document_stats["names"] if document_stats is not None else {}
+
+    load_documents(words, inverted_index, term_lists, ranked_docs)
+
+    results = {}
+    for doc in ranked_docs:
+        doc_results = results[document_names.get(doc, doc)] = {}
+        for word in words:
+            doc_results[word] = {
+                "frequency": inverted_index[word][doc]["frequency"],
+                "positions": inverted_index[word][doc]["positions"]
+            }
+
+    return results
+
+
+def get_metadata_filters():
+    return {name: request.args.get(name, '').strip() for name in METADATA_FILTERS}
+
+
+def results_response(results, next_cursor):
+    # format=ndjson streams one line per document; otherwise the whole page is
+    # one JSON object. Both expose the cursor of the next page.
+    if request.args.get('format') == 'ndjson' and is_ranked_result(results):
+        return Response(iter_ndjson(results.items(), next_cursor), mimetype='application/x-ndjson')
+    response = jsonify(results)
+    if next_cursor:
+        response.headers['X-Next-Cursor'] = next_cursor
+    return response
+
+
+def search_response(results, page, max_positions, datamart_directory, result_cache, cache_version, cache_params):
+    next_cursor = encode_cursor(*page["last"]) if "last" in page else None
+    if not is_ranked_result(results):
+        put_cached_result(result_cache, cache_version, cache_params, {"results": results, "next_cursor": None})
+        return results_response(results, None)
+
+    documents = ((document, limit_positions(doc_results, max_positions))
+                 for document, doc_results in iter_context_in_datalake(results, datamart_directory))
+    if request.args.get('format') == 'ndjson':
+        documents = cache_documents(result_cache, cache_version, cache_params, documents, next_cursor)
+        return Response(iter_ndjson(documents, next_cursor), mimetype='application/x-ndjson')
+
+    results = dict(documents)
+    put_cached_result(result_cache, cache_version, cache_params, {"results": results, "next_cursor": next_cursor})
+    return results_response(results, next_cursor)
+
+
+def search_word_level(datamart, load_query_index, result_cache, metadata_filters=None):
+    query = request.args.get('query', '').strip()
+    if not query:
+        return jsonify({"error": "No search query provided"}), 400
+
+    k = request.args.get('k', DEFAULT_TOP_K, type=int)
+    offset = request.args.get('offset', 0, type=int)
+    max_positions = request.args.get('max_positions', type=int)
+    if k < 0 or offset < 0 or (max_positions is not None and max_positions < 0):
+        return jsonify({"error": "k, offset and max_positions must be non-negative integers"}), 400
+
+    cursor = request.args.get('cursor', '')
+    after = decode_cursor(cursor) if cursor else None
+    if cursor and after is None:
+        return jsonify({"error": "Invalid cursor"}), 400
+
+    cache_version = datamart["version"]
+    cache_params = [parse_query(query), k, offset, cursor, max_positions, metadata_filters]
+    cached = get_cached_result(result_cache, cache_version, cache_params)
+    if cached is not None:
+        return results_response(cached["results"], cached["next_cursor"])
+
+    allowed_docs = filter_documents(metadata_filters, datamart["metadata"]) if metadata_filters else None
+    if allowed_docs is not None and not allowed_docs:
+        return jsonify({"message": "No documents match the metadata filters."})
+
+    inverted_index, skip_lists = load_query_index(datamart, query)
+
+    page = {}
+    results = search_inverted_index(query, inverted_index, datamart["document_stats"], k, offset, skip_lists,
+                                    allowed_docs, after, page)
+    return search_response(results, page, max_positions, datamart["directory"], result_cache, cache_version,
+                           cache_params)
+
+
+def result_cache_report(result_cache):
+    with result_cache["lock"]:
+        report = dict(result_cache["stats"])
+    if result_cache["directory"]:
+        report["backend"], report["entries"] = "disk", len(os.listdir(result_cache["directory"]))
+    else:
+        report["backend"], report["entries"] = "memory", len(result_cache["entries"])
+    return report
+
+
+def serve_book(filename):
+    datalake_directory = os.path.abspath(DATALAKE_REPOSITORY)
+    book_file = safe_join(datalake_directory, filename)
+    if book_file is None or stored_book_path(book_file) is None:
+        return jsonify({"error": "File not found"}), 404
+    if os.path.exists(book_file):
+        return send_from_directory(datalake_directory, filename)
+    return Response(iter_book_chunks(book_file), mimetype='text/plain; charset=utf-8')
+
+
+def register_search_routes(app, get_datamart, load_query_index, get_result_cache):
+    # The getters are called on every request, so an engine can swap its datamart
+    # snapshot or result cache without registering the routes again.
+    def search_word_level_route():
+        return search_word_level(get_datamart(), load_query_index, get_result_cache())
+
+    def search_combined_route():
+        return search_word_level(get_datamart(), load_query_index, get_result_cache(), get_metadata_filters())
+
+    def search_metadata_route():
+        return jsonify(search_metadata(get_metadata_filters(), get_datamart()["metadata"]))
+
+    def result_cache_route():
+        return jsonify(result_cache_report(get_result_cache()))
+
+    app.add_url_rule('/search/word_level', 'search_word_level', search_word_level_route, methods=['GET'])
+    app.add_url_rule('/search/combined', 'search_combined', search_combined_route, methods=['GET'])
+    app.add_url_rule('/search/metadata', 'search_metadata', search_metadata_route, methods=['GET'])
+    app.add_url_rule('/stats/result_cache', 'result_cache_report', result_cache_route, methods=['GET'])
+    app.add_url_rule('/libros/<path:filename>', 'serve_book', serve_book)
@@ -0,0 +1,108 @@
+import argparse
+import gc
+import importlib
+import os
+import signal
+import socket
+
+from werkzeug.serving import make_server
+
+
+# Production entry point for the query engines: python -m Query_Engine.wsgi_server <engine>.
+# The engine is imported and warmed once in the parent, then the parent forks the
+# workers. Binary indexes are mmapped, so every worker reads the same pages from
+# the page cache; JSON indexes are shared copy-on-write, with gc.freeze() keeping
+# the collector from touching (and so copying) the preloaded objects. Workers are
+# gunicorn gthread workers when gunicorn is installed, otherwise forked werkzeug
+# threaded servers accepting on one shared listening socket.
+
+ENGINES = {
+    "unique_json": ("Query_Engine.query_engine_unique_json", 5002),
+    "tree": ("Query_Engine.query_engine_tree_data_structure", 5001),
+}
+QUERY_ENGINE_WORKERS = int(os.environ.get('QUERY_ENGINE_WORKERS', os.cpu_count() or 1))
+QUERY_ENGINE_THREADS = int(os.environ.get('QUERY_ENGINE_THREADS', 4))
+
+
+def load_engine(engine):
+    module = importlib.import_module(ENGINES[engine][0])
+    module.warm_up()
+    gc.freeze()
+    return module.app
+
+
+def serve_with_gunicorn(app, host, port, workers, threads):
+    from gunicorn.app.base import BaseApplication
+
+    class QueryEngineApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set('bind', f'{host}:{port}')
+            self.cfg.set('workers', workers)
+            self.cfg.set('threads', threads)
+            self.cfg.set('worker_class', 'gthread')
+            self.cfg.set('preload_app', True)
+
+        def load(self):
+            return app
+
+    QueryEngineApplication().run()
+
+
+def run_worker(app, listener):
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    host, port = listener.getsockname()[:2]
+    server = make_server(host, port, app, threaded=True, fd=listener.fileno())
+    server.serve_forever()
+
+
+def serve_with_prefork(app, host, port, workers):
+    listener = socket.create_server((host, port), backlog=1024)
+    if workers <= 1 or not hasattr(os, 'fork'):
+        run_worker(app, listener)
+        return
+
+    children = set()
+
+    def stop_workers(signum, frame):
+        for pid in children:
+            os.kill(pid, signal.SIGTERM)
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, stop_workers)
+    signal.signal(signal.SIGINT, stop_workers)
+
+    while True:
+        while len(children) < workers:
+            pid = os.fork()
+            if pid == 0:
+                try:
+                    run_worker(app, listener)
+                finally:
+                    os._exit(0)
+            children.add(pid)
+        pid, _ = os.wait()
+        children.discard(pid)
+
+
+def serve(engine, host='0.0.0.0', port=None, workers=QUERY_ENGINE_WORKERS, threads=QUERY_ENGINE_THREADS):
+    port = ENGINES[engine][1] if port is None else port
+    app = load_engine(engine)
+    try:
+        importlib.import_module('gunicorn')
+    except ImportError:
+        serve_with_prefork(app, host, port, workers)
+    else:
+        serve_with_gunicorn(app, host, port, workers, threads)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a query engine with several worker processes.")
+    parser.add_argument('engine', choices=sorted(ENGINES))
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int)
+    parser.add_argument('--workers', type=int, default=QUERY_ENGINE_WORKERS)
+    parser.add_argument('--threads', type=int, default=QUERY_ENGINE_THREADS)
+    args = parser.parse_args()
+
+    serve(args.engine, args.host, args.port, args.workers, args.threads)
@@ -6,7 +6,7 @@ import time
 def run_crawler():
     print("Running the Crawler...")
     try:
-        subprocess.run(["python", "Crawler/crawler.py"], check=True)
+        subprocess.run(["python", "-m", "Crawler.crawler"], check=True)
     except subprocess.CalledProcessError as e:
         print(f"Error running crawler: {e}")
 
@@ -15,9 +15,7 @@ def run_indexer():
     while True:
         print("Running the Indexer...")
         try:
-            subprocess.run(["python", "Indexer/tree_indexer.py"], check=True)
-            subprocess.run(["python", "Indexer/metadata_indexer.py"], check=True)
-            subprocess.run(["python", "Indexer/unique_json_indexer.py"], check=True)
+            subprocess.run(["python", "-m", "Indexer.incremental_indexer"], check=True)
             print("Indexer completed. Waiting for 30 minutes before the next run...")
         except subprocess.CalledProcessError as e:
             print(f"Error running indexer: {e}")
@@ -28,7 +26,7 @@ def run_indexer():
 def run_query_engine_unique_json():
     print("Running Query Engine: Unique JSON...")
     try:
-        subprocess.run(["python", "Query_Engine/query_engine_unique_json.py"], check=True)
+        subprocess.run(["python", "-m", "Query_Engine.wsgi_server", "unique_json"], check=True)
     except subprocess.CalledProcessError as e:
         print(f"Error running query_engine_unique_json: {e}")
 
@@ -36,7 +34,7 @@ def run_query_engine_unique_json():
 def run_query_engine_tree():
     print("Running Query Engine: Tree Data Structure...")
     try:
-        subprocess.run(["python", "Query_Engine/query_engine_tree_data_structure.py"], check=True)
+        subprocess.run(["python", "-m", "Query_Engine.wsgi_server", "tree"], check=True)
     except subprocess.CalledProcessError as e:
         print(f"Error running query_engine_tree_data_structure: {e}")
 
@@ -1,13 +1,43 @@
+import csv
+import json
+import os
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
 import pytest
 
+from Crawler.crawler import crawl_bookshelves, load_crawl_ledger, load_crawl_state, save_crawl_state
 from Indexer.tree_indexer import build_inverted_index_with_positions as build_inverted_index_with_positions_tree
 from Indexer.tree_indexer import load_books_from_directory as load_books_from_directory_tree
-from Indexer.tree_indexer import export_inverted_index_to_json_by_letter
+from Indexer.tree_indexer import export_inverted_index_to_binary_by_letter, export_inverted_index_to_json_by_letter
 from Indexer.unique_json_indexer import build_inverted_index_with_positions as build_inverted_index_with_positions_json
 from Indexer.unique_json_indexer import load_books_from_directory as load_books_from_directory_json
-from Indexer.unique_json_indexer import export_inverted_index_json
+from Indexer.unique_json_indexer import export_document_lengths, export_inverted_index_json, read_inverted_index_json
+from Indexer.binary_index import export_inverted_index_binary, iter_inverted_index, load_entries, load_positions, \
+    load_term_lists, open_binary_index
+from Indexer.parallel_indexer import build_inverted_index_parallel, build_sorted_runs_parallel
+from Indexer.datamart_versions import atomic_write, current_datamart_directory, current_version, \
+    new_datamart_version
+from Indexer.book_store import iter_book_chunks, list_book_names, read_book, read_book_bytes, stored_book_path, write_book
+from Indexer import combined_indexer, incremental_indexer
+from Indexer.incremental_indexer import iter_word_level_index, run_incremental_index
+from Indexer.doc_table import compute_document_lengths, doc_ids_by_name, export_doc_table, new_doc_table, \
+    number_documents
+from Indexer.metadata_indexer import process_metadata
+from Indexer.sorted_runs import merge_sorted_runs
+from Indexer.snippet_offsets import read_snippet, write_token_offsets
+from Query_Engine.intersection import build_skip_list, get_skip_list, intersect_postings
+from Query_Engine.metadata_search import filter_documents, load_metadata, search_metadata
+from Query_Engine.ranking import load_document_stats, top_k_bm25
+from Query_Engine.result_cache import create_result_cache, get_cached_result, put_cached_result
+from Query_Engine.search_api import search_inverted_index
 from Query_Engine.query_engine_tree_data_structure import app as app_tree
+from Query_Engine.query_engine_tree_data_structure import load_inverted_index_from_json as load_tree_shards
 from Query_Engine.query_engine_unique_json import app as app_json
+from Query_Engine import query_engine_tree_data_structure as engine_tree, query_engine_unique_json as engine_json
+from Query_Engine import search_api
 
 
 
@@ -24,25 +54,672 @@ def client_tree():
 
 
 @pytest.mark.benchmark
-def test_execution_time_export_json_inverted_index(benchmark):
+def test_execution_time_export_json_inverted_index(benchmark, tmp_path):
     books_directory = 'Datalake/eventstore/Gutenbrg'
     documents = load_books_from_directory_json(books_directory)
     inveted_index = build_inverted_index_with_positions_json(documents)
-    directory = 'Datamarts/Inverted Index/word_level.json'
+    directory = str(tmp_path / 'word_level.json')
     benchmark.pedantic(export_inverted_index_json, args=(inveted_index, directory,), iterations=5, rounds=5)
 
 
 @pytest.mark.benchmark
-def test_execution_time_export_tree_structure_inverted_index(benchmark):
+def test_execution_time_export_tree_structure_inverted_index(benchmark, tmp_path):
     books_directory = 'Datalake/eventstore/Gutenbrg'
     documents = load_books_from_directory_tree(books_directory)
     inverted_index = build_inverted_index_with_positions_tree(documents)
-    directory = 'Datamarts/Inverted Index/Tree Data Structure'
+    directory = str(tmp_path / 'Tree Data Structure')
 
     benchmark.pedantic(export_inverted_index_to_json_by_letter, args=(inverted_index, directory,), iterations=5, rounds=5)
 
 
+def write_synthetic_gutenberg(directory, num_books, words_per_book=300):
+    rng = random.Random(num_books)
+    vocabulary = [f"term{i}" for i in range(5000)]
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    os.makedirs(directory, exist_ok=True)
+
+    for book in range(num_books):
+        words = ["African", "History"] + rng.choices(vocabulary, weights=weights, k=words_per_book)
+        with open(os.path.join(directory, f"Synthetic_Book_{book}.txt"), 'w', encoding='utf-8') as f:
+            f.write(f"Title: Synthetic Book {book}\n*** START OF THE PROJECT GUTENBERG EBOOK {book} ***\n")
+            f.write(" ".join(words))
+
+
+@pytest.fixture(scope="session")
+def synthetic_gutenberg(tmp_path_factory):
+    directories = {}
+
+    def make(num_books):
+        if num_books not in directories:
+            directory = tmp_path_factory.mktemp(f"gutenberg_{num_books}")
+            write_synthetic_gutenberg(directory, num_books)
+            directories[num_books] = list(load_books_from_directory_json(directory))
+        return directories[num_books]
+
+    return make
+
+
+def test_build_inverted_index_with_positions_output():
+    documents = [("a.txt", "The river, river! Gold"), ("b.txt", "gold RIVER")]
+    expected = {
+        "river": [["a.txt", "b.txt"], [[1, 2], [1]], [2, 1]],
+        "gold": [["a.txt", "b.txt"], [[3], [0]], [1, 1]],
+    }
+
+    assert build_inverted_index_with_positions_json(documents) == expected
+    assert build_inverted_index_with_positions_tree(documents) == expected
+
+
+@pytest.mark.parametrize("num_books", [100, 1000, 10000])
+@pytest.mark.benchmark(group="build_inverted_index")
+def test_execution_time_build_inverted_index(synthetic_gutenberg, benchmark, num_books):
+    documents = synthetic_gutenberg(num_books)
+    benchmark.pedantic(build_inverted_index_with_positions_json, args=(documents,), iterations=1, rounds=3)
+
+
+def test_build_inverted_index_scales_linearly(synthetic_gutenberg):
+    def seconds_per_book(documents):
+        timings = []
+        for _ in range(3):
+            start = time.perf_counter()
+            build_inverted_index_with_positions_json(documents)
+            timings.append(time.perf_counter() - start)
+        return min(timings) / len(documents)
+
+    small = seconds_per_book(synthetic_gutenberg(1000))
+    large = seconds_per_book(synthetic_gutenberg(10000))
+
+    assert large < 3 * small
+
+
+def test_parallel_index_matches_serial_index(tmp_path):
+    write_synthetic_gutenberg(tmp_path, 40)
+    doc_table = []
+    documents = list(load_books_from_directory_json(tmp_path, doc_table))
+
+    parallel_index = build_inverted_index_parallel(tmp_path, workers=2, books_per_run=7)
+
+    assert parallel_index == build_inverted_index_with_positions_json(documents)
+    assert [entry["document"] for entry in doc_table] == sorted(os.listdir(tmp_path))
+
+
+def test_full_builds_keep_the_doc_ids_of_the_current_doc_table(tmp_path):
+    books_directory = tmp_path / "books"
+    write_synthetic_gutenberg(books_directory, 6)
+    doc_table = new_doc_table(["Synthetic_Book_5.txt", "Gone.txt"])
+    documents = list(load_books_from_directory_json(books_directory, doc_table))
+    doc_ids = doc_ids_by_name(doc_table)
+    assert doc_ids["Synthetic_Book_5.txt"] == 0 and doc_ids["Synthetic_Book_0.txt"] == 2
+
+    file_paths = [os.path.join(books_directory, entry["document"]) for entry in doc_table[2:]] + \
+        [os.path.join(books_directory, "Synthetic_Book_5.txt")]
+    os.makedirs(tmp_path / "runs")
+    run_files = build_sorted_runs_parallel(file_paths, tmp_path / "runs", [2, 3, 4, 5, 6, 0], workers=2,
+                                           books_per_run=4)
+    assert dict(merge_sorted_runs(run_files)) == build_inverted_index_with_positions_json(documents)
+
+    metadata_table = process_metadata(books_directory, tmp_path / "book_metadata.csv",
+                                      new_doc_table(["Synthetic_Book_5.txt"]))
+    with open(tmp_path / "book_metadata.csv", encoding='utf-8') as f:
+        metadata_ids = {row["document"]: int(row["doc_id"]) for row in csv.DictReader(f)}
+    assert metadata_ids == doc_ids_by_name(metadata_table) and metadata_ids["Synthetic_Book_5.txt"] == 0
+
+
+def read_datamart(datamarts):
+    index_directory = os.path.join(current_datamart_directory(datamarts), 'Inverted Index')
+    entries = {"word_level": iter_word_level_index(os.path.join(index_directory, 'word_level.bin'),
+                                                   os.path.join(index_directory, 'word_level.json'))}
+    tree_directory = os.path.join(index_directory, 'Tree Data Structure')
+    for letter in os.listdir(tree_directory):
+        for name in os.listdir(os.path.join(tree_directory, letter)):
+            shard = os.path.join(tree_directory, letter, name)
+            entries[name] = iter_inverted_index(open_binary_index(shard)) if name.endswith('.bin') else \
+                ((word, [list(documents), [entry["positions"] for entry in documents.values()]])
+                 for word, documents in read_inverted_index_json(shard).items())
+    with open(os.path.join(index_directory, 'doc_table.json'), encoding='utf-8') as f:
+        doc_table = json.load(f)
+    return doc_table, {name: {word: dict(zip(postings[0], postings[1])) for word, postings in shard}
+                       for name, shard in entries.items()}
+
+
+@pytest.mark.parametrize("index_format", ["binary", "json"])
+def test_memory_limited_builds_match_in_memory_builds(tmp_path, monkeypatch, index_format):
+    monkeypatch.setattr(incremental_indexer, "INDEX_FORMAT", index_format)
+    monkeypatch.setattr(combined_indexer, "INDEX_FORMAT", index_format)
+    books_directory = tmp_path / "books"
+    write_synthetic_gutenberg(books_directory, 12)
+    (books_directory / "Zebra.txt").write_text("*** START OF THE PROJECT GUTENBERG EBOOK 12 ***\nzebra african")
+
+    def build_both():
+        for memory_limit in (0, 20000):
+            monkeypatch.setattr(incremental_indexer, "INDEXER_MEMORY_LIMIT", memory_limit)
+            run_incremental_index(str(books_directory), str(tmp_path / f"datamarts_{memory_limit}"))
+        in_memory, spilled = read_datamart(tmp_path / "datamarts_0"), read_datamart(tmp_path / "datamarts_20000")
+        assert spilled == in_memory
+        return in_memory
+
+    _, datamart = build_both()
+    assert {"z_words.bin", "z_words.json"} & set(datamart)
+
+    os.remove(books_directory / "Zebra.txt")
+    os.remove(books_directory / "Synthetic_Book_3.txt")
+    (books_directory / "Synthetic_Book_5.txt").write_text("*** START OF THE PROJECT GUTENBERG EBOOK 5 ***\nquokka")
+    doc_table, datamart = build_both()
+    assert not any(name.startswith("z_") for name in datamart) and datamart["word_level"]["quokka"]
+    assert "Synthetic_Book_3.txt" not in doc_ids_by_name(doc_table) and "zebra" not in datamart["word_level"]
+
+
+def build_query_inverted_index(documents):
+    inverted_index = {}
+    for word, (doc_ids, positions, frequencies) in build_inverted_index_with_positions_json(documents).items():
+        inverted_index[word] = {doc: {"positions": p, "frequency": f}
+                                for doc, p, f in zip(doc_ids, positions, frequencies)}
+    return inverted_index
+
+
+def test_phrase_and_near_queries():
+    documents = [("a.txt", "African people were slaves in the old kingdom"),
+                 ("b.txt", "slaves were freed while African people watched")]
+    inverted_index = build_query_inverted_index(documents)
+
+    assert set(search_inverted_index('african people slaves', inverted_index)) == {"a.txt", "b.txt"}
+    assert set(search_inverted_index('"african people were slaves"', inverted_index)) == {"a.txt"}
+    assert set(search_inverted_index('slaves NEAR/2 freed', inverted_index)) == {"b.txt"}
+    assert "message" in search_inverted_index('"people african"', inverted_index)
+
+
+def test_query_terms_are_analyzed_like_the_index(tmp_path):
+    documents = [("a.txt", "A short History of Africa."), ("b.txt", "history of europe")]
+    inverted_index = build_query_inverted_index(documents)
+    numbered_documents = [(doc_id, text) for doc_id, (_, text) in enumerate(documents)]
+    export_inverted_index_to_json_by_letter(build_inverted_index_with_positions_tree(numbered_documents), tmp_path)
+
+    assert set(search_inverted_index("History, of AFRICA!", inverted_index)) == {"a.txt"}
+    assert "message" in search_inverted_index("of the", inverted_index)
+    tree_index = load_tree_shards("History of Africa, Zanzibar", tmp_path)
+    assert set(tree_index) == {"history", "africa"}
+    assert set(tree_index["africa"]) == {0}
+
+
+def test_index_writers_replace_the_other_index_format(tmp_path):
+    inverted_index = build_inverted_index_with_positions_json([(0, "wombat africa"), (1, "africa")])
+    export_inverted_index_binary(inverted_index, str(tmp_path / "word_level.bin"))
+    export_inverted_index_json(inverted_index, str(tmp_path / "word_level.json"))
+    assert os.listdir(tmp_path) == ["word_level.json"]
+    export_inverted_index_binary(inverted_index, str(tmp_path / "word_level.bin"))
+    assert os.listdir(tmp_path) == ["word_level.bin"]
+
+    tree_directory = tmp_path / "tree"
+    export_inverted_index_to_binary_by_letter(inverted_index, tree_directory)
+    export_inverted_index_to_json_by_letter(inverted_index, tree_directory)
+    assert os.listdir(tree_directory / "w") == ["w_words.json"]
+    assert set(load_tree_shards("wombat", tree_directory)["wombat"]) == {0}
+
+
+def test_binary_term_lists_read_entries_only_for_the_documents_needed(tmp_path):
+    documents = [(doc, "wombat africa wombat" if doc % 50 == 0 else "wombat") for doc in range(200)]
+    export_inverted_index_binary(build_inverted_index_with_positions_json(documents), str(tmp_path / "word_level.bin"))
+    term_lists = {}
+    postings = load_term_lists(open_binary_index(str(tmp_path / "word_level.bin")), ["wombat", "africa", "zebra"],
+                               term_lists)
+    assert postings == {"wombat": {}, "africa": {}} and list(term_lists["africa"]["doc_ids"]) == [0, 50, 100, 150]
+
+    results = search_inverted_index('"africa wombat"', postings, skip_lists=term_lists)
+    assert list(results) == [0, 50, 100, 150] and set(postings["wombat"]) == set(results)
+    assert results[150]["wombat"] == {"frequency": 2, "positions": [0, 2]} and results[100]["africa"]["positions"] == [1]
+
+    load_entries(postings["wombat"], term_lists["wombat"], [199])
+    assert "positions" not in postings["wombat"][199]
+    load_positions(postings["wombat"], [199])
+    assert postings["wombat"][199]["positions"] == [0]
+
+
+@pytest.mark.parametrize("index_format", ["json", "binary"])
+def test_block_max_ranking_matches_exhaustive_ranking(tmp_path, index_format):
+    rng = random.Random(3)
+    vocabulary = ["wombat", "africa", "river", "king", "zebra"]
+    documents = [(doc, " ".join(rng.choice(vocabulary[:rng.randint(1, 5)]) for _ in range(rng.randint(5, 400))))
+                 for doc in range(600)]
+    inverted_index = build_inverted_index_with_positions_json(documents)
+    document_lengths = compute_document_lengths(inverted_index)
+    doc_table = new_doc_table([f"book_{doc}.txt" for doc in range(600)])
+    export_document_lengths(doc_table, document_lengths, str(tmp_path / "doc_table.json"))
+    document_stats = load_document_stats(str(tmp_path / "doc_table.json"))
+
+    skip_lists = {}
+    if index_format == "json":
+        export_inverted_index_json(inverted_index, str(tmp_path / "word_level.json"))
+        postings = read_inverted_index_json(str(tmp_path / "word_level.json"))
+    else:
+        export_inverted_index_binary(inverted_index, str(tmp_path / "word_level.bin"), document_lengths)
+        postings = load_term_lists(open_binary_index(str(tmp_path / "word_level.bin")), vocabulary, skip_lists)
+
+    allowed_docs = [build_skip_list(set(range(0, 600, 3)))]
+    for words in (["wombat"], ["zebra"], ["wombat", "africa"], ["river", "king", "zebra"]):
+        term_lists = {word: get_skip_list(word, postings, skip_lists) for word in words}
+        exhaustive = top_k_bm25(words, term_lists, document_stats)
+        filtered = top_k_bm25(words, term_lists, document_stats, filters=allowed_docs)
+        assert filtered == [(score, doc) for score, doc in exhaustive if doc % 3 == 0]
+        for k in (1, 5, 10):
+            assert top_k_bm25(words, term_lists, document_stats, k) == exhaustive[:k]
+            assert top_k_bm25(words, term_lists, document_stats, k, exhaustive[k - 1]) == exhaustive[k:2 * k]
+            assert top_k_bm25(words, term_lists, document_stats, k, filters=allowed_docs) == filtered[:k]
+
+    found = {}
+    assert top_k_bm25(words, term_lists, document_stats, 0, found=found) == [] and found["accepted"]
+
+
+def test_snippets_are_read_concurrently_and_kept_in_rank_order(monkeypatch):
+    def slow_read_paragraph(text_id, pos, datamart_directory):
+        time.sleep(0.1)
+        return f"{text_id}@{pos}"
+
+    monkeypatch.setattr(search_api, "read_paragraph", slow_read_paragraph)
+    query_result = {f"book_{rank}.txt": {"term": {"frequency": 1, "positions": [rank]}} for rank in range(8)}
+
+    start = time.perf_counter()
+    streamed = list(search_api.iter_context_in_datalake(query_result, 'Datamarts', window=4))
+    assert time.perf_counter() - start < 0.5
+    assert [text_id for text_id, _ in streamed] == list(query_result)
+    assert streamed[3][1]["term"]["paragraph"] == "book_3.txt@3"
+
+    message = {"message": "No documents contain all the words: term"}
+    assert search_api.find_context_in_datalake(message, 'Datamarts') == message
+
+
+def test_search_metadata_filters(tmp_path):
+    metadata_file = tmp_path / "book_metadata.csv"
+    metadata_file.write_text("title,author,release_date,language,document\n"
+                             "A History of Africa,Jane Doe,\"March 5, 1998\",English,a.txt\n"
+                             "Histoire de France,Jean Dupont,\"March 5, 1998\",French,b.txt\n"
+                             "African Tales,John Roe,unknown,English,c.txt\n", encoding='utf-8')
+    metadata = load_metadata(metadata_file)
+
+    def documents(**filters):
+        return [entry['document'] for entry in search_metadata(filters, metadata)]
+
+    assert documents(title='afric') == ["a.txt"]
+    assert documents(language='en', year='1998') == ["a.txt", "b.txt"]
+    assert documents(author='dupont', month='03', day='05') == ["b.txt"]
+    assert documents(month='3') == []
+    assert search_metadata({}, metadata)[0]['release_date'] == "1998-03-05"
+
+
+def test_combined_search_prunes_by_metadata(tmp_path):
+    metadata_file = tmp_path / "book_metadata.csv"
+    metadata_file.write_text("title,author,release_date,language,document,doc_id\n"
+                             "Slavery in Africa,Jane Doe,\"March 5, 1998\",English,a.txt,0\n"
+                             "La esclavitud,Juan Pérez,\"May 1, 1998\",Spanish,b.txt,1\n"
+                             "Slavery Abolished,John Roe,\"June 2, 2004\",English,c.txt,2\n", encoding='utf-8')
+    metadata = load_metadata(metadata_file)
+    doc_table = new_doc_table(["a.txt", "b.txt", "c.txt"])
+    documents = number_documents([("a.txt", "slavery slavery"), ("b.txt", "slavery"), ("c.txt", "slavery")], doc_table)
+    inverted_index = build_query_inverted_index(documents)
+    export_doc_table(doc_table, tmp_path / "doc_table.json")
+    document_stats = load_document_stats(tmp_path / "doc_table.json")
+
+    allowed_docs = filter_documents({'language': 'english', 'date_from': '1998-01-01', 'date_to': '1999-12-31'},
+                                    metadata)
+
+    assert allowed_docs == {0}
+    assert list(search_inverted_index("slavery", inverted_index, document_stats, allowed_docs=allowed_docs)) == ["a.txt"]
+    assert filter_documents({'title': '', 'language': ''}, metadata) is None
+
+
+FAKE_GUTENBERG_PAGES = {
+    "/ebooks/bookshelf/5": '<a href="/ebooks/1">1</a><a href="/ebooks/2">2</a><a href="/ebooks/bookshelf/5/2">Next</a>',
+    "/ebooks/bookshelf/5/2": '<a href="/ebooks/3">3</a>',
+    "/ebooks/bookshelf/6": '<a href="/ebooks/3">3</a><a href="/ebooks/4">4</a><a href="/ebooks/5">5</a>',
+    "/ebooks/1": "<h1>Book One</h1>", "/ebooks/2": "<h1>Book Two</h1>", "/ebooks/3": "<h1>Book Three</h1>",
+    "/ebooks/4": "<h1>Book Four</h1>", "/ebooks/5": "<h1>Book Five</h1>",
+    "/cache/epub/1/pg1.txt": "one", "/cache/epub/3/pg3.txt": "three", "/cache/epub/4/pg4.txt": "four",
+    "/cache/epub/5/pg5.txt": "one",
+}
+
+
+@pytest.fixture
+def fake_gutenberg():
+    pages = dict(FAKE_GUTENBERG_PAGES)
+    requested = []
+
+    class FakeGutenbergHandler(BaseHTTPRequestHandler):
+        def do_HEAD(self):
+            body = pages.get(self.path)
+            etag = f'"{hash(body)}"'
+            status = 404 if body is None else 304 if self.headers.get('If-None-Match') == etag else 200
+            requested.append((self.command, self.path, status))
+            self.send_response(status)
+            if body is not None:
+                self.send_header('ETag', etag)
+            self.end_headers()
+            return body if status == 200 else None
+
+        def do_GET(self):
+            body = self.do_HEAD()
+            if body is not None:
+                self.wfile.write(body.encode('utf-8'))
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), FakeGutenbergHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{server.server_port}/", requested, pages
+    server.shutdown()
+
+
+def test_crawler_downloads_each_book_once_and_resumes(fake_gutenberg, tmp_path):
+    base_url, requested, pages = fake_gutenberg
+    repository, state_file, ledger_file = tmp_path / "books", tmp_path / "crawl_state.json", tmp_path / "ledger.json"
+    pages["/ebooks/bookshelf/6"] += '<a href="/ebooks/2">2</a>'
+
+    def crawl():
+        crawl_bookshelves(6, repository, state_file, base_url, concurrency=2, host_delay=0, ledger_file=ledger_file)
+
+    crawl()
+    assert sorted(os.listdir(repository)) == ["Book_Four_4.txt", "Book_One_1.txt", "Book_Three_3.txt"]
+    assert requested.count(("HEAD", "/cache/epub/2/pg2.txt", 404)) == 2
+    assert load_crawl_state(state_file) == {"bookshelf": 5, "frontier": None, "visited": set()}
+    assert load_crawl_ledger(ledger_file)["5"]["duplicate_of"] == "1"
+
+    requested.clear()
+    crawl()
+    book_requests = {request for request in requested if "/cache/epub/" in request[1]}
+    assert book_requests == {("GET", f"/cache/epub/{book}/pg{book}.txt", 304) for book in (1, 3, 4, 5)} | \
+        {("HEAD", "/cache/epub/2/pg2.txt", 404)}
+
+    state = load_crawl_state(state_file)
+    state.update(bookshelf=6, frontier=[f"{base_url}ebooks/4"], visited={"1", "2", "3"})
+    save_crawl_state(state, state_file)
+    requested.clear()
+    crawl()
+    assert requested == [("GET", "/cache/epub/4/pg4.txt", 304)]
+    assert load_crawl_state(state_file)["bookshelf"] == 5
+
+
+@pytest.mark.parametrize("compress", [False, True])
+def test_crawler_recrawl_skips_unchanged_books(fake_gutenberg, tmp_path, compress):
+    base_url, requested, pages = fake_gutenberg
+    repository, state_file, ledger_file = tmp_path / "books", tmp_path / "crawl_state.json", tmp_path / "ledger.json"
+
+    def crawl():
+        crawl_bookshelves(6, str(repository), state_file, base_url, concurrency=2, host_delay=0,
+                          ledger_file=ledger_file, compress=compress)
+
+    crawl()
+    assert list_book_names(repository) == ["Book_Four_4.txt", "Book_One_1.txt", "Book_Three_3.txt"]
+    assert all(name.endswith(".blk") == compress for name in os.listdir(repository))
+    book_one = stored_book_path(str(repository / "Book_One_1.txt"))
+    modification_time = os.stat(book_one).st_mtime_ns
+
+    pages["/cache/epub/3/pg3.txt"] = "three, second edition"
+    pages["/cache/epub/4/pg4.txt"] = "one"
+    requested.clear()
+    crawl()
+
+    book_requests = sorted(request for request in requested if "bookshelf" not in request[1])
+    assert book_requests == [("GET", "/cache/epub/1/pg1.txt", 304), ("GET", "/cache/epub/3/pg3.txt", 200),
+                             ("GET", "/cache/epub/4/pg4.txt", 200), ("GET", "/cache/epub/5/pg5.txt", 304),
+                             ("HEAD", "/cache/epub/2/pg2.txt", 404)]
+    assert list_book_names(repository) == ["Book_One_1.txt", "Book_Three_3.txt"]
+    assert read_book(str(repository / "Book_Three_3.txt")) == "three, second edition"
+    assert os.stat(book_one).st_mtime_ns == modification_time
+    ledger = load_crawl_ledger(ledger_file)
+    assert ledger["4"]["duplicate_of"] == "1" and ledger["3"]["etag"] == f'"{hash(pages["/cache/epub/3/pg3.txt"])}"'
+
+    pages["/cache/epub/1/pg1.txt"] = "uno"
+    crawl()
+    assert list_book_names(repository) == ["Book_Four_4.txt", "Book_One_1.txt", "Book_Three_3.txt"]
+    assert read_book(str(repository / "Book_One_1.txt")) == "uno"
+    assert read_book(str(repository / "Book_Four_4.txt")) == "one"
+    ledger = load_crawl_ledger(ledger_file)
+    assert "duplicate_of" not in ledger["1"] and "duplicate_of" not in ledger["4"]
+    assert ledger["5"]["duplicate_of"] == "4"
+
+
+def test_compressed_books_read_like_plain_text(tmp_path):
+    content = ("Title: Blocks\n*** START OF THE BOOK ***\n" + " ".join(f"wörd{i}" for i in range(20000))).encode()
+    chunks = [content[i:i + 1000] for i in range(0, len(content), 1000)]
+    plain, packed = str(tmp_path / "plain.txt"), str(tmp_path / "packed.txt")
+    write_book(chunks, plain, compress=False)
+    write_book(chunks, packed, compress=True, block_size=4096)
+
+    assert list_book_names(tmp_path) == ["packed.txt", "plain.txt"]
+    assert stored_book_path(packed) == packed + ".blk" and os.path.getsize(packed + ".blk") < len(content)
+    for start, end in [(0, 10), (4090, 8200), (len(content) - 5, None), (100, 100)]:
+        assert read_book_bytes(packed, start, end) == read_book_bytes(plain, start, end) == content[start:end]
+    assert read_book(packed) == content.decode() and b"".join(iter_book_chunks(packed)) == content
+
+    text = content.decode()
+    offsets_file = str(tmp_path / "book.off")
+    write_token_offsets(text, text.index("***", 20) + 3, offsets_file)
+    for pos in (0, 5000, 19999):
+        assert read_snippet(packed, offsets_file, pos) == read_snippet(plain, offsets_file, pos)
+    assert read_snippet(packed, offsets_file, 5000).split()[10] == "wörd5000"
+
+
+@pytest.fixture
+def synthetic_datamart(tmp_path, monkeypatch):
+    # Both engines serve a datamart built from 60 synthetic books that all contain
+    # "African History"; their snapshots and caches are restored afterwards.
+    books_directory = str(tmp_path / "Gutenbrg")
+    datamarts = str(tmp_path / "Datamarts")
+    write_synthetic_gutenberg(books_directory, 60)
+    run_incremental_index(books_directory, datamarts)
+
+    monkeypatch.setattr(search_api, "DATALAKE_REPOSITORY", books_directory)
+    for engine in (engine_json, engine_tree):
+        monkeypatch.setattr(engine, "DATAMARTS_REPOSITORY", datamarts)
+        monkeypatch.setattr(engine, "result_cache", create_result_cache(directory=''))
+        monkeypatch.setitem(engine.readiness, "ready", engine.readiness["ready"])
+    monkeypatch.setitem(engine_tree.readiness, "shards", engine_tree.readiness["shards"])
+    monkeypatch.setattr(engine_json, "index_snapshot", engine_json.index_snapshot)
+    monkeypatch.setattr(engine_tree, "datamart_snapshot", engine_tree.datamart_snapshot)
+    engine_json.refresh_index_snapshot(engine_json.INDEX_FILES)
+    return books_directory, datamarts
+
+
+@pytest.mark.parametrize("engine", [engine_json, engine_tree])
+def test_healthz_reports_ready_only_after_warm_up(synthetic_datamart, engine):
+    client = engine.app.test_client()
+    engine.readiness["ready"] = False
+    assert client.get('/healthz').status_code == 503
+
+    engine.warm_up()
+    response = client.get('/healthz')
+    assert response.status_code == 200 and response.get_json()["status"] == "ready"
+
+
+@pytest.mark.parametrize("engine", [engine_json, engine_tree])
+def test_healthz_reports_warming_without_a_datamart(tmp_path, monkeypatch, engine):
+    monkeypatch.setattr(engine, "DATAMARTS_REPOSITORY", str(tmp_path / "Datamarts"))
+    monkeypatch.setitem(engine.readiness, "ready", False)
+    if engine is engine_json:
+        monkeypatch.setattr(engine_json, "index_snapshot", dict(engine_json.index_snapshot, version=None))
+    else:
+        monkeypatch.setitem(engine_tree.readiness, "shards", 0)
+        monkeypatch.setattr(engine_tree, "datamart_snapshot", engine_tree.datamart_snapshot)
+
+    engine.warm_up()
+    assert engine.readiness["ready"] and engine.app.test_client().get('/healthz').status_code == 503
+
+
+def test_index_snapshot_hot_swaps_and_keeps_the_last_valid_index(tmp_path, monkeypatch):
+    monkeypatch.setattr(engine_json, "DATAMARTS_REPOSITORY", str(tmp_path))
+    monkeypatch.setattr(engine_json, "index_snapshot", dict(engine_json.index_snapshot, version=None))
+    index_file = tmp_path / engine_json.INVERTED_INDEX_WORD_LEVEL_BINARY
+    os.makedirs(index_file.parent)
+    export_doc_table(new_doc_table(["a.txt", "b.txt"]), str(tmp_path / engine_json.DOC_TABLE_REPOSITORY))
+
+    export_inverted_index_binary(build_inverted_index_with_positions_json([(0, "wombat")]), str(index_file))
+    assert engine_json.refresh_index_snapshot(engine_json.INDEX_FILES)
+    assert not engine_json.refresh_index_snapshot(engine_json.INDEX_FILES)
+    first = engine_json.index_snapshot
+    assert list(engine_json.load_query_index(first, "wombat")[0]) == ["wombat"]
+
+    export_inverted_index_binary(build_inverted_index_with_positions_json([(0, "wombat"), (1, "zebra wombat")]),
+                                 str(index_file))
+    assert engine_json.refresh_index_snapshot(engine_json.INDEX_FILES)
+    second = engine_json.index_snapshot
+    assert second is not first and list(engine_json.load_query_index(second, "zebra")[0]) == ["zebra"]
+
+    index_file.write_bytes(b"not an index")
+    assert not engine_json.refresh_index_snapshot(engine_json.INDEX_FILES)
+    assert engine_json.index_snapshot is second
+
+
+def test_shard_cache_evicts_least_recently_used_and_reloads_changed_shards(tmp_path, monkeypatch):
+    monkeypatch.setattr(engine_tree, "shard_cache", type(engine_tree.shard_cache)())
+    monkeypatch.setattr(engine_tree, "shard_cache_stats", {"hits": 0, "misses": 0, "evictions": 0, "bytes": 0})
+    tree_directory = str(tmp_path / "Tree Data Structure")
+    export_inverted_index_to_json_by_letter(
+        build_inverted_index_with_positions_json([(0, "apple banana cherry"), (1, "apple avocado")]), tree_directory)
+    sizes = {letter: os.path.getsize(engine_tree.find_letter_shard(letter, tree_directory)) for letter in "abc"}
+    max_bytes = sum(sizes.values()) - 1
+
+    for letter in "abac":
+        engine_tree.load_letter_shard(letter, tree_directory, max_bytes)
+    assert list(engine_tree.shard_cache) == [os.path.join("a", "a_words.json"), os.path.join("c", "c_words.json")]
+    assert engine_tree.shard_cache_stats == {"hits": 1, "misses": 3, "evictions": 1,
+                                             "bytes": sizes["a"] + sizes["c"]}
+
+    postings, skip_lists = engine_tree.load_letter_postings("a", ["apple"], tree_directory)
+    assert list(postings) == ["apple"] and list(skip_lists) == ["apple"]
+    assert engine_tree.shard_cache_stats["hits"] == 2
+
+    export_inverted_index_to_json_by_letter(build_inverted_index_with_positions_json([(0, "apricot")]), tree_directory)
+    letter_index, _ = engine_tree.load_letter_shard("a", tree_directory, max_bytes)
+    assert list(letter_index) == ["apricot"] and engine_tree.shard_cache_stats["misses"] == 4
+
+
+@pytest.mark.parametrize("engine", [engine_json, engine_tree])
+def test_cursor_pages_and_ndjson_stream_match_a_single_page(synthetic_datamart, engine):
+    client = engine.app.test_client()
+    everything = client.get('/search/word_level?query=African History&k=60&max_positions=0').get_json()
+    assert len(everything) == 60 and all("positions" not in hits for doc in everything.values() for hits in doc.values())
+
+    documents, cursor = [], None
+    while len(documents) < 60:
+        response = client.get('/search/word_level?query=African History&k=25&max_positions=2'
+                              + (f'&cursor={cursor}' if cursor else ''))
+        page = response.get_json()
+        assert all(len(hits["positions"]) <= 2 for doc in page.values() for hits in doc.values())
+        documents += list(page)
+        cursor = response.headers.get('X-Next-Cursor')
+    assert documents[:60] == list(everything)
+
+    response = client.get('/search/word_level?query=African History&k=10&format=ndjson')
+    assert response.mimetype == 'application/x-ndjson'
+    lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert [line["document"] for line in lines[:-1]] == documents[:10]
+    assert "paragraph" in lines[0]["words"]["african"] and lines[-1]["next_cursor"]
+    assert client.get('/search/word_level?query=African&cursor=nonsense').status_code == 400
+
+
+@pytest.mark.parametrize("backend", ["memory", "disk"])
+def test_result_cache_serves_repeats_until_the_index_changes(synthetic_datamart, monkeypatch, tmp_path, backend):
+    books_directory, datamarts = synthetic_datamart
+    cache_directory = tmp_path / "result_cache"
+    cache_directory.mkdir()
+    monkeypatch.setattr(engine_tree, "result_cache",
+                        create_result_cache(directory=str(cache_directory) if backend == "disk" else ''))
+    client = engine_tree.app.test_client()
+
+    first = client.get('/search/word_level?query=African History&k=5').get_json()
+    assert len(first) == 5
+    assert client.get('/search/word_level?query=african,  THE history!&k=5').get_json() == first
+    assert client.get('/search/word_level?query=African History&k=5&format=ndjson').status_code == 200
+    assert client.get('/search/word_level?query=African History&k=5&format=ndjson').status_code == 200
+    assert client.get('/stats/result_cache').get_json()["hits"] == 3
+
+    with open(os.path.join(books_directory, "Unrelated_Book.txt"), 'w', encoding='utf-8') as f:
+        f.write("Title: Unrelated\n*** START OF THE PROJECT GUTENBERG EBOOK 60 ***\nwombat quokka")
+    run_incremental_index(books_directory, datamarts)
+    assert client.get('/search/word_level?query=African History&k=5').get_json() == first
+    assert client.get('/stats/result_cache').get_json()["misses"] == 2
+
+
+def test_disk_cache_hits_survive_a_concurrent_prune(tmp_path, monkeypatch):
+    cache = create_result_cache(directory=str(tmp_path / "cache"))
+    put_cached_result(cache, "v1", ["query"], {"results": {}, "next_cursor": None})
+
+    def pruned(path, *args, **kwargs):
+        raise FileNotFoundError(path)
+
+    monkeypatch.setattr(os, "utime", pruned)
+    assert get_cached_result(cache, "v1", ["query"]) == {"results": {}, "next_cursor": None}
+
+
+def test_datamart_versions_are_published_atomically(tmp_path):
+    datamarts = str(tmp_path)
+    assert current_datamart_directory(datamarts) == datamarts
+
+    with new_datamart_version(datamarts) as first:
+        os.makedirs(os.path.join(first, 'Inverted Index'))
+        with atomic_write(os.path.join(first, 'Inverted Index', 'doc_table.json')) as f:
+            f.write('["first"]')
+    assert current_datamart_directory(datamarts) == first
+
+    with pytest.raises(RuntimeError):
+        with new_datamart_version(datamarts) as failed:
+            raise RuntimeError("build failed")
+    assert not os.path.exists(failed) and current_datamart_directory(datamarts) == first
+
+    versions = []
+    for build in range(4):
+        with new_datamart_version(datamarts) as directory:
+            with atomic_write(os.path.join(directory, 'Inverted Index', 'doc_table.json')) as f:
+                f.write(f'["build {build}"]')
+            assert current_datamart_directory(datamarts) != directory
+        versions.append(current_version(datamarts))
+
+    with open(os.path.join(current_datamart_directory(datamarts), 'Inverted Index', 'doc_table.json')) as f:
+        assert f.read() == '["build 3"]'
+    with open(os.path.join(datamarts, 'versions', versions[1], 'Inverted Index', 'doc_table.json')) as f:
+        assert f.read() == '["build 1"]'
+    assert sorted(os.listdir(os.path.join(datamarts, 'versions'))) == versions[1:]
+
+
 queries = ["African", "History of Africa", "African people were slaves"]  # Lista de consultas
+adversarial_queries = ["term0 term4999", "term1 term4000", "term0 term1 term4999"]
+
+
+def set_intersection(words, inverted_index):
+    words = [word for word in words if word in inverted_index]
+    common_docs = set(inverted_index[words[0]].keys())
+    for word in words[1:]:
+        common_docs = common_docs.intersection(inverted_index[word].keys())
+    return common_docs
+
+
+def skip_list_intersection(words, inverted_index, skip_lists):
+    return intersect_postings([word for word in words if word in inverted_index], inverted_index, skip_lists)
+
+
+@pytest.fixture(scope="session")
+def synthetic_query_index(synthetic_gutenberg):
+    return build_query_inverted_index(synthetic_gutenberg(10000))
+
+
+def test_skip_list_intersection_matches_set_intersection(synthetic_query_index):
+    skip_lists = {}
+    for query in queries + adversarial_queries:
+        words = query.lower().split()
+        expected = set_intersection(words, synthetic_query_index)
+        assert skip_list_intersection(words, synthetic_query_index, skip_lists) == sorted(expected)
+
+
+@pytest.mark.parametrize("intersection", ["set", "skip_list"])
+@pytest.mark.parametrize("query", queries + adversarial_queries)
+@pytest.mark.benchmark(group="intersection")
+def test_execution_time_intersection(synthetic_query_index, benchmark, intersection, query):
+    words = query.lower().split()
+    if intersection == "set":
+        benchmark(set_intersection, words, synthetic_query_index)
+    else:
+        skip_lists = {}
+        skip_list_intersection(words, synthetic_query_index, skip_lists)
+        benchmark(skip_list_intersection, words, synthetic_query_index, skip_lists)
 
 
 @pytest.mark.parametrize("query", queries)